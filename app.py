@@ -1,23 +1,39 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask import Flask, render_template, request, jsonify, redirect, url_for, send_from_directory
 import requests
-from bs4 import BeautifulSoup # For parsing HTML content to extract data
+from html.parser import HTMLParser # For scanning HTML content for links and embedded data
 import rdflib
 from rdflib import Graph, URIRef, Literal, Namespace
 from rdflib.namespace import RDF, RDFS, FOAF, DC, XSD, DCTERMS # Common RDF namespace definitions
+from rdflib.plugins.shared.jsonld import context as rdflib_jsonld_context # Remote @context loading
 import uuid
+import gzip
 import json
 import re
+import codecs
+import copy
 import logging
-from SPARQLWrapper import SPARQLWrapper, JSON
-from urllib.parse import urlparse, unquote # For URL parsing and character unescaping
+from urllib.parse import urlparse, urlsplit, urlunsplit, unquote, urldefrag, quote, urljoin # For URL parsing and character unescaping
 import os
+import sys
 import datetime
 from markupsafe import Markup
 import time
+import concurrent.futures
+import multiprocessing
 from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import heapq
 import traceback
 from requests.exceptions import Timeout, RequestException
+from requests.adapters import HTTPAdapter
 import threading
+import queue
+import urllib.robotparser
+import hashlib
+import zlib
+import email.utils
+from collections import Counter, OrderedDict
+from requests.structures import CaseInsensitiveDict
 
 
 # Try to import optional modules
@@ -40,6 +56,67 @@ app.config['RELEVANCE_THRESHOLD'] = 0.5  # Minimum score to consider a resource
 app.config['CRAWL_TIMEOUT'] = 300  # Maximum crawl duration in seconds
 app.config['USE_PARALLEL'] = False  # Enable/disable parallel processing
 app.config['MAX_WORKERS'] = 5  # Number of parallel worker threads when enabled
+app.config['CRAWL_ENGINE'] = 'threads'  # Crawl engine: 'threads' (MAX_WORKERS threads) or 'asyncio' (asyncio scheduler over a large thread pool)
+app.config['ASYNC_MAX_CONCURRENCY'] = 100  # Threads, and so resources in flight, with the asyncio engine
+app.config['ASYNC_PER_HOST_LIMIT'] = 8  # Maximum resources in flight per host with the asyncio engine
+app.config['FRONTIER_HOST_SKIP_LIMIT'] = 1000  # Entries for busy hosts passed over per frontier_next before it gives up
+app.config['FRONTIER_DOMAIN_PENALTY'] = 0.1  # Priority penalty per URL already queued from the same domain at a depth
+app.config['HTTP_POOL_CONNECTIONS'] = 20  # Number of per-host connection pools kept by the shared HTTP session
+app.config['HTTP_POOL_MAXSIZE'] = 10  # Keep-alive connections kept open per host
+app.config['HTTP_TIMEOUT'] = 10  # Default timeout in seconds for outbound HTTP requests
+app.config['HTTP_CACHE_ENABLED'] = True  # Keep fetched resources in a persistent on-disk cache between crawls
+app.config['HTTP_CACHE_DIR'] = os.path.join('cache', 'http')  # Directory for the HTTP response cache
+app.config['HTTP_CACHE_MAX_BYTES'] = 500 * 1024 * 1024  # Size bound of the HTTP cache (least recently used entries are evicted)
+app.config['FALLBACK_PROBE_WORKERS'] = 8  # Concurrent HEAD probes during fallback discovery
+app.config['FALLBACK_PROBE_BUDGET'] = 20  # Maximum URL variations probed per resource
+app.config['FALLBACK_DISCOVERY_DEADLINE'] = 15  # Overall time limit in seconds for probing one resource
+app.config['HOST_PROFILE_FILE'] = os.path.join('cache', 'host_profiles.json')  # Learned per-host capabilities, kept between crawls
+app.config['HOST_PROFILE_MIN_SAMPLES'] = 5  # Observations needed before a host profile is used to skip requests
+app.config['POLITENESS_ENABLED'] = True  # Rate limit requests per host
+app.config['HOST_REQUESTS_PER_SECOND'] = 2.0  # Sustained request rate per host (token bucket refill rate)
+app.config['HOST_BURST'] = 4  # Requests a host may receive in a burst (token bucket size)
+app.config['HOST_MAX_IN_FLIGHT'] = 2  # Concurrent requests allowed per host
+app.config['RESPECT_ROBOTS_CRAWL_DELAY'] = True  # Slow hosts down to the Crawl-delay in their robots.txt
+app.config['AIMD_ENABLED'] = True  # Adapt per-host concurrency to latency and errors instead of HOST_MAX_IN_FLIGHT
+app.config['AIMD_MIN_CONCURRENCY'] = 1  # Lowest per-host concurrency the controller backs off to
+app.config['AIMD_MAX_CONCURRENCY'] = 8  # Highest per-host concurrency the controller grows to
+app.config['AIMD_DECREASE_FACTOR'] = 0.5  # Multiplier applied to a host's concurrency on overload
+app.config['AIMD_LATENCY_TOLERANCE'] = 2.0  # Latency above this multiple of the host's baseline counts as overload
+app.config['AIMD_DECREASE_COOLDOWN'] = 2  # Seconds between two decreases for the same host
+app.config['AIMD_MAX_RETRY_AFTER'] = 120  # Longest Retry-After (in seconds) that is honoured
+app.config['CIRCUIT_BREAKER_ENABLED'] = True  # Stop requesting hosts that keep failing
+app.config['CIRCUIT_BREAKER_THRESHOLD'] = 5  # Consecutive failures or timeouts that open a host's circuit
+app.config['CIRCUIT_BREAKER_RESET_TIMEOUT'] = 60  # Seconds before an open circuit lets a trial request through
+app.config['PARSE_POOL_WORKERS'] = 4  # Processes parsing large RDF documents (0 parses everything in-thread)
+app.config['PARSE_POOL_THRESHOLD'] = 256 * 1024  # Documents smaller than this (bytes) are parsed in-thread
+app.config['STREAM_INGEST_ENABLED'] = True  # Stream .nt/.nq dumps into Fuseki without building a graph
+app.config['STREAM_INGEST_CHUNK_TRIPLES'] = 5000  # Triples sent to Fuseki per update when streaming
+app.config['JSONLD_CONTEXT_CACHE_FILE'] = os.path.join('cache', 'jsonld_contexts.json')  # Persisted JSON-LD @context documents
+app.config['JSONLD_CONTEXT_TTL'] = 7 * 24 * 3600  # Seconds before a cached @context is fetched again
+app.config['JSONLD_CONTEXT_CACHE_SIZE'] = 100  # Maximum number of @context documents kept
+app.config['WRITE_BUFFER_ENABLED'] = True  # Buffer Fuseki writes and send them as combined updates
+app.config['WRITE_BUFFER_MAX_TRIPLES'] = 50000  # Buffered triples that trigger a flush
+app.config['WRITE_BUFFER_MAX_AGE'] = 5  # Seconds buffered triples may wait before a flush
+app.config['STORAGE_BACKEND'] = 'gsp'  # 'gsp' uploads N-Triples/N-Quads via the Graph Store Protocol, 'sparql' uses INSERT DATA
+app.config['FUSEKI_GZIP_UPLOADS'] = False  # Gzip-compress Graph Store uploads
+app.config['FUSEKI_UPLOAD_TIMEOUT'] = 120  # Seconds allowed for a Graph Store upload
+app.config['STORAGE_WRITER_ENABLED'] = True  # Write to Fuseki from background writer threads
+app.config['STORAGE_WRITER_THREADS'] = 2  # Number of storage writer threads
+app.config['STORAGE_QUEUE_SIZE'] = 8  # Batches queued for the writers before crawler threads wait
+app.config['WAL_ENABLED'] = True  # Log Fuseki writes to disk until they are acknowledged
+app.config['WAL_DIR'] = os.path.join('cache', 'wal')  # Directory for write-ahead log segments
+app.config['SPARQL_POOL_MAXSIZE'] = 20  # Keep-alive connections kept open to Fuseki for queries and updates
+app.config['SPARQL_TIMEOUT'] = 30  # Default seconds allowed for a SPARQL query or update
+app.config['SPARQL_CACHE_ENABLED'] = True  # Cache query results until the dataset is next written
+app.config['SPARQL_CACHE_MAX_BYTES'] = 32 * 1024 * 1024  # Size limit of the query result cache
+app.config['EXPORT_READ_TIMEOUT'] = 300  # Seconds an export may wait for more data from Fuseki
+app.config['EXPORT_JOBS_DIR'] = os.path.join('static', 'exports')  # Where export jobs write their shards and manifests (relative to the app)
+app.config['EXPORT_SHARD_STATEMENTS'] = 1000000  # Default number of statements per export shard
+app.config['EXPORT_SHARD_BYTES'] = 256 * 1024 * 1024  # Default compressed size after which an export shard is closed
+app.config['GRAPH_NAME_PER_CRAWL'] = False  # Name resource graphs per crawl instead of by resource URL alone
+app.config['STATS_STORE_FILE'] = os.path.join('cache', 'graph_stats.json')  # Incrementally maintained knowledge graph statistics
+app.config['STATS_RECONCILE_TIMEOUT'] = 600  # Seconds allowed for each query when re-syncing statistics from Fuseki
+app.config['STATS_DEDUP_MAX_STATEMENTS'] = 1000000  # Statement hashes kept in memory to deduplicate appends to stored graphs
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -115,25 +192,927 @@ def reset_crawl_state():
     return crawl_id
 
 
-def get_signposting_links(url):
+# Accept header used when fetching resources: RDF serialisations are preferred, but HTML
+# is still accepted so landing pages return markup that can be scanned for links
+FETCH_ACCEPT_HEADER = 'application/rdf+xml, text/turtle, application/ld+json, text/n3, application/n-triples, text/html;q=0.5, */*;q=0.1'
+CRAWLER_USER_AGENT = 'FAIR-Signposting-Crawler/1.0 (Mozilla Compatible)'
+
+# Shared HTTP session for all outbound traffic, created lazily by get_http_session()
+http_session = None
+http_session_lock = threading.Lock()
+
+def get_http_session():
+    """
+    Return the shared HTTP session, creating it on first use.
+
+    The session keeps a keep-alive connection pool per host (sized by HTTP_POOL_CONNECTIONS
+    and HTTP_POOL_MAXSIZE), so repeated requests to the same repository reuse TCP and TLS
+    connections. The underlying urllib3 pools are thread-safe and the session is shared by
+    all crawler threads. Every request carries the crawler User-Agent and a default Accept
+    header preferring RDF, which individual calls may override.
+    """
+    global http_session
+    if http_session is None:
+        with http_session_lock:
+            if http_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=app.config.get('HTTP_POOL_CONNECTIONS', 20),
+                                      pool_maxsize=app.config.get('HTTP_POOL_MAXSIZE', 10))
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers.update({
+                    'User-Agent': CRAWLER_USER_AGENT,
+                    'Accept': FETCH_ACCEPT_HEADER
+                })
+                http_session = session
+    return http_session
+
+def reset_http_session():
+    """Close the shared HTTP session so it is rebuilt with the current pool configuration."""
+    global http_session
+    with http_session_lock:
+        if http_session is not None:
+            http_session.close()
+        http_session = None
+
+# Per-host politeness scheduler used by http_request. Each host has a token bucket
+# (HOST_REQUESTS_PER_SECOND, HOST_BURST), slowed down to the robots.txt Crawl-delay
+# when one is given, and a cap on concurrent requests (HOST_MAX_IN_FLIGHT)
+politeness_state = {
+    'hosts': {},  # Host -> token bucket and in-flight state
+    'condition': threading.Condition()
+}
+
+def get_politeness_host(host):
+    """Return the politeness state for a host, creating it on first use (caller holds the condition)."""
+    hosts = politeness_state['hosts']
+    if host not in hosts:
+        hosts[host] = {
+            'tokens': float(app.config.get('HOST_BURST', 4)),
+            'last_refill': time.monotonic(),
+            'in_flight': 0,
+            'crawl_delay': None,  # Seconds between requests from robots.txt, if any
+            'robots_checked': False,
+            'robots_lock': threading.Lock(),
+            'requests': 0,
+            'waited': 0.0,  # Total seconds requests spent waiting for this host
+            # Adaptive concurrency (AIMD) controller
+            'limit': float(app.config.get('HOST_MAX_IN_FLIGHT', 2)),
+            'latency_ewma': None,
+            'latency_baseline': None,
+            'last_decrease': 0.0,
+            'blocked_until': 0.0,  # Monotonic time before which Retry-After asks us not to send requests
+            'successes': 0,
+            'overloads': 0
+        }
+    return hosts[host]
+
+def is_politeness_exempt(host):
+    """Requests to our own triple store are not rate limited."""
+    return host == urlparse(app.config['FUSEKI_ENDPOINT']).netloc
+
+def load_robots_crawl_delay(url):
+    """Read the Crawl-delay for the crawler from the host's robots.txt (once per host)."""
+    parsed = urlparse(url)
+    host = parsed.netloc
+    with politeness_state['condition']:
+        state = get_politeness_host(host)
+    with state['robots_lock']:
+        if state['robots_checked']:
+            return
+        crawl_delay = None
+        try:
+            # Fetched directly on the session so it does not wait for a politeness slot itself
+            response = get_http_session().get(f"{parsed.scheme}://{host}/robots.txt", timeout=5)
+            if response.status_code == 200:
+                robots = urllib.robotparser.RobotFileParser()
+                robots.parse(response.text.splitlines())
+                crawl_delay = robots.crawl_delay(CRAWLER_USER_AGENT) or robots.crawl_delay('*')
+        except Exception as e:
+            logger.debug(f"Could not read robots.txt for {host}: {str(e)}")
+        with politeness_state['condition']:
+            state['crawl_delay'] = float(crawl_delay) if crawl_delay else None
+            state['robots_checked'] = True
+            if state['crawl_delay']:
+                state['tokens'] = min(state['tokens'], 1.0)
+                logger.info(f"Using robots.txt Crawl-delay of {state['crawl_delay']}s for {host}")
+
+class HostSlotTimeout(requests.exceptions.Timeout):
+    """Raised when no politeness slot for a host becomes free before the caller's deadline."""
+
+def acquire_host_slot(url, deadline=None):
+    """
+    Wait until a request to the URL's host is allowed by its token bucket and
+    in-flight limit, then take a slot. Every acquired slot must be released.
+    With a deadline (a time.monotonic() value) HostSlotTimeout is raised if no slot
+    is free by then.
+    """
+    host = urlparse(url).netloc
+    if app.config.get('RESPECT_ROBOTS_CRAWL_DELAY', True):
+        load_robots_crawl_delay(url)
+
+    condition = politeness_state['condition']
+    started = time.monotonic()
+    with condition:
+        state = get_politeness_host(host)
+        while True:
+            # Refill the bucket at the host's rate
+            rate = app.config.get('HOST_REQUESTS_PER_SECOND', 2.0)
+            capacity = app.config.get('HOST_BURST', 4)
+            if state['crawl_delay']:
+                rate = min(rate, 1.0 / state['crawl_delay'])
+                capacity = 1
+            now = time.monotonic()
+            state['tokens'] = min(capacity, state['tokens'] + (now - state['last_refill']) * rate)
+            state['last_refill'] = now
+
+            if now < state['blocked_until']:
+                # Honour a Retry-After from the host
+                wait = min(1.0, state['blocked_until'] - now)
+            elif state['in_flight'] < host_in_flight_limit(host) and state['tokens'] >= 1:
+                state['tokens'] -= 1
+                state['in_flight'] += 1
+                state['requests'] += 1
+                state['waited'] += now - started
+                return
+            elif state['tokens'] >= 1:
+                # Wait for a release, the host is at its in-flight limit
+                wait = 1.0
+            else:
+                # Wait for a token to accumulate
+                wait = max(0.01, min(1.0, (1 - state['tokens']) / rate))
+
+            if deadline is not None:
+                if now >= deadline:
+                    state['waited'] += now - started
+                    raise HostSlotTimeout(f"No request slot for {host} became free before the deadline")
+                wait = min(wait, deadline - now)
+            condition.wait(timeout=wait)
+
+def release_host_slot(url):
+    """Release a slot taken with acquire_host_slot."""
+    with politeness_state['condition']:
+        state = get_politeness_host(urlparse(url).netloc)
+        state['in_flight'] = max(0, state['in_flight'] - 1)
+        politeness_state['condition'].notify_all()
+
+def host_in_flight_limit(host):
+    """
+    Maximum concurrent requests allowed to a host: the AIMD controller's current
+    limit when AIMD_ENABLED is on, otherwise HOST_MAX_IN_FLIGHT.
+    """
+    if not app.config.get('AIMD_ENABLED', True):
+        return app.config.get('HOST_MAX_IN_FLIGHT', 2)
+    with politeness_state['condition']:
+        state = politeness_state['hosts'].get(host)
+        limit = state['limit'] if state else app.config.get('HOST_MAX_IN_FLIGHT', 2)
+    return max(app.config.get('AIMD_MIN_CONCURRENCY', 1), int(limit))
+
+def parse_retry_after(value):
+    """Return the number of seconds in a Retry-After header (seconds or HTTP date), or None."""
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def record_host_outcome(url, status=None, latency=None, retry_after=None, error=None):
+    """
+    Feed the result of a request into the host's AIMD controller.
+
+    Concurrency grows by roughly one per round of successful requests while latency
+    stays within AIMD_LATENCY_TOLERANCE of the host's baseline, and is multiplied by
+    AIMD_DECREASE_FACTOR on 429/503 responses, timeouts, connection errors or a latency
+    spike (at most once per AIMD_DECREASE_COOLDOWN). Retry-After pauses the host.
+    """
+    if not app.config.get('AIMD_ENABLED', True):
+        return
+    min_limit = app.config.get('AIMD_MIN_CONCURRENCY', 1)
+    max_limit = app.config.get('AIMD_MAX_CONCURRENCY', 8)
+
+    with politeness_state['condition']:
+        state = get_politeness_host(urlparse(url).netloc)
+        now = time.monotonic()
+
+        overloaded = isinstance(error, (Timeout, requests.exceptions.ConnectionError)) or status in (429, 503)
+        if not overloaded and error is None and isinstance(latency, (int, float)):
+            # Track a smoothed latency and the best latency seen so far for the host
+            state['latency_ewma'] = latency if state['latency_ewma'] is None else 0.8 * state['latency_ewma'] + 0.2 * latency
+            state['latency_baseline'] = latency if state['latency_baseline'] is None else min(state['latency_baseline'], state['latency_ewma'])
+            overloaded = state['latency_ewma'] > state['latency_baseline'] * app.config.get('AIMD_LATENCY_TOLERANCE', 2.0) \
+                and state['latency_ewma'] > 0.5  # Ignore jitter on very fast hosts
+
+        if overloaded:
+            state['overloads'] += 1
+            if now - state['last_decrease'] >= app.config.get('AIMD_DECREASE_COOLDOWN', 2):
+                state['limit'] = max(min_limit, state['limit'] * app.config.get('AIMD_DECREASE_FACTOR', 0.5))
+                state['last_decrease'] = now
+                logger.info(f"Reducing concurrency for {urlparse(url).netloc} to {state['limit']:.1f}")
+            delay = parse_retry_after(retry_after)
+            if delay is not None:
+                delay = min(delay, app.config.get('AIMD_MAX_RETRY_AFTER', 120))
+                state['blocked_until'] = max(state['blocked_until'], now + delay)
+        elif error is None and isinstance(status, int) and status < 500:
+            state['successes'] += 1
+            state['limit'] = min(max_limit, state['limit'] + 1.0 / max(1.0, state['limit']))
+        politeness_state['condition'].notify_all()
+
+def get_host_concurrency_status():
+    """Snapshot of each host's politeness and AIMD state for the status API."""
+    now = time.monotonic()
+    with politeness_state['condition']:
+        return {
+            host: {
+                'concurrency_limit': host_in_flight_limit(host),
+                'in_flight': state['in_flight'],
+                'requests': state['requests'],
+                'successes': state['successes'],
+                'overloads': state['overloads'],
+                'latency_ms': round(state['latency_ewma'] * 1000) if state['latency_ewma'] is not None else None,
+                'crawl_delay': state['crawl_delay'],
+                'retry_after_remaining': round(max(0.0, state['blocked_until'] - now), 1)
+            }
+            for host, state in politeness_state['hosts'].items()
+        }
+
+# Per-host circuit breaker. After CIRCUIT_BREAKER_THRESHOLD consecutive timeouts, connection
+# errors or 5xx responses a host's circuit opens and its requests fail immediately; after
+# CIRCUIT_BREAKER_RESET_TIMEOUT one trial request is let through (half-open), which either
+# closes the circuit again or re-opens it
+circuit_breaker_state = {
+    'hosts': {},  # Host -> circuit state
+    'lock': threading.Lock()
+}
+
+class HostCircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of sending a request to a host whose circuit breaker is open."""
+
+def get_circuit(host):
+    """Return the circuit for a host, creating it on first use (caller holds the lock)."""
+    hosts = circuit_breaker_state['hosts']
+    if host not in hosts:
+        hosts[host] = {
+            'state': 'closed',  # closed, open or half_open
+            'failures': 0,  # Consecutive failures
+            'opened_at': None,
+            'trial_in_flight': False,
+            'times_opened': 0,
+            'requests_blocked': 0,
+            'resources_skipped': 0
+        }
+    return hosts[host]
+
+def circuit_allows_request(host):
+    """Return True if a request may be sent to the host, moving an expired open circuit to half-open."""
+    if not app.config.get('CIRCUIT_BREAKER_ENABLED', True):
+        return True
+    with circuit_breaker_state['lock']:
+        circuit = get_circuit(host)
+        if circuit['state'] == 'open' and \
+                time.monotonic() - circuit['opened_at'] >= app.config.get('CIRCUIT_BREAKER_RESET_TIMEOUT', 60):
+            circuit['state'] = 'half_open'
+            logger.info(f"Circuit breaker for {host} is half-open, sending a trial request")
+        if circuit['state'] == 'half_open' and not circuit['trial_in_flight']:
+            circuit['trial_in_flight'] = True
+            return True
+        if circuit['state'] == 'closed':
+            return True
+        circuit['requests_blocked'] += 1
+        record_circuit_provenance(host, circuit)
+        return False
+
+def host_circuit_open(host):
+    """Return True if requests to the host are currently being refused (without using up a trial)."""
+    if not app.config.get('CIRCUIT_BREAKER_ENABLED', True):
+        return False
+    with circuit_breaker_state['lock']:
+        circuit = circuit_breaker_state['hosts'].get(host)
+        if circuit is None or circuit['state'] == 'closed':
+            return False
+        if circuit['state'] == 'open':
+            return time.monotonic() - circuit['opened_at'] < app.config.get('CIRCUIT_BREAKER_RESET_TIMEOUT', 60)
+        return circuit['trial_in_flight']
+
+def record_circuit_outcome(host, failed):
+    """
+    Record the outcome of a request to a host: True for a failure, False for a success,
+    None when the request ended in a way that says nothing about the host's health.
+    """
+    if not app.config.get('CIRCUIT_BREAKER_ENABLED', True):
+        return
+    with circuit_breaker_state['lock']:
+        circuit = get_circuit(host)
+        was_trial = circuit['trial_in_flight']
+        circuit['trial_in_flight'] = False
+        if failed is None:
+            return
+        if not failed:
+            circuit['failures'] = 0
+            if circuit['state'] != 'closed':
+                circuit['state'] = 'closed'
+                logger.info(f"Circuit breaker for {host} closed")
+                record_circuit_provenance(host, circuit)
+            return
+
+        circuit['failures'] += 1
+        if (circuit['state'] == 'half_open' and was_trial) or \
+                (circuit['state'] == 'closed' and circuit['failures'] >= app.config.get('CIRCUIT_BREAKER_THRESHOLD', 5)):
+            circuit['state'] = 'open'
+            circuit['opened_at'] = time.monotonic()
+            circuit['times_opened'] += 1
+            logger.warning(f"Circuit breaker for {host} opened after {circuit['failures']} consecutive failures")
+            record_circuit_provenance(host, circuit)
+
+def record_circuit_skip(url):
+    """Count a resource that was skipped because its host's circuit is open."""
+    host = urlparse(url).netloc
+    with circuit_breaker_state['lock']:
+        circuit = get_circuit(host)
+        circuit['resources_skipped'] += 1
+        record_circuit_provenance(host, circuit)
+
+def record_circuit_provenance(host, circuit):
+    """Copy a host's circuit breaker counters into the crawl provenance (caller holds the lock)."""
+    crawl_state['provenance'].setdefault('circuit_breakers', {})[host] = {
+        'state': circuit['state'],
+        'times_opened': circuit['times_opened'],
+        'requests_blocked': circuit['requests_blocked'],
+        'resources_skipped': circuit['resources_skipped']
+    }
+
+def reset_circuit_breakers():
+    """Close every circuit, so hosts that failed in an earlier crawl get a fresh chance."""
+    with circuit_breaker_state['lock']:
+        circuit_breaker_state['hosts'] = {}
+
+def http_request(method, url, deadline=None, circuit=True, **kwargs):
+    """
+    Send an HTTP request through the shared pooled session.
+    Applies the default HTTP_TIMEOUT when the caller does not give one, refuses hosts whose
+    circuit breaker is open, and waits for a politeness slot for the target host unless
+    POLITENESS_ENABLED is off. With a deadline (a time.monotonic() value) the wait for a
+    slot raises HostSlotTimeout once it passes, and the timeout is cut to the time left.
+    With circuit=False (used for speculative probes) the request is still refused while the
+    circuit is open, but its outcome does not count towards the host's circuit breaker.
+    """
+    kwargs.setdefault('timeout', app.config.get('HTTP_TIMEOUT', 10))
+    host = urlparse(url).netloc
+    if is_politeness_exempt(host):
+        return get_http_session().request(method, url, **kwargs)
+
+    # Fail fast for hosts whose circuit breaker is open
+    if not (circuit_allows_request(host) if circuit else not host_circuit_open(host)):
+        raise HostCircuitOpenError(f"Circuit breaker open for {host}, not requesting {url}")
+
+    def record_outcome(failed):
+        if circuit:
+            record_circuit_outcome(host, failed)
+
+    polite = app.config.get('POLITENESS_ENABLED', True)
+    if polite:
+        try:
+            acquire_host_slot(url, deadline)
+        except HostSlotTimeout:
+            record_outcome(None)  # Give back a half-open trial that was never sent
+            raise
+    started = time.monotonic()
+    if deadline is not None and isinstance(kwargs['timeout'], (int, float)):
+        kwargs['timeout'] = max(0.01, min(kwargs['timeout'], deadline - started))
+    try:
+        response = get_http_session().request(method, url, **kwargs)
+    except RequestException as e:
+        # Only timeouts and connection failures say something about the host's health
+        record_outcome(isinstance(e, (Timeout, requests.exceptions.ConnectionError)))
+        record_host_outcome(url, latency=time.monotonic() - started, error=e)
+        raise
+    except BaseException:
+        record_outcome(None)
+        raise
+    finally:
+        if polite:
+            release_host_slot(url)
+    # Record the outcome exactly once so a failed half-open trial re-opens the circuit. A HEAD
+    # refused with 405/501 only shows the server does not implement HEAD, not that it is down
+    if not isinstance(response.status_code, int) or (method == 'HEAD' and response.status_code in (405, 501)):
+        record_outcome(None)
+    else:
+        record_outcome(response.status_code >= 500)
+    # Time to the response headers, so large bodies are not mistaken for an overloaded host
+    latency = response.elapsed.total_seconds() if isinstance(response.elapsed, datetime.timedelta) \
+        else time.monotonic() - started
+    record_host_outcome(url, response.status_code, latency, response.headers.get('Retry-After'))
+    return response
+
+def http_get(url, **kwargs):
+    """Send a GET request through the shared session (redirects followed, as requests.get)."""
+    kwargs.setdefault('allow_redirects', True)
+    return http_request('GET', url, **kwargs)
+
+def http_head(url, **kwargs):
+    """Send a HEAD request through the shared session (redirects not followed, as requests.head)."""
+    kwargs.setdefault('allow_redirects', False)
+    return http_request('HEAD', url, **kwargs)
+
+# Persistent HTTP response cache used by fetch_resource. Bodies and metadata are stored
+# on disk under HTTP_CACHE_DIR and an in-memory index tracks entry sizes in LRU order
+http_cache_state = {
+    'index': OrderedDict(),  # Cache key -> size in bytes, least recently used first
+    'total_size': 0,
+    'loaded': False,
+    'lock': threading.Lock(),
+    'stats': {
+        'hits': 0,  # Served from cache without a request
+        'revalidated': 0,  # Served from cache after a 304 Not Modified
+        'misses': 0,
+        'stored': 0,
+        'evicted': 0
+    }
+}
+
+def http_cache_paths(key):
+    """Return the (body, metadata) file paths for a cache key."""
+    cache_dir = app.config['HTTP_CACHE_DIR']
+    return os.path.join(cache_dir, f"{key}.body"), os.path.join(cache_dir, f"{key}.json")
+
+def http_cache_key(url):
+    """Build the cache key for a URL."""
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+def load_http_cache_index():
+    """Build the in-memory LRU index from the cache directory, ordered by last access time."""
+    with http_cache_state['lock']:
+        if http_cache_state['loaded']:
+            return
+        entries = []
+        cache_dir = app.config['HTTP_CACHE_DIR']
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            for name in os.listdir(cache_dir):
+                if name.endswith('.body'):
+                    stats = os.stat(os.path.join(cache_dir, name))
+                    entries.append((stats.st_mtime, name[:-5], stats.st_size))
+        except OSError as e:
+            logger.warning(f"Could not load HTTP cache index: {str(e)}")
+
+        http_cache_state['index'] = OrderedDict((key, size) for _, key, size in sorted(entries))
+        http_cache_state['total_size'] = sum(size for _, _, size in entries)
+        http_cache_state['loaded'] = True
+
+def parse_cache_control(headers):
+    """Parse a Cache-Control header into a dictionary of directives."""
+    directives = {}
+    for part in headers.get('Cache-Control', '').split(','):
+        part = part.strip().lower()
+        if not part:
+            continue
+        name, _, value = part.partition('=')
+        directives[name.strip()] = value.strip().strip('"')
+    return directives
+
+def http_cache_lookup(url):
+    """
+    Look up a cached response for a URL.
+    Returns the stored metadata (with the body under 'content') or None.
+    """
+    if not app.config.get('HTTP_CACHE_ENABLED', False):
+        return None
+    load_http_cache_index()
+    key = http_cache_key(url)
+    body_path, meta_path = http_cache_paths(key)
+
+    with http_cache_state['lock']:
+        if key not in http_cache_state['index']:
+            return None
+        try:
+            with open(meta_path, 'r') as f:
+                entry = json.load(f)
+            with open(body_path, 'rb') as f:
+                entry['content'] = f.read()
+            os.utime(body_path)  # Record the access for LRU eviction across runs
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable HTTP cache entry for {url}: {str(e)}")
+            http_cache_state['total_size'] -= http_cache_state['index'].pop(key, 0)
+            return None
+        http_cache_state['index'].move_to_end(key)
+
+    entry['headers'] = CaseInsensitiveDict(entry.get('headers', {}))
+    return entry
+
+def http_cache_is_fresh(entry):
+    """
+    Check whether a cached response can be used without contacting the server,
+    honouring Cache-Control max-age/no-cache and the Expires header.
+    """
+    directives = parse_cache_control(entry['headers'])
+    if 'no-cache' in directives:
+        return False
+    age = time.time() - entry.get('stored_at', 0)
+    if 'max-age' in directives:
+        try:
+            return age < int(directives['max-age'])
+        except ValueError:
+            return False
+    if 'Expires' in entry['headers']:
+        try:
+            expires = email.utils.parsedate_to_datetime(entry['headers']['Expires'])
+            return expires.timestamp() > time.time()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def http_cache_validators(entry):
+    """Build the conditional request headers for revalidating a cached response."""
+    headers = {}
+    if entry is None:
+        return headers
+    if entry['headers'].get('ETag'):
+        headers['If-None-Match'] = entry['headers']['ETag']
+    if entry['headers'].get('Last-Modified'):
+        headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+    return headers
+
+def http_cache_store(url, fetched):
+    """
+    Store a successful response on disk, unless Cache-Control forbids it, then evict
+    the least recently used entries while the cache exceeds HTTP_CACHE_MAX_BYTES.
+    """
+    if not app.config.get('HTTP_CACHE_ENABLED', False) or fetched['status'] != 200:
+        return
+    directives = parse_cache_control(fetched['headers'])
+    if 'no-store' in directives:
+        return
+    size = len(fetched['content'])
+    if size > app.config['HTTP_CACHE_MAX_BYTES']:
+        return
+
+    load_http_cache_index()
+    key = http_cache_key(url)
+    body_path, meta_path = http_cache_paths(key)
+    entry = {
+        'url': url,
+        'final_url': fetched['final_url'],
+        'status': fetched['status'],
+        'headers': dict(fetched['headers']),
+        'encoding': fetched['encoding'],
+        'stored_at': time.time()
+    }
+
+    with http_cache_state['lock']:
+        try:
+            with open(body_path, 'wb') as f:
+                f.write(fetched['content'])
+            with open(meta_path, 'w') as f:
+                json.dump(entry, f)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not write HTTP cache entry for {url}: {str(e)}")
+            return
+
+        http_cache_state['total_size'] -= http_cache_state['index'].pop(key, 0)
+        http_cache_state['index'][key] = size
+        http_cache_state['total_size'] += size
+        http_cache_state['stats']['stored'] += 1
+
+        # Evict least recently used entries to stay within the size bound
+        while http_cache_state['total_size'] > app.config['HTTP_CACHE_MAX_BYTES'] and len(http_cache_state['index']) > 1:
+            old_key, old_size = http_cache_state['index'].popitem(last=False)
+            http_cache_state['total_size'] -= old_size
+            http_cache_state['stats']['evicted'] += 1
+            for path in http_cache_paths(old_key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+def http_cache_refresh(url, entry, response):
+    """Update a cached entry after a 304 response, merging any updated headers."""
+    entry['headers'].update({name: value for name, value in response.headers.items()
+                             if name.lower() in ('cache-control', 'expires', 'etag', 'last-modified', 'date')})
+    meta = {k: v for k, v in entry.items() if k != 'content'}
+    meta['headers'] = dict(entry['headers'])
+    meta['stored_at'] = time.time()
+    _, meta_path = http_cache_paths(http_cache_key(url))
+    try:
+        with open(meta_path, 'w') as f:
+            json.dump(meta, f)
+    except OSError as e:
+        logger.warning(f"Could not refresh HTTP cache entry for {url}: {str(e)}")
+
+def fetched_from_cache(fetched, entry):
+    """Fill a fetch result from a cached entry."""
+    fetched['final_url'] = entry.get('final_url') or fetched['url']
+    fetched['status'] = entry['status']
+    fetched['headers'] = entry['headers']
+    fetched['content'] = entry['content']
+    fetched['content_type'] = entry['headers'].get('Content-Type', '').lower()
+    fetched['encoding'] = entry.get('encoding')
+    fetched['from_cache'] = True
+    return fetched
+
+# Learned per-host capability profiles, persisted in HOST_PROFILE_FILE between crawls.
+# They record what each host supports so discovery can skip requests that will fail
+host_profiles_state = {
+    'profiles': {},  # Host -> capability profile
+    'loaded': False,
+    'lock': threading.Lock()
+}
+
+# File extensions that identify RDF documents without content negotiation
+RDF_FILE_EXTENSIONS = ('.rdf', '.ttl', '.n3', '.jsonld', '.json', '.nt', '.nq', '.trig', '.trix')
+
+def new_host_profile():
+    """Create an empty capability profile for a host."""
+    return {
+        'head_supported': 0,  # HEAD requests answered normally
+        'head_rejected': 0,  # HEAD requests answered with 405/501
+        'responses': 0,  # Full responses received from the host
+        'link_headers': 0,  # Responses that carried a Link header
+        'conneg_requests': 0,  # Requests for URLs without an RDF file extension
+        'conneg_rdf': 0,  # ... answered with an RDF content type
+        'fallback_patterns': {}  # Fallback pattern -> {'tried': n, 'succeeded': n}
+    }
+
+def load_host_profiles():
+    """Load the persisted host profiles on first use."""
+    with host_profiles_state['lock']:
+        if host_profiles_state['loaded']:
+            return
+        try:
+            with open(app.config['HOST_PROFILE_FILE'], 'r') as f:
+                host_profiles_state['profiles'] = json.load(f)
+        except FileNotFoundError:
+            host_profiles_state['profiles'] = {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load host profiles: {str(e)}")
+            host_profiles_state['profiles'] = {}
+        host_profiles_state['loaded'] = True
+
+def save_host_profiles():
+    """Persist the host profiles so the next crawl starts with what was learned."""
+    if not host_profiles_state['loaded']:
+        return
+    path = app.config['HOST_PROFILE_FILE']
+    with host_profiles_state['lock']:
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(host_profiles_state['profiles'], f, indent=1)
+            os.replace(tmp_path, path)  # Replace atomically so a crash cannot truncate the file
+            logger.info(f"Saved {len(host_profiles_state['profiles'])} host profiles to {path}")
+        except OSError as e:
+            logger.warning(f"Could not save host profiles: {str(e)}")
+
+def update_host_profile(host, update):
+    """Apply an update function to a host's profile under the profile lock."""
+    load_host_profiles()
+    with host_profiles_state['lock']:
+        profile = host_profiles_state['profiles'].setdefault(host, new_host_profile())
+        update(profile)
+
+def get_host_profile(host):
+    """Return a copy of a host's profile (an empty profile if the host is unknown)."""
+    load_host_profiles()
+    with host_profiles_state['lock']:
+        return json.loads(json.dumps(host_profiles_state['profiles'].get(host, new_host_profile())))
+
+def record_host_head_support(host, supported):
+    """Record whether a HEAD request to the host was accepted."""
+    def update(profile):
+        profile['head_supported' if supported else 'head_rejected'] += 1
+    update_host_profile(host, update)
+
+def record_host_response(url, fetched):
+    """Record Link header and content negotiation support from a fetched response."""
+    if fetched['status'] is None:
+        return
+    rdf_response = any(ct in fetched['content_type'] for ct in ['rdf', 'turtle', 'n-triples', 'n-quads', 'json-ld', 'n3', 'trig'])
+    conneg_request = not urlparse(url).path.lower().endswith(RDF_FILE_EXTENSIONS)
+
+    def update(profile):
+        profile['responses'] += 1
+        if 'Link' in fetched['headers']:
+            profile['link_headers'] += 1
+        if conneg_request:
+            profile['conneg_requests'] += 1
+            if rdf_response:
+                profile['conneg_rdf'] += 1
+    update_host_profile(urlparse(url).netloc, update)
+
+def record_fallback_pattern(host, pattern, succeeded):
+    """Record the outcome of probing a fallback discovery pattern on a host."""
+    def update(profile):
+        stats = profile['fallback_patterns'].setdefault(pattern, {'tried': 0, 'succeeded': 0})
+        stats['tried'] += 1
+        if succeeded:
+            stats['succeeded'] += 1
+    update_host_profile(host, update)
+
+def host_rejects_head(host):
+    """Check whether the host is known to reject HEAD requests."""
+    profile = get_host_profile(host)
+    return profile['head_rejected'] >= app.config['HOST_PROFILE_MIN_SAMPLES'] and profile['head_supported'] == 0
+
+def host_lacks_conneg(host):
+    """Check whether the host is known never to serve RDF through content negotiation."""
+    profile = get_host_profile(host)
+    return profile['conneg_requests'] >= app.config['HOST_PROFILE_MIN_SAMPLES'] and profile['conneg_rdf'] == 0
+
+def order_fallback_candidates(host, candidates):
+    """
+    Filter and order fallback discovery candidates using the host profile.
+    Candidates are (url, pattern) pairs. Patterns tried at least HOST_PROFILE_MIN_SAMPLES
+    times on the host without ever succeeding are dropped, and patterns that have
+    succeeded before are moved to the front.
+    """
+    patterns = get_host_profile(host)['fallback_patterns']
+    min_samples = app.config['HOST_PROFILE_MIN_SAMPLES']
+
+    kept = [c for c in candidates
+            if not (patterns.get(c[1], {}).get('tried', 0) >= min_samples and patterns[c[1]]['succeeded'] == 0)]
+    kept.sort(key=lambda c: patterns.get(c[1], {}).get('succeeded', 0) == 0)
+
+    if len(kept) < len(candidates):
+        logger.info(f"Host profile for {host} skips {len(candidates) - len(kept)} of {len(candidates)} fallback probes")
+    return kept
+
+def fetch_resource(url, timeout=10):
+    """
+    Fetch a resource once so the response can be shared by every processing step.
+    Returns a dictionary with the requested URL, final URL after redirects, status code,
+    headers, body bytes, content type and an error message if the request failed.
+
+    The result is passed to fetch_and_parse_rdf, calculate_relevance, get_signposting_links
+    and fallback_discovery, so a crawled resource costs one round trip instead of a
+    separate HEAD or GET request in each of those functions.
+
+    Responses are kept in the persistent HTTP cache: fresh entries are served without a
+    request, and stale ones are revalidated with If-None-Match/If-Modified-Since so an
+    unchanged resource only costs a 304 response.
+
+    """
+    fetched = {
+        'url': url,
+        'final_url': url,
+        'status': None,
+        'headers': {},
+        'content': b'',
+        'content_type': '',
+        'encoding': None,
+        'error': None,
+        'from_cache': False
+    }
+
+    # Serve fresh cached responses without contacting the server
+    cached = http_cache_lookup(url)
+    if cached is not None and http_cache_is_fresh(cached):
+        with http_cache_state['lock']:
+            http_cache_state['stats']['hits'] += 1
+        logger.info(f"Using cached response for {url}")
+        return fetched_from_cache(fetched, cached)
+
+    try:
+        # The shared session supplies the crawler User-Agent and RDF-preferring Accept header
+        response = http_get(url, timeout=timeout, headers=http_cache_validators(cached))
+
+        if response.status_code == 304 and cached is not None:
+            # Unchanged since it was cached - reuse the stored body
+            with http_cache_state['lock']:
+                http_cache_state['stats']['revalidated'] += 1
+            http_cache_refresh(url, cached, response)
+            logger.info(f"Revalidated cached response for {url}")
+            return fetched_from_cache(fetched, cached)
+
+        with http_cache_state['lock']:
+            http_cache_state['stats']['misses'] += 1
+        fetched['final_url'] = response.url or url
+        fetched['status'] = response.status_code
+        fetched['headers'] = response.headers
+        fetched['content'] = response.content or b''
+        fetched['content_type'] = response.headers.get('Content-Type', '').lower()
+        fetched['encoding'] = response.encoding
+        logger.info(f"Fetched {url}: Status={response.status_code}, Content-Type={fetched['content_type']}")
+        http_cache_store(url, fetched)
+        record_host_response(url, fetched)
+    except RequestException as e:
+        fetched['error'] = f"Error fetching {url}: {str(e)}"
+        logger.error(fetched['error'])
+
+    return fetched
+
+def get_fetched_text(fetched):
+    """Decode the body of a fetched resource using its declared encoding (UTF-8 by default)."""
+    content = fetched.get('content') or b''
+    if isinstance(content, str):
+        return content
+    try:
+        return content.decode(fetched.get('encoding') or 'utf-8', errors='replace')
+    except LookupError:
+        # Unknown charset declared by the server
+        return content.decode('utf-8', errors='replace')
+
+def is_fetch_ok(fetched):
+    """Check whether a fetch completed with a successful (non-error) HTTP status."""
+    return fetched.get('error') is None and fetched.get('status') is not None and fetched['status'] < 400
+
+class HTMLMetadataExtractor(HTMLParser):
+    """
+    Collect everything the crawler needs from an HTML page in a single streaming pass:
+    <link rel> and <a rel> targets, JSON-LD script bodies, RDFa markers and microdata
+    itemtypes. Used through extract_html_metadata().
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.metadata = {
+            'links': [],  # (rel tokens, href, type) for each <link rel href>
+            'anchors': [],  # (rel tokens, href) for each <a rel href>
+            'jsonld': [],  # Bodies of <script type="application/ld+json">
+            'has_rdfa': False,  # RDFa prefixes on <html>, or property/typeof attributes
+            'itemtypes': []  # Microdata itemtype values
+        }
+        self.jsonld_buffer = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict((name, value or '') for name, value in attrs)
+        metadata = self.metadata
+        if tag == 'link' and attrs.get('rel') and attrs.get('href'):
+            metadata['links'].append((attrs['rel'].split(), attrs['href'], attrs.get('type', '').lower()))
+        elif tag == 'a' and attrs.get('rel') and attrs.get('href'):
+            metadata['anchors'].append((attrs['rel'].split(), attrs['href']))
+        elif tag == 'script' and attrs.get('type', '').strip().lower() == 'application/ld+json':
+            self.jsonld_buffer = []
+        elif tag == 'html' and ('prefix' in attrs or any(name.startswith('xmlns:') for name in attrs)):
+            metadata['has_rdfa'] = True
+
+        if 'property' in attrs or 'typeof' in attrs:
+            metadata['has_rdfa'] = True
+        if attrs.get('itemtype'):
+            metadata['itemtypes'].append(attrs['itemtype'])
+
+    def handle_startendtag(self, tag, attrs):
+        # Self-closing tags (e.g. <link ... />) carry no script body
+        if tag != 'script':
+            self.handle_starttag(tag, attrs)
+
+    def handle_data(self, data):
+        if self.jsonld_buffer is not None:
+            self.jsonld_buffer.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == 'script' and self.jsonld_buffer is not None:
+            body = ''.join(self.jsonld_buffer)
+            if body.strip():
+                self.metadata['jsonld'].append(body)
+            self.jsonld_buffer = None
+
+def extract_html_metadata(fetched):
+    """
+    Scan the body of a fetched resource once for links and embedded structured data.
+
+    The result is stored on the fetch result under 'html_metadata', so signposting,
+    fallback discovery and embedded JSON-LD parsing all share the same scan instead of
+    each building their own BeautifulSoup tree.
+    """
+    if 'html_metadata' not in fetched:
+        extractor = HTMLMetadataExtractor()
+        try:
+            extractor.feed(get_fetched_text(fetched))
+            extractor.close()
+        except Exception as e:
+            logger.warning(f"Error scanning HTML from {fetched.get('url')}: {str(e)}")
+        fetched['html_metadata'] = extractor.metadata
+    return fetched['html_metadata']
+
+def is_rdf_link_type(mime_type):
+    """Check whether the type of an alternate link indicates an RDF format."""
+    return any(rdf_type in mime_type for rdf_type in ['rdf', 'turtle', 'n-triples', 'json-ld'])
+
+
+def get_signposting_links(url, fetched=None):
     """
     Extract signposting links from HTTP headers and HTML.
     Returns a dictionary of relation types and their target URLs.
+
+    If a fetch result from fetch_resource is provided, its headers and body are reused
+    instead of requesting the URL again.
     """
     links = {}
-    
+
     try:
-        # Get HTTP headers with Accept header
-        headers = {
-            'Accept': 'application/rdf+xml, text/turtle, application/ld+json, text/n3, application/n-triples',
-            'User-Agent': 'FAIR-Signposting-Crawler/1.0 (Mozilla Compatible)'
-        }
-        # HEAD request to efficiently check headers without downloading content
-        response = requests.head(url, allow_redirects=True, timeout=10, headers=headers)
-        
+        # Fetch the resource only if the caller has not already done so
+        if fetched is None:
+            fetched = fetch_resource(url)
+        if fetched['error']:
+            return links
+
         # Check if the response includes Link headers (primary signposting method)
-        if 'Link' in response.headers:
-            link_header = response.headers['Link']
+        if 'Link' in fetched['headers']:
+            link_header = fetched['headers']['Link']
             # Parse Link header using regex to extract target URLs and relation types
             link_matches = re.findall(r'<([^>]*)>\s*;\s*rel=(?:"([^"]*)"|([^,\s]*))', link_header)
             for target, rel1, rel2 in link_matches:
@@ -149,36 +1128,29 @@ def get_signposting_links(url):
         # If no links were found in headers, try extracting them from HTML content
         if not links:
             try:
-                response = requests.get(url, timeout=10, headers=headers) # Make a full GET request to retrieve the HTML content
-                response.raise_for_status() # Raise exception for HTTP errors
-                soup = BeautifulSoup(response.text, 'html.parser') # Parse the HTML content
+                if not is_fetch_ok(fetched): # Treat HTTP errors like a failed request
+                    raise RequestException(f"HTTP status {fetched['status']}")
+                html_metadata = extract_html_metadata(fetched) # Scan the HTML content already fetched
                 
                 # Look for <link> elements with rel and href attributes (standard HTML links)
-                link_elements = soup.find_all('link', attrs={'rel': True, 'href': True})
-                for link in link_elements:
-                    # Handle rel attribute which might be a list or string depending on parser
-                    rel_attr = link.get('rel')
-                    rel = rel_attr[0] if isinstance(rel_attr, list) else rel_attr
-                    href = link.get('href')
+                link_elements = html_metadata['links']
+                for rel_tokens, href, _ in link_elements:
+                    rel = rel_tokens[0]
                     links[rel] = href
                     logger.info(f"Found signposting in HTML: {rel} -> {href}")
                 
                 # Check for a href links with rel attributes (common alternative)
-                a_links = soup.find_all('a', attrs={'rel': True, 'href': True})
-                for link in a_links:
-                    rel_attr = link.get('rel')
-                    rel = rel_attr[0] if isinstance(rel_attr, list) else rel_attr
-                    href = link.get('href')
+                a_links = html_metadata['anchors']
+                for rel_tokens, href in a_links:
+                    rel = rel_tokens[0]
                     links[rel] = href
                     logger.info(f"Found link relation in HTML anchor: {rel} -> {href}")
                 
                 # Also check for link alternates that might point to RDF resources
-                alt_links = soup.find_all('link', attrs={'rel': 'alternate', 'type': True, 'href': True})
-                for link in alt_links:
-                    mime_type = link.get('type', '').lower()
+                alt_links = [link for link in link_elements if 'alternate' in link[0] and link[2]]
+                for _, href, mime_type in alt_links:
                     # Check if the MIME type indicates an RDF format
-                    if any(rdf_type in mime_type for rdf_type in ['rdf', 'turtle', 'n-triples', 'json-ld']):
-                        href = link.get('href')
+                    if is_rdf_link_type(mime_type):
                         links['alternate'] = href
                         logger.info(f"Found alternate link to RDF: {mime_type} -> {href}")
                 
@@ -192,14 +1164,94 @@ def get_signposting_links(url):
     
     return links
 
-def fallback_discovery(url):
+def probe_rdf_variations(candidates, supported_mime_types):
+    """
+    Probe candidate URLs with HEAD requests and return the first one serving RDF, or None.
+    Candidates are (url, pattern) pairs, and the outcome of every answered probe is
+    recorded in the host capability profile under its pattern.
+
+    Candidates are probed concurrently (FALLBACK_PROBE_WORKERS) in the order given, and only
+    the first FALLBACK_PROBE_BUDGET of them are tried. When one returns an RDF content type
+    the probes of lower-priority candidates are cancelled, and the result is picked once
+    every higher-priority probe has finished, so the earliest candidate serving RDF wins
+    regardless of which host answers first. The whole probing phase is bounded by
+    FALLBACK_DISCOVERY_DEADLINE seconds so a slow or dead host cannot stall the crawl.
+    Hosts known to reject HEAD are probed with a streamed GET that reads only the headers.
+    """
+    candidates = candidates[:app.config.get('FALLBACK_PROBE_BUDGET', 20)]
+    if not candidates:
+        return None
+
+    deadline = time.monotonic() + app.config.get('FALLBACK_DISCOVERY_DEADLINE', 15)
+    done = threading.Event()  # Set once probing is finished or abandoned
+    best = {'index': len(candidates)}  # Position of the highest-priority hit so far
+
+    def probe(index, potential_url, pattern):
+        # Skip probes that are no longer needed or for which time ran out
+        remaining = deadline - time.monotonic()
+        if done.is_set() or index > best['index'] or remaining <= 0:
+            return None
+        host = urlparse(potential_url).netloc
+        headers = {'Accept': 'application/rdf+xml, text/turtle, application/n-triples, application/ld+json'}
+        try:
+            if host_rejects_head(host):
+                response = http_get(potential_url, timeout=min(5, remaining), headers=headers, stream=True,
+                                    deadline=deadline, circuit=False)
+                response.close()  # Only the headers are needed
+            else:
+                response = http_head(potential_url, timeout=min(5, remaining), headers=headers, deadline=deadline,
+                                     circuit=False)
+                record_host_head_support(host, response.status_code not in (405, 501))
+        except Exception as e:
+            logger.debug(f"Error checking {potential_url}: {str(e)}")
+            return None
+
+        found = False
+        if response.status_code == 200:
+            content_type = response.headers.get('Content-Type', '').lower()
+            # Check if content type is one of the supported RDF types
+            if any(ct in content_type for ct in supported_mime_types + ['rdf', 'turtle', 'n3', 'json-ld']):
+                logger.info(f"Found potential RDF resource at {potential_url} with Content-Type: {content_type}")
+                found = True
+        record_fallback_pattern(host, pattern, found)
+        return potential_url if found else None
+
+    found_url = None
+    futures = []
+    executor = ThreadPoolExecutor(max_workers=app.config.get('FALLBACK_PROBE_WORKERS', 8))
+    try:
+        futures = [executor.submit(probe, index, potential_url, pattern)
+                   for index, (potential_url, pattern) in enumerate(candidates)]
+        positions = {future: index for index, future in enumerate(futures)}
+        for future in concurrent.futures.as_completed(futures, timeout=max(0, deadline - time.monotonic())):
+            index = positions[future]
+            if not future.cancelled() and index < best['index'] and future.result():
+                best['index'], found_url = index, future.result()
+                for later in futures[index + 1:]:
+                    later.cancel()
+            # Stop once no higher-priority probe can still find something better
+            if found_url and all(earlier.done() for earlier in futures[:best['index']]):
+                break
+    except concurrent.futures.TimeoutError:
+        logger.info(f"Fallback probing deadline reached after {len(candidates)} candidates")
+    finally:
+        # Cancel probes that have not started and stop those about to send a request
+        done.set()
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+    return found_url
+
+def fallback_discovery(url, fetched=None):
     """
     Fallback method when no signposting is available.
     Tries to discover RDF data using common patterns.
 
     This function uses heuristics to find potential RDF resources related to a URL
     when standard signposting mechanisms aren't present. It tries common URL patterns,
-    extensions, and examines the HTML for embedded structured data.
+    extensions, and examines the HTML for embedded structured data. The HTML is taken
+    from the fetch result when one is provided.
 
     """
     potential_links = {}
@@ -243,12 +1295,18 @@ def fallback_discovery(url):
             ".well-known/void"
         ]
         
-        path_variations = [] # List of potential URL variations to check
-        path_variations.append(url)  # Include the original URL
+        # Potential URL variations to check, mapped to the pattern that produced them.
+        # The original URL is excluded and the first pattern generating a URL wins, which
+        # keeps the priority order (file extensions first, then paths, then query parameters)
+        path_variations = {}
+
+        def add_variation(variation_url, pattern):
+            if variation_url != url and variation_url not in path_variations:
+                path_variations[variation_url] = pattern
         
         # Append common RDF file extensions to the URL
         for ext in ['.rdf', '.ttl', '.jsonld', '.n3', '.nt']:
-            path_variations.append(f"{url.rstrip('/')}{ext}")
+            add_variation(f"{url.rstrip('/')}{ext}", f"ext:{ext}")
         
         # Try with common data paths
         for path in common_paths:
@@ -258,18 +1316,18 @@ def fallback_discovery(url):
                 if '.' in path_without_ext:
                     # If the path already has an extension, replace it
                     base_without_ext = path_without_ext.rsplit('.', 1)[0]
-                    path_variations.append(f"{base_url}{base_without_ext}{path}")
+                    add_variation(f"{base_url}{base_without_ext}{path}", f"replace-ext:{path}")
                 else:
                     # Otherwise just append the extension
-                    path_variations.append(f"{base_url}{path_without_ext}{path}")
+                    add_variation(f"{base_url}{path_without_ext}{path}", f"ext:{path}")
             else:
                 # Handle paths: append to current path or replace last segment
-                path_variations.append(f"{url.rstrip('/')}{path}")
+                add_variation(f"{url.rstrip('/')}{path}", f"path:{path}")
                 
                 # Try replacing the last path segment for resource-specific paths
                 if path_base != '/' and path_base != '':
                     parent_path = path_base.rsplit('/', 1)[0]
-                    path_variations.append(f"{base_url}{parent_path}{path}")
+                    add_variation(f"{base_url}{parent_path}{path}", f"parent:{path}")
         
         # Add variations with query parameters
         content_negotiation_params = [
@@ -282,78 +1340,50 @@ def fallback_discovery(url):
         ]
 
         for param in content_negotiation_params:
-            path_variations.append(f"{url}{param}")
+            add_variation(f"{url}{param}", f"param:{param}")
         
-        # Remove duplicates from the list of variations
-        path_variations = list(set(path_variations))
         logger.debug(f"Generated {len(path_variations)} path variations for {url}")
         
-        # Check each variation for RDF content
-        for potential_url in path_variations:
-            if potential_url == url:
-                continue  # Skip the original URL
-                
-            try:
-                response = requests.head(potential_url, timeout=5, 
-                                         headers={'Accept': 'application/rdf+xml, text/turtle, application/n-triples, application/ld+json'})
-                
-                if response.status_code == 200:
-                    content_type = response.headers.get('Content-Type', '').lower()
-                    content_type_base = content_type.split(';')[0].strip()  # Handle content types with parameters
-                    
-                    # Check if content type is one of the supported RDF types
-                    if any(ct in content_type for ct in supported_mime_types + ['rdf', 'turtle', 'n3', 'json-ld']):
-                        logger.info(f"Found potential RDF resource at {potential_url} with Content-Type: {content_type}")
-                        potential_links['alternate'] = potential_url
-                        break
-            except Exception as e:
-                logger.debug(f"Error checking {potential_url}: {str(e)}")
-                continue
+        # Drop patterns that never work on this host and try the ones that did first,
+        # then check the remaining variations for RDF content concurrently
+        candidates = order_fallback_candidates(parsed_url.netloc, list(path_variations.items()))
+        found_url = probe_rdf_variations(candidates, supported_mime_types)
+        if found_url:
+            potential_links['alternate'] = found_url
         
         # If no external RDF source found, check for embedded structured data
         if not potential_links:
             try:
-                response = requests.get(url, timeout=10)
-                soup = BeautifulSoup(response.text, 'html.parser')
+                if fetched is None:
+                    fetched = fetch_resource(url)
+                if fetched['error']:
+                    raise RequestException(fetched['error'])
+                html_metadata = extract_html_metadata(fetched)
                 
                 # Check for JSON-LD embedded in script tags
-                jsonld_scripts = soup.find_all('script', attrs={'type': 'application/ld+json'})
-                if jsonld_scripts:
+                if html_metadata['jsonld']:
                     # Append fragment to original URL to indicate embedded JSON-LD
                     potential_links['describedby'] = f"{url}#jsonld"
                     logger.info(f"Found embedded JSON-LD in {url}")
                     
-                # Check for RDFa attributes in HTML
-                has_rdfa = False
-                if soup.html:
-                    # Look for RDFa namespace declarations in the HTML tag
-                    if 'prefix' in soup.html.attrs or any(attr.startswith('xmlns:') for attr in soup.html.attrs):
-                        has_rdfa = True
-
-                    # Look for common RDFa attributes in any elements
-                    rdfa_attrs = soup.find_all(attrs={'property': True}) or soup.find_all(attrs={'typeof': True})
-                    if rdfa_attrs:
-                        has_rdfa = True
-                
-                if has_rdfa:
+                # Check for RDFa (prefix declarations on <html>, or property/typeof attributes)
+                if html_metadata['has_rdfa']:
                     potential_links['describedby'] = f"{url}#rdfa"
                     logger.info(f"Found RDFa in {url}")
                 
                 # Look for Microdata attributes (schema.org) - if available 
-                microdata_elems = soup.find_all(attrs={'itemtype': True})
-                if microdata_elems:
-                    for elem in microdata_elems:
-                        if 'schema.org' in elem.get('itemtype', ''):
-                            potential_links['describedby'] = f"{url}#microdata"
-                            logger.info(f"Found Microdata/schema.org in {url}")
-                            break
+                for itemtype in html_metadata['itemtypes']:
+                    if 'schema.org' in itemtype:
+                        potential_links['describedby'] = f"{url}#microdata"
+                        logger.info(f"Found Microdata/schema.org in {url}")
+                        break
                 
                 # Look for alternate links in HTML that point to RDF resources
-                for link in soup.find_all('link', attrs={'rel': 'alternate', 'href': True}):
-                    href = link.get('href')
-                    mime_type = link.get('type', '').lower()
+                for rel_tokens, href, mime_type in html_metadata['links']:
+                    if 'alternate' not in rel_tokens:
+                        continue
                     
-                    if any(rdf_type in mime_type for rdf_type in ['rdf', 'turtle', 'n-triples', 'json-ld']):
+                    if is_rdf_link_type(mime_type):
                         # Resolve relative URLs to absolute URLs
                         if not href.startswith(('http://', 'https://')):
                             if href.startswith('/'):
@@ -376,19 +1406,89 @@ def fallback_discovery(url):
     return potential_links
 
 
-def calculate_relevance(resource_url, resource_data=None):
+# Vocabularies whose use marks high-quality data when scoring relevance
+RELEVANCE_VOCABULARIES = [
+    'http://schema.org/', 
+    'http://purl.org/', 
+    'http://www.w3.org/ns/dcat#',
+    'http://purl.org/dc/terms/', 
+    'http://www.w3.org/2004/02/skos/core#',
+    'http://xmlns.com/foaf/0.1/',
+    'http://www.w3.org/ns/prov#',
+    'http://rdfs.org/ns/void#',
+    'http://www.w3.org/2002/07/owl#',
+    'http://www.w3.org/ns/oa#'
+]
+
+# Specific useful classes or properties when scoring relevance
+RELEVANCE_TERMS = set([
+    str(dcat.Dataset),
+    str(schema.Dataset),
+    str(void.Dataset),
+    str(schema.Person),
+    str(FOAF.Person),
+    str(schema.Organization),
+    str(FOAF.Organization),
+    str(schema.ScholarlyArticle),
+    str(schema.CreativeWork),
+    str(DC.title),
+    str(schema.name),
+    str(schema.description),
+    str(DC.description),
+    str(DC.creator),
+    str(schema.creator),
+    str(schema.author)
+])
+
+def new_relevance_features():
+    """Empty relevance features, filled in triple by triple with add_relevance_features."""
+    return {'triple_count': 0, 'vocab_count': 0, 'useful_count': 0}
+
+def add_relevance_features(features, found_vocabs, predicate, obj):
+    """Count one triple (predicate and object as strings) into relevance features."""
+    features['triple_count'] += 1
+    for vocab in RELEVANCE_VOCABULARIES:
+        if vocab in predicate and vocab not in found_vocabs:
+            found_vocabs.add(vocab)
+            features['vocab_count'] += 1
+    # Counting stops at 3 useful terms, which is all the score needs
+    if features['useful_count'] < 3 and (predicate in RELEVANCE_TERMS or obj in RELEVANCE_TERMS):
+        features['useful_count'] += 1
+
+def compute_relevance_features(graph):
+    """
+    Count the graph features used by calculate_relevance: the number of triples, the
+    number of important vocabularies used by predicates, and how many triples use a
+    useful class or property.
+    """
+    features = new_relevance_features()
+    found_vocabs = set()
+    for _, p, o in graph:
+        add_relevance_features(features, found_vocabs, str(p), str(o))
+    return features
+
+def calculate_relevance(resource_url, resource_data=None, fetched=None):
     """
     Calculate relevance score for a resource.
     Higher score means more relevant to the current crawl focus.
-    Scores range from 0.0 to 1.0, with higher scores indicating more 
+    Scores range from 0.0 to 1.0, with higher scores indicating more
     relevant resources that should be prioritised for processing.
+    The content type is taken from the fetch result when one is provided.
     """
     base_score = 0.3  # Start with a base score
 
-    # Check content type via HEAD request to identify RDF formats
+    # Check content type (via HEAD request if not already fetched) to identify RDF formats
     try:
-        head_resp = requests.head(resource_url, timeout=5, allow_redirects=True)
-        content_type = head_resp.headers.get('Content-Type', '').lower()
+        host = urlparse(resource_url).netloc
+        if fetched is not None:
+            content_type = fetched.get('content_type', '')
+        elif host_rejects_head(host) or (host_lacks_conneg(host) and not resource_url.lower().endswith(RDF_FILE_EXTENSIONS)):
+            # The host profile shows the HEAD request cannot return an RDF content type
+            content_type = ''
+        else:
+            head_resp = http_head(resource_url, timeout=5, allow_redirects=True)
+            record_host_head_support(host, head_resp.status_code not in (405, 501))
+            content_type = head_resp.headers.get('Content-Type', '').lower()
         # Boost score if content type indicates RDF data
         if any(ct in content_type for ct in ['rdf', 'turtle', 'n3', 'json-ld', 'xml', 'n-triples', 'n-quads', 'trig', 'trix']):
             base_score += 0.2
@@ -418,10 +1518,23 @@ def calculate_relevance(resource_url, resource_data=None):
         if resource_url.endswith(('.rdf', '.ttl', '.n3', '.jsonld', '.nt', '.nq', '.trig', '.trix')):
             base_score += 0.3
         
+        # Use the features counted by the parse stage or the streaming ingest when they
+        # belong to this data, so the graph is not scanned a second time
+        features = fetched.get('rdf_features') if fetched else None
         if resource_data and isinstance(resource_data, Graph):
+            if not features or features['triple_count'] != len(resource_data):
+                features = compute_relevance_features(resource_data)
+        elif isinstance(resource_data, NTriplesDocument):
+            if not features or features['triple_count'] != len(resource_data):
+                features = None
+        elif resource_data is not None:
+            features = None
+
+        if features:
+
             # More triples means more useful information
             # Award progressively higher scores based on triple count
-            triple_count = len(resource_data)
+            triple_count = features['triple_count']
             if triple_count > 100:
                 base_score += 0.2
             elif triple_count > 50:
@@ -429,65 +1542,16 @@ def calculate_relevance(resource_url, resource_data=None):
             elif triple_count > 10:
                 base_score += 0.05
             
-            # Check for important vocabularies == high-quality data
-            important_vocabs = set([
-                'http://schema.org/', 
-                'http://purl.org/', 
-                'http://www.w3.org/ns/dcat#',
-                'http://purl.org/dc/terms/', 
-                'http://www.w3.org/2004/02/skos/core#',
-                'http://xmlns.com/foaf/0.1/',
-                'http://www.w3.org/ns/prov#',
-                'http://rdfs.org/ns/void#',
-                'http://www.w3.org/2002/07/owl#',
-                'http://www.w3.org/ns/oa#'
-            ])
-            
-            vocab_count = 0 # Count unique vocabularies used in the graph
-            found_vocabs = set()
-            
-            # Check each predicate against known vocabulary namespaces
-            for _, p, _ in resource_data:
-                str_p = str(p)
-                for vocab in important_vocabs:
-                    if vocab in str_p and vocab not in found_vocabs:
-                        vocab_count += 1
-                        found_vocabs.add(vocab)
-            
             # Award higher scores for diverse vocabulary usage
+            vocab_count = features['vocab_count']
             if vocab_count >= 3:
                 base_score += 0.3
             elif vocab_count >= 1:
                 base_score += 0.1 * vocab_count
             
-            # Check for specific useful classes or properties
-            useful_terms = set([
-                str(dcat.Dataset),
-                str(schema.Dataset),
-                str(void.Dataset),
-                str(schema.Person),
-                str(FOAF.Person),
-                str(schema.Organization),
-                str(FOAF.Organization),
-                str(schema.ScholarlyArticle),
-                str(schema.CreativeWork),
-                str(DC.title),
-                str(schema.name),
-                str(schema.description),
-                str(DC.description),
-                str(DC.creator),
-                str(schema.creator),
-                str(schema.author)
-            ])
-            
-            # Count occurrences of useful terms
-            useful_count = 0
-            for s, p, o in resource_data:
-                if str(p) in useful_terms or str(o) in useful_terms:
-                    useful_count += 1
-                    if useful_count >= 3:
-                        base_score += 0.2
-                        break
+            # Boost graphs using specific useful classes or properties
+            if features['useful_count'] >= 3:
+                base_score += 0.2
                     
     except Exception as e:
         logger.error(f"Error calculating relevance for {resource_url}: {str(e)}")
@@ -498,72 +1562,422 @@ def calculate_relevance(resource_url, resource_data=None):
     return min(1.0, max(0.0, base_score))
 
 
-def fetch_and_parse_rdf(url):
+# Map file extensions to rdflib format names
+RDF_EXTENSION_FORMATS = {
+    '.rdf': 'xml',
+    '.ttl': 'turtle',
+    '.n3': 'n3',
+    '.jsonld': 'json-ld',
+    '.json': 'json-ld',  # Try JSON-LD for regular JSON too
+    '.nt': 'nt',
+    '.nq': 'nquads',
+    '.trig': 'trig',
+    '.trix': 'trix'
+}
+
+# Map MIME types to rdflib format names
+RDF_MIME_FORMATS = {
+    'application/rdf+xml': 'xml',
+    'text/turtle': 'turtle',
+    'text/n3': 'n3',
+    'application/n-triples': 'nt',
+    'application/ld+json': 'json-ld',
+    'application/json': 'json-ld',
+    'application/n-quads': 'nquads',
+    'application/trix': 'trix',
+    'application/trig': 'trig'
+}
+
+# Formats tried, in this order, when neither the content nor the headers identify the format
+RDF_FALLBACK_FORMATS = ['turtle', 'xml', 'json-ld', 'n3', 'nt', 'nquads', 'trig', 'trix', 'hext']
+
+# How much of a document is inspected to detect its format
+RDF_SNIFF_BYTES = 4096
+
+# Line shapes of N-Triples and N-Quads statements
+NTRIPLES_TERM = r'(?:<[^>\s]*>|_:\S+|"(?:[^"\\]|\\.)*"(?:@[A-Za-z0-9-]+|\^\^<[^>\s]*>)?)'
+NTRIPLES_LINE = re.compile(rf'^(?:<[^>\s]*>|_:\S+)\s+<[^>\s]*>\s+{NTRIPLES_TERM}\s*\.$')
+NQUADS_LINE = re.compile(rf'^(?:<[^>\s]*>|_:\S+)\s+<[^>\s]*>\s+{NTRIPLES_TERM}\s+(?:<[^>\s]*>|_:\S+)\s*\.$')
+# An N-Triples or N-Quads statement, capturing subject, predicate, object and graph
+NQUADS_STATEMENT = re.compile(rf'^((?:<[^>\s]*>|_:\S+))\s+(<[^>\s]*>)\s+({NTRIPLES_TERM})(?:\s+(<[^>\s]*>|_:\S+))?\s*\.$')
+MARKUP_START = re.compile(r'^<(\?xml|!doctype|!--|[A-Za-z][\w.:-]*(\s|>|/>|$))', re.IGNORECASE)
+# An absolute IRI such as <urn:x:1> followed by a predicate or a TriG graph block, which
+# MARKUP_START would otherwise take for a namespaced start tag
+IRI_STATEMENT_START = re.compile(r'^<[A-Za-z][\w.+-]*:[^>\s]*>\s*(?:<[^>\s]*>|a\s|[A-Za-z][\w.-]*:\S*\s|\{)')
+
+def sniff_rdf_formats(content):
     """
-    Fetch RDF data from a URL and parse it.
-    Returns a tuple of (RDF graph, error message if any, format used, content type).
+    Guess the RDF serialisation of a document from its first RDF_SNIFF_BYTES.
 
-    This function attempts to retrieve RDF data from a URL using various methods,
-    including direct parsing, content negotiation, and special handling for embedded
-    structured data. It tries multiple RDF formats and follows a fallback chain to
-    maximise the chance of successfully extracting triples.
+    Returns a list of likely rdflib format names (best first), an empty list when the
+    content is HTML, or None when the content gives no clear signal.
+    """
+    head = content[:RDF_SNIFF_BYTES] if content else b''
+    if isinstance(head, bytes):
+        if head.startswith(codecs.BOM_UTF8):
+            head = head[len(codecs.BOM_UTF8):].decode('utf-8', errors='replace')
+        elif head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+            head = head.decode('utf-16', errors='replace')
+        else:
+            head = head.decode('utf-8', errors='replace')
+    head = head.lstrip('﻿')
+
+    # Ignore blank lines and comments, and a last line that may have been cut off
+    lines = [line.strip() for line in head.splitlines()]
+    if content and len(content) > RDF_SNIFF_BYTES and len(lines) > 1:
+        lines = lines[:-1]
+    lines = [line for line in lines if line and not line.startswith('#')]
+    if not lines:
+        return None
+    first = lines[0]
+    text = '\n'.join(lines)
+    lowered = text.lower()
+
+    # Markup (an XML declaration, doctype, comment or start tag rather than an IRI):
+    # HTML (including XHTML), TriX or RDF/XML
+    if MARKUP_START.match(first) and not NQUADS_STATEMENT.match(first) and not IRI_STATEMENT_START.match(first):
+        if '<html' in lowered or lowered.startswith('<!doctype html'):
+            return []
+        if '<trix' in lowered:
+            return ['trix']
+        return ['xml']
 
+    # JSON: JSON-LD documents, or HexTuples (one JSON array per line)
+    if first.startswith('{'):
+        return ['json-ld']
+    if first.startswith('['):
+        try:
+            row = json.loads(first)
+            if isinstance(row, list) and len(row) == 6 and all(isinstance(v, str) for v in row):
+                return ['hext']
+        except ValueError:
+            pass
+        return ['json-ld']
+
+    # Turtle family: prefix or base directives
+    if re.match(r'^(@prefix|@base|prefix\s|base\s)', first, re.IGNORECASE):
+        if '=>' in text or '@forall' in lowered or '@forsome' in lowered:
+            return ['n3']
+        if re.search(r'^\s*(graph\s+)?(<[^>]*>|[\w-]*:[\w-]*|_:\S+)?\s*\{', text, re.IGNORECASE | re.MULTILINE):
+            return ['trig', 'n3']
+        return ['turtle']
+
+    # Line-based formats: every statement is a single N-Triples or N-Quads line
+    if all(NTRIPLES_LINE.match(line) for line in lines):
+        return ['nt', 'turtle']
+    if all(NTRIPLES_LINE.match(line) or NQUADS_LINE.match(line) for line in lines):
+        return ['nquads']
+
+    # Statements without directives are most likely Turtle (or TriG if graphs are used)
+    if first.startswith(('<', '_:')):
+        return ['trig', 'turtle'] if '{' in first else ['turtle', 'trig']
+    return None
+
+def detect_rdf_formats(content, content_type=None, url=None):
     """
-    # Get all supported RDF formats from rdflib
-    supported_formats = []
+    Return a ranked short list of rdflib formats to try for a document.
+
+    The content itself decides first (see sniff_rdf_formats), preferring a sniffed format
+    that agrees with the Content-Type or URL extension, followed by the formats those imply. Only when the content is
+    inconclusive but the headers or extension point to RDF are all formats tried.
+    An empty list means the document is not RDF (e.g. an HTML page).
+    """
+    content_type_base = (content_type or '').split(';')[0].strip().lower()
+    path = urlparse(url).path.lower() if url else ''
+    hints = [RDF_MIME_FORMATS.get(content_type_base)]
+    hints += [fmt for ext, fmt in RDF_EXTENSION_FORMATS.items() if path.endswith(ext)]
+    hints = [fmt for fmt in hints if fmt]
+
+    sniffed = sniff_rdf_formats(content)
+    if sniffed is None:
+        if not hints and content_type_base not in ('application/xml', 'text/xml'):
+            return []
+        candidates = hints + RDF_FALLBACK_FORMATS
+    else:
+        # Among the formats the content is compatible with, prefer the declared one
+        # (e.g. N-Triples served as text/turtle is parsed as Turtle)
+        candidates = [fmt for fmt in sniffed if fmt in hints] + sniffed + [fmt for fmt in hints if sniffed]
+
+    formats = []
+    for fmt in candidates:
+        if fmt not in formats:
+            formats.append(fmt)
+    return formats
+
+def record_format_detection(formats_tried, format_used, attempts):
+    """Record how well format detection did for one document in the format statistics."""
+    detection = crawl_state['signposting_stats'].setdefault('format_detection', {
+        'documents': 0,  # Documents that went through detection
+        'first_guess': 0,  # Parsed with the top-ranked format
+        'later_guess': 0,  # Parsed with a lower-ranked format
+        'failed': 0,  # No ranked format could parse the document
+        'parse_attempts': 0,
+        'detected': {}  # Top-ranked format -> count
+    })
+    detection['documents'] += 1
+    detection['parse_attempts'] += attempts
+    if formats_tried:
+        detection['detected'][formats_tried[0]] = detection['detected'].get(formats_tried[0], 0) + 1
+    if format_used is None:
+        detection['failed'] += 1
+    elif formats_tried and format_used == formats_tried[0]:
+        detection['first_guess'] += 1
+    else:
+        detection['later_guess'] += 1
+
+# Local cache of remote JSON-LD @context documents, shared by all threads and kept between
+# crawls in JSONLD_CONTEXT_CACHE_FILE. Contexts are stored already decoded, refreshed after
+# JSONLD_CONTEXT_TTL seconds, and at most JSONLD_CONTEXT_CACHE_SIZE are kept in memory
+jsonld_context_state = {
+    'contexts': OrderedDict(),  # Context URL -> {'document': decoded JSON, 'fetched_at': epoch seconds}
+    'loaded': False,
+    'lock': threading.Lock(),
+    'stats': {'hits': 0, 'fetched': 0, 'stale': 0}
+}
+
+# Contexts used by most of the JSON-LD the crawler meets; warm_jsonld_contexts() makes sure
+# they are cached. schema.org covers page markup and the JSON-LD exports of DataCite
+# (http://schema.org, normalised onto the same key) and Zenodo records; CodeMeta covers
+# Zenodo and DataCite software metadata, and the RO-Crate contexts research object packages
+JSONLD_SEED_CONTEXTS = [
+    'https://schema.org/',
+    'https://doi.org/10.5063/schema/codemeta-2.0',
+    'https://w3id.org/codemeta/3.0',
+    'https://w3id.org/ro/crate/1.1/context',
+    'https://w3id.org/ro/crate/1.2/context'
+]
+
+def normalise_context_url(url):
+    """Map equivalent spellings of a context URL (e.g. http/https schema.org) onto one cache key."""
+    if re.match(r'^https?://schema\.org/?$', url):
+        return 'https://schema.org/'
+    return url
+
+def load_jsonld_contexts():
+    """Load the persisted context cache on first use (the caller holds the lock)."""
+    if jsonld_context_state['loaded']:
+        return
     try:
-        # Extract formats with MIME types (those containing '/')
-        supported_formats = [format for format in (plugin.name for plugin in rdflib.plugin.plugins(kind=rdflib.plugin.Parser)) if "/" in format]
-        logger.info(f"Supported rdflib formats with MIME types: {supported_formats}")
-    except Exception as e:
-        logger.warning(f"Could not get supported RDF formats: {str(e)}")
-        # Fallback to common known formats if plugin system query fails
-        supported_formats = [
-            'application/rdf+xml', 'text/n3', 'text/turtle', 'application/n-triples', 
-            'application/ld+json', 'application/n-quads', 'application/trix', 'application/trig'
-        ]
-    
-    # Map file extensions to rdflib format names
-    ext_to_format = {
-        '.rdf': 'xml',
-        '.ttl': 'turtle',
-        '.n3': 'n3',
-        '.jsonld': 'json-ld',
-        '.json': 'json-ld',  # Try JSON-LD for regular JSON too
-        '.nt': 'nt',
-        '.nq': 'nquads',
-        '.trig': 'trig',
-        '.trix': 'trix'
-    }
-    
-    # Map MIME types to rdflib format names
-    mime_to_format = {
-        'application/rdf+xml': 'xml',
-        'text/turtle': 'turtle',
-        'text/n3': 'n3',
-        'application/n-triples': 'nt',
-        'application/ld+json': 'json-ld',
-        'application/json': 'json-ld', 
-        'application/n-quads': 'nquads',
-        'application/trix': 'trix',
-        'application/trig': 'trig'
-    }
-    
-    # Early exit for non-RDF file extensions and content types
-    if not any(url.endswith(ext) for ext in ext_to_format.keys()):
+        with open(app.config['JSONLD_CONTEXT_CACHE_FILE'], 'r') as f:
+            jsonld_context_state['contexts'] = OrderedDict(json.load(f))
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not load JSON-LD context cache: {str(e)}")
+    jsonld_context_state['loaded'] = True
+
+def save_jsonld_contexts():
+    """Persist the context cache so later crawls (and parse pool processes) reuse it."""
+    path = app.config['JSONLD_CONTEXT_CACHE_FILE']
+    with jsonld_context_state['lock']:
+        if not jsonld_context_state['loaded']:
+            return
         try:
-            head_resp = requests.head(url, timeout=5, allow_redirects=True)
-            content_type = head_resp.headers.get('Content-Type', '').lower()
-            content_type_base = content_type.split(';')[0].strip()  # Handle content types with parameters
-            
-            # Skip parsing if content type clearly indicates non-RDF content
-            if not any(ct in content_type for ct in supported_formats + ['application/xml', 'text/xml']):
-                logger.info(f"Skipping non-RDF resource based on Content-Type: {content_type}")
-                return Graph(), "Non-RDF content type", None, None
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(jsonld_context_state['contexts'], f)
+            os.replace(tmp_path, path)  # Replace atomically so a crash cannot truncate the file
+        except OSError as e:
+            logger.warning(f"Could not save JSON-LD context cache: {str(e)}")
+
+def fetch_jsonld_context(url):
+    """
+    Download a context document. Servers that answer with HTML (like schema.org) are
+    followed to the application/ld+json alternate named in their Link header.
+    """
+    response = http_get(url, headers={'Accept': 'application/ld+json, application/json;q=0.9'}, timeout=10)
+    response.raise_for_status()
+    if 'json' not in response.headers.get('Content-Type', '').lower():
+        alternate = response.links.get('alternate', {})
+        if 'json' in alternate.get('type', ''):
+            response = http_get(urljoin(response.url or url, alternate['url']),
+                                headers={'Accept': 'application/ld+json, application/json;q=0.9'}, timeout=10)
+            response.raise_for_status()
+    return response.json()
+
+def get_jsonld_context(url):
+    """
+    Return the decoded context document for a URL from the cache, fetching it when it is
+    missing or older than JSONLD_CONTEXT_TTL. A stale copy is used if the refresh fails.
+    Callers get their own copy, as the JSON-LD parser may modify the document it is given.
+    """
+    key = normalise_context_url(url)
+    contexts = jsonld_context_state['contexts']
+    with jsonld_context_state['lock']:
+        load_jsonld_contexts()
+        entry = contexts.get(key)
+        if entry is not None:
+            contexts.move_to_end(key)
+            if time.time() - entry['fetched_at'] < app.config.get('JSONLD_CONTEXT_TTL', 7 * 24 * 3600):
+                jsonld_context_state['stats']['hits'] += 1
+                return copy.deepcopy(entry['document'])
+
+    try:
+        document = fetch_jsonld_context(key)
+    except (RequestException, ValueError) as e:
+        if entry is None:
+            raise
+        logger.warning(f"Could not refresh JSON-LD context {key}, using cached copy: {str(e)}")
+        with jsonld_context_state['lock']:
+            jsonld_context_state['stats']['stale'] += 1
+        return copy.deepcopy(entry['document'])
+
+    with jsonld_context_state['lock']:
+        contexts[key] = {'document': document, 'fetched_at': time.time()}
+        contexts.move_to_end(key)
+        while len(contexts) > app.config.get('JSONLD_CONTEXT_CACHE_SIZE', 100):
+            contexts.popitem(last=False)
+        jsonld_context_state['stats']['fetched'] += 1
+    return copy.deepcopy(document)
+
+def warm_jsonld_contexts():
+    """Make sure the common JSONLD_SEED_CONTEXTS are cached, e.g. at the start of a crawl."""
+    for url in JSONLD_SEED_CONTEXTS:
+        try:
+            get_jsonld_context(url)
         except Exception as e:
-            logger.warning(f"Error checking content type: {str(e)}")
-             # Continue anyway since content type check is just an optimisation
-    
+            logger.warning(f"Could not pre-load JSON-LD context {url}: {str(e)}")
+
+def cached_source_to_json(source, *args, **kwargs):
+    """
+    Replacement for the loader rdflib's JSON-LD parser uses for remote contexts, serving
+    them from the context cache; any other source goes to rdflib's own loader.
+    """
+    if isinstance(source, str) and source.startswith(('http://', 'https://')):
+        document = get_jsonld_context(source)
+        return (document, None) if RDFLIB_SOURCE_TO_JSON_RETURNS_BASE else document
+    return rdflib_source_to_json(source, *args, **kwargs)
+
+# rdflib 7 returns (document, HTML base) from source_to_json, rdflib 6 only the document
+RDFLIB_SOURCE_TO_JSON_RETURNS_BASE = int(rdflib.__version__.split('.')[0]) >= 7
+
+# Route rdflib's remote context loading through the cache
+rdflib_source_to_json = rdflib_jsonld_context.source_to_json
+rdflib_jsonld_context.source_to_json = cached_source_to_json
+
+# Process pool for parsing large documents off the GIL, created lazily by get_parse_pool()
+parse_pool_state = {
+    'executor': None,
+    'lock': threading.Lock()
+}
+
+def get_parse_pool():
+    """Return the process pool used for parsing, creating it on first use."""
+    with parse_pool_state['lock']:
+        if parse_pool_state['executor'] is None:
+            # Spawned rather than forked workers, as forking a multi-threaded process is unsafe
+            parse_pool_state['executor'] = concurrent.futures.ProcessPoolExecutor(
+                max_workers=app.config.get('PARSE_POOL_WORKERS', 4),
+                mp_context=multiprocessing.get_context('spawn'))
+        return parse_pool_state['executor']
+
+def reset_parse_pool():
+    """Shut down the parse pool so the next parse starts a new one (e.g. after a worker crashed)."""
+    with parse_pool_state['lock']:
+        executor, parse_pool_state['executor'] = parse_pool_state['executor'], None
+    if executor is not None:
+        if sys.version_info >= (3, 9):
+            executor.shutdown(wait=False, cancel_futures=True)
+        else:
+            executor.shutdown(wait=False)  # Python 3.8 cannot cancel queued parses
+
+def parse_rdf_document(content, formats, public_id):
+    """
+    Parse a document with the first of the given formats that works.
+    Returns a dictionary with the graph, the format used, the number of parse attempts,
+    the relevance features of the graph and the errors of the failed attempts.
+    """
+    errors = []
+    for attempts, fmt in enumerate(formats, start=1):
+        try:
+            graph = Graph()
+            graph.parse(data=content, format=fmt, publicID=public_id)
+        except Exception as e:
+            errors.append(f"Parsing with format {fmt} failed: {str(e)}")
+            continue
+        return {'graph': graph, 'format': fmt, 'attempts': attempts,
+                'features': compute_relevance_features(graph), 'errors': errors}
+    return {'graph': None, 'format': None, 'attempts': len(formats), 'features': None, 'errors': errors}
+
+class NTriplesDocument:
+    """
+    The statements of a document parsed in the parse pool, kept as serialised N-Triples.
+    It stands in for the parsed graph where the crawler only needs the triple count and
+    the statements to store (store_in_fuseki calls serialize), so no rdflib graph has to
+    be built in the fetching thread. to_graph() loads it for callers that query the data.
+    """
+
+    def __init__(self, ntriples, triple_count):
+        self.ntriples = ntriples
+        self.triple_count = triple_count
+
+    def __len__(self):
+        return self.triple_count
+
+    def serialize(self, format='nt'):
+        if format != 'nt':
+            raise ValueError(f"Parsed documents are only kept as N-Triples, not {format}")
+        return self.ntriples.decode('utf-8')
+
+    def to_graph(self):
+        graph = Graph()
+        graph.parse(data=self.ntriples, format='nt')
+        return graph
+
+def parse_rdf_document_in_pool(content, formats, public_id):
+    """
+    Parse stage run in a pool process: like parse_rdf_document, but the graph is returned
+    as N-Triples bytes, which are much cheaper to send back than the graph and its indexes
+    and can be written to the store as they are.
+    """
+    result = parse_rdf_document(content, formats, public_id)
+    graph = result.pop('graph')
+    result['ntriples'] = graph.serialize(format='nt', encoding='utf-8') if graph is not None else None
+    return result
+
+def run_parse_stage(content, formats, public_id):
+    """
+    Parse a fetched document, in a pool process when it is at least PARSE_POOL_THRESHOLD
+    bytes and PARSE_POOL_WORKERS is above zero, otherwise in the calling thread.
+
+    While a pool process parses, the calling thread only waits on the result, so other
+    crawler threads keep fetching instead of queueing on the GIL behind rdflib. The
+    statements of a pooled parse come back as an NTriplesDocument in place of the graph.
+    If the pool fails the document is parsed in-thread.
+    """
+    if app.config.get('PARSE_POOL_WORKERS', 4) <= 0 or len(content) < app.config.get('PARSE_POOL_THRESHOLD', 256 * 1024):
+        return parse_rdf_document(content, formats, public_id)
+
+    try:
+        result = get_parse_pool().submit(parse_rdf_document_in_pool, content, formats, public_id).result()
+    except Exception as e:
+        logger.warning(f"Parse pool failed for {public_id}, parsing in-thread: {str(e)}")
+        reset_parse_pool()
+        return parse_rdf_document(content, formats, public_id)
+
+    ntriples = result.pop('ntriples')
+    result['graph'] = NTriplesDocument(ntriples, result['features']['triple_count']) if ntriples is not None else None
+    return result
+
+def fetch_and_parse_rdf(url, fetched=None, as_ntriples=False):
+    """
+    Fetch RDF data from a URL and parse it.
+    Returns a tuple of (RDF graph, error message if any, format used, content type).
+    With as_ntriples=True a document parsed in the parse pool is returned as an
+    NTriplesDocument rather than loaded into a graph, for callers that only count and
+    store the triples.
+
+    This function attempts to retrieve RDF data from a URL using various methods,
+    including direct parsing, content negotiation, and special handling for embedded
+    structured data. It tries multiple RDF formats and follows a fallback chain to
+    maximise the chance of successfully extracting triples.
+
+    A fetch result from fetch_resource can be passed in to reuse a response that was
+    already downloaded. For embedded data URLs (#jsonld, #rdfa) it is the fetch of the
+    page itself.
+
+    """
      # Initialise empty graph and error tracking
     g = Graph()
     error_msg = None
@@ -575,144 +1989,120 @@ def fetch_and_parse_rdf(url):
         if url.endswith('#jsonld'):
             base_url = url[:-7]  # Remove #jsonld fragment
             logger.info(f"Processing as embedded JSON-LD from {base_url}")
-            try:
-                response = requests.get(base_url, timeout=10)  # Fetch the HTML page
-                response.raise_for_status()  # Raise exception for HTTP errors
-                soup = BeautifulSoup(response.text, 'html.parser')
-                jsonld_scripts = soup.find_all('script', attrs={'type': 'application/ld+json'})
-                
-                if not jsonld_scripts:
-                    error_msg = f"No JSON-LD scripts found in {base_url}"
-                    logger.warning(error_msg)
-                    return g, error_msg, None, None
-                
-                # Try to parse each JSON-LD script found
-                for script in jsonld_scripts:
-                    try:
-                        if script.string and script.string.strip():
-                            g.parse(data=script.string, format='json-ld')
-                            logger.info(f"Successfully parsed JSON-LD script from {base_url}")
-                        else:
-                            logger.warning(f"Empty JSON-LD script found in {base_url}")
-                    except Exception as e:
-                        error_msg = f"Error parsing JSON-LD from {url}: {str(e)}"
-                        logger.error(error_msg)
-                
-                # Return results if we found any triples
-                if len(g) > 0:
-                    return g, None, 'json-ld', 'application/ld+json'
-                else:
-                    error_msg = f"No valid triples found in JSON-LD from {base_url}"
-                    return g, error_msg, None, None
-            except requests.exceptions.RequestException as e:
-                error_msg = f"Error fetching {base_url}: {str(e)}"
+            if fetched is None:
+                fetched = fetch_resource(base_url)  # Fetch the HTML page
+            if not is_fetch_ok(fetched):
+                error_msg = fetched['error'] or f"Error fetching {base_url}: HTTP status {fetched['status']}"
                 logger.error(error_msg)
                 return g, error_msg, None, None
 
+            jsonld_scripts = extract_html_metadata(fetched)['jsonld']
+
+            if not jsonld_scripts:
+                error_msg = f"No JSON-LD scripts found in {base_url}"
+                logger.warning(error_msg)
+                return g, error_msg, None, None
+
+            # Try to parse each JSON-LD script found
+            for script in jsonld_scripts:
+                try:
+                    g.parse(data=script, format='json-ld', publicID=fetched['final_url'])
+                    logger.info(f"Successfully parsed JSON-LD script from {base_url}")
+                except Exception as e:
+                    error_msg = f"Error parsing JSON-LD from {url}: {str(e)}"
+                    logger.error(error_msg)
+
+            # Return results if we found any triples
+            if len(g) > 0:
+                return g, None, 'json-ld', 'application/ld+json'
+            else:
+                error_msg = f"No valid triples found in JSON-LD from {base_url}"
+                return g, error_msg, None, None
+
         # Handle embedded RDFa    
         elif url.endswith('#rdfa'):
             base_url = url[:-5]  # Remove #rdfa fragment
             logger.info(f"Processing as RDFa from {base_url}")
+            if fetched is None:
+                fetched = fetch_resource(base_url)
+            if not is_fetch_ok(fetched):
+                error_msg = fetched['error'] or f"Error fetching {base_url}: HTTP status {fetched['status']}"
+                logger.error(error_msg)
+                return g, error_msg, None, None
             try:
-                response = requests.get(base_url, timeout=10)
-                response.raise_for_status()
-                try:
-                    g.parse(data=response.text, format='rdfa', publicID=base_url)
-                    logger.info(f"Successfully parsed RDFa from {base_url}")
-                    return g, None, 'rdfa', 'text/html'
-                except Exception as e:
-                    error_msg = f"Error parsing RDFa from {url}: {str(e)}"
-                    logger.error(error_msg)
-                    return g, error_msg, None, None
-            except requests.exceptions.RequestException as e:
-                error_msg = f"Error fetching {base_url}: {str(e)}"
+                g.parse(data=get_fetched_text(fetched), format='rdfa', publicID=base_url)
+                logger.info(f"Successfully parsed RDFa from {base_url}")
+                return g, None, 'rdfa', 'text/html'
+            except Exception as e:
+                error_msg = f"Error parsing RDFa from {url}: {str(e)}"
                 logger.error(error_msg)
                 return g, error_msg, None, None
             
         # REGULAR CASE: Process standard RDF resources
-        # Determine format from URL extension
-        format_hint = None
-        for ext, fmt in ext_to_format.items():
-            if url.endswith(ext):
-                format_hint = fmt
-                break
+        # Fetch the content once (unless the caller already did) and reuse it for every parse attempt
+        if fetched is None:
+            fetched = fetch_resource(url)
+        if fetched['error']:
+            return g, fetched['error'], None, None
+        if not is_fetch_ok(fetched):
+            error_msg = f"Error fetching content from {url}: HTTP status {fetched['status']}"
+            logger.error(error_msg)
+            return g, error_msg, None, None
+
+        content_type = fetched['content_type']
+
+        # Rank the likely formats from the content itself, the Content-Type and the extension,
+        # so normally a single parse is needed
+        formats_to_try = detect_rdf_formats(fetched['content'], content_type, url)
+        if not formats_to_try:
+            logger.info(f"Skipping non-RDF resource based on content and Content-Type: {content_type}")
+            return g, "Non-RDF content type", None, None
         
-        logger.info(f"Determined format hint from URL: {format_hint} for {url}")
+        logger.info(f"Will try parsing with formats: {formats_to_try}")
         
-        # Try to fetch and parse the RDF using the format hint
-        try:
-            g.parse(url, format=format_hint)
-            logger.info(f"Successfully parsed RDF directly from {url} with format {format_hint}")
-            return g, None, format_hint, None
-        except Exception as direct_e:
-            logger.warning(f"Direct parsing failed for {url}: {str(direct_e)}")
-            
-            # Try fetching the content first, then try multiple formats
+        # Try each format in priority order, parsing into a fresh graph so that a
+        # failed attempt cannot leave partial triples behind. Large documents are
+        # parsed in the parse pool.
+        parsed = run_parse_stage(fetched['content'], formats_to_try, fetched['final_url'])
+        for parse_error in parsed['errors']:
+            logger.warning(parse_error)
+        record_format_detection(formats_to_try, parsed['format'], parsed['attempts'])
+        if parsed['graph'] is not None:
+            logger.info(f"Successfully parsed content from {url} with format {parsed['format']}")
+            # Keep the relevance features counted while parsing for calculate_relevance
+            fetched['rdf_features'] = parsed['features']
+            graph = parsed['graph']
+            if isinstance(graph, NTriplesDocument) and not as_ntriples:
+                graph = graph.to_graph()
+            return graph, None, parsed['format'], content_type
+        
+        # If regular RDF parsing failed, check for structured data in HTML
+        # Try to detect RDFa in HTML content
+        text = get_fetched_text(fetched)
+        if '<html' in text.lower():
             try:
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                logger.info(f"Fetched content from {url}: Status={response.status_code}, Content-Type={response.headers.get('Content-Type')}")
-                
-                # Try to determine format from content type header 
-                content_type = response.headers.get('Content-Type', '').lower()
-                content_type_base = content_type.split(';')[0].strip()  # Handle content types with parameters
-                content_format = mime_to_format.get(content_type_base)
-                
-                logger.info(f"Determined format from Content-Type: {content_format} for {content_type_base}")
-                
-                formats_to_try = [] # Create prioritised list of formats to try
-                if content_format:
-                    formats_to_try.append(content_format)# First try format based on content type if available
-                if format_hint:
-                    formats_to_try.append(format_hint)# Then try format based on URL extension if available
-                
-                # Add all common formats as fallbacks
-                for fmt in ['turtle', 'xml', 'json-ld', 'n3', 'nt', 'nquads', 'trig', 'trix', 'hext']:
-                    if fmt not in formats_to_try:
-                        formats_to_try.append(fmt)
-                
-                logger.info(f"Will try parsing with formats: {formats_to_try}")
-                
-                # Try each format in priority order
-                for fmt in formats_to_try:
-                    try:
-                        g.parse(data=response.text, format=fmt)
-                        logger.info(f"Successfully parsed content from {url} with format {fmt}")
-                        return g, None, fmt, content_type
-                    except Exception as parse_e:
-                        logger.warning(f"Parsing with format {fmt} failed: {str(parse_e)}")
-                
-                # If regular RDF parsing failed, check for structured data in HTML
-                # Try to detect RDFa in HTML content
-                if '<html' in response.text.lower():
-                    try:
-                        g.parse(data=response.text, format='rdfa', publicID=url)
-                        logger.info(f"Successfully parsed as RDFa from HTML content at {url}")
-                        return g, None, 'rdfa', 'text/html'
-                    except Exception as rdfa_e:
-                        logger.warning(f"RDFa parsing failed: {str(rdfa_e)}")
-                
-                # Check for Microdata in HTML content (requires optional extension)
-                if '<html' in response.text.lower():
-                    try:
-                        from rdflib_microdata import MicrodataParser
-                        g.parse(data=response.text, format='microdata', publicID=url)
-                        logger.info(f"Successfully parsed as Microdata from HTML content at {url}")
-                        return g, None, 'microdata', 'text/html'
-                    except ImportError:
-                        logger.warning("rdflib_microdata not available, skipping Microdata parsing")
-                    except Exception as microdata_e:
-                        logger.warning(f"Microdata parsing failed: {str(microdata_e)}")
-                
-                # If all parsing attempts failed, return an empty graph with error
-                error_msg = "Failed to parse content with any known RDF format"
-                logger.error(error_msg)
-                return g, error_msg, None, content_type
-                
-            except requests.exceptions.RequestException as req_e:
-                error_msg = f"Error fetching content from {url}: {str(req_e)}"
-                logger.error(error_msg)
-                return g, error_msg, None, None
+                g.parse(data=text, format='rdfa', publicID=url)
+                logger.info(f"Successfully parsed as RDFa from HTML content at {url}")
+                return g, None, 'rdfa', 'text/html'
+            except Exception as rdfa_e:
+                logger.warning(f"RDFa parsing failed: {str(rdfa_e)}")
+        
+        # Check for Microdata in HTML content (requires optional extension)
+        if '<html' in text.lower():
+            try:
+                from rdflib_microdata import MicrodataParser
+                g.parse(data=text, format='microdata', publicID=url)
+                logger.info(f"Successfully parsed as Microdata from HTML content at {url}")
+                return g, None, 'microdata', 'text/html'
+            except ImportError:
+                logger.warning("rdflib_microdata not available, skipping Microdata parsing")
+            except Exception as microdata_e:
+                logger.warning(f"Microdata parsing failed: {str(microdata_e)}")
+        
+        # If all parsing attempts failed, return an empty graph with error
+        error_msg = "Failed to parse content with any known RDF format"
+        logger.error(error_msg)
+        return g, error_msg, None, content_type
     
     except Exception as outer_e:
         error_msg = f"Unexpected error in fetch_and_parse_rdf for {url}: {str(outer_e)}"
@@ -724,9 +2114,942 @@ def fetch_and_parse_rdf(url):
     return g, error_msg, None, None
 
 
-def store_in_fuseki(graph_data, named_graph=None, max_retries=3):
+# Shared SPARQL client for Fuseki. Every query and update goes through one pooled session
+# (keep-alive connections, gzip-encoded responses, per-call timeouts) instead of opening a
+# new SPARQLWrapper connection per call. Created lazily by get_sparql_session()
+sparql_session = None
+sparql_session_lock = threading.Lock()
+
+# Accept headers for CONSTRUCT/DESCRIBE results, by rdflib format name
+SPARQL_GRAPH_TYPES = {
+    'turtle': 'text/turtle',
+    'xml': 'application/rdf+xml',
+    'json-ld': 'application/ld+json',
+    'n3': 'text/n3',
+    'nt': 'application/n-triples'
+}
+
+def get_sparql_session():
+    """Return the shared SPARQL session, creating it on first use."""
+    global sparql_session
+    if sparql_session is None:
+        with sparql_session_lock:
+            if sparql_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=app.config.get('SPARQL_POOL_MAXSIZE', 20))
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers.update({
+                    'User-Agent': CRAWLER_USER_AGENT,
+                    'Accept-Encoding': 'gzip, deflate'
+                })
+                sparql_session = session
+    return sparql_session
+
+def reset_sparql_session():
+    """Close the shared SPARQL session so it is rebuilt with the current pool configuration."""
+    global sparql_session
+    with sparql_session_lock:
+        if sparql_session is not None:
+            sparql_session.close()
+        sparql_session = None
+
+def sparql_request(operation, text, accept, timeout=None, stream=False):
+    """POST a query or update to the dataset's /query or /update endpoint."""
+    url = f"{app.config['FUSEKI_ENDPOINT']}/{app.config['FUSEKI_DATASET']}/{operation}"
+    response = get_sparql_session().post(url, data={operation: text}, headers={'Accept': accept},
+                                         timeout=timeout or app.config.get('SPARQL_TIMEOUT', 30), stream=stream)
+    if response.status_code >= 400:
+        message = response.text[:500]
+        response.close()
+        raise requests.exceptions.HTTPError(f"SPARQL {operation} failed with status {response.status_code}: {message}",
+                                            response=response)
+    return response
+
+# Cache of SPARQL query results, keyed on the normalised query text and the dataset's write
+# generation. Every write through this client (updates and Graph Store uploads) bumps the
+# generation, which invalidates all cached results; entries are evicted in LRU order once
+# they exceed SPARQL_CACHE_MAX_BYTES. Writes made by other Fuseki clients are not seen
+sparql_cache_state = {
+    'entries': OrderedDict(),  # (generation, accept, normalised query) -> response body text
+    'bytes': 0,
+    'generation': 0,
+    'lock': threading.Lock(),
+    'stats': {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+}
+
+# String literals are kept verbatim when normalising, everything else has its whitespace collapsed
+SPARQL_NORMALISE_TOKEN = re.compile(r'("""(?:[^\\]|\\.)*?"""|\'\'\'(?:[^\\]|\\.)*?\'\'\'|"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\')|\s+')
+
+def normalise_sparql(query_text):
+    """Collapse whitespace outside string literals so formatting differences share a cache entry."""
+    return SPARQL_NORMALISE_TOKEN.sub(lambda m: m.group(1) or ' ', query_text).strip()
+
+def bump_dataset_generation():
+    """Record that the dataset changed, dropping every cached result."""
+    with sparql_cache_state['lock']:
+        sparql_cache_state['generation'] += 1
+        if sparql_cache_state['entries']:
+            sparql_cache_state['stats']['invalidations'] += 1
+        sparql_cache_state['entries'].clear()
+        sparql_cache_state['bytes'] = 0
+
+def cached_sparql_query(query_text, accept, timeout=None):
+    """Run a query through the result cache and return the response body text."""
+    if not app.config.get('SPARQL_CACHE_ENABLED', True):
+        return sparql_request('query', query_text, accept, timeout).text
+
+    with sparql_cache_state['lock']:
+        key = (sparql_cache_state['generation'], accept, normalise_sparql(query_text))
+        body = sparql_cache_state['entries'].get(key)
+        if body is not None:
+            sparql_cache_state['entries'].move_to_end(key)
+            sparql_cache_state['stats']['hits'] += 1
+            return body
+        sparql_cache_state['stats']['misses'] += 1
+
+    body = sparql_request('query', query_text, accept, timeout).text
+    size = len(body)
+    max_bytes = app.config.get('SPARQL_CACHE_MAX_BYTES', 32 * 1024 * 1024)
+    with sparql_cache_state['lock']:
+        # A result read while the dataset was being written may already be stale
+        if key[0] == sparql_cache_state['generation'] and size <= max_bytes and key not in sparql_cache_state['entries']:
+            entries = sparql_cache_state['entries']
+            entries[key] = body
+            sparql_cache_state['bytes'] += size
+            while sparql_cache_state['bytes'] > max_bytes:
+                _, evicted = entries.popitem(last=False)
+                sparql_cache_state['bytes'] -= len(evicted)
+                sparql_cache_state['stats']['evictions'] += 1
+    return body
+
+def get_sparql_cache_status():
+    """Snapshot of the result cache for the status API."""
+    with sparql_cache_state['lock']:
+        status = dict(sparql_cache_state['stats'])
+        status.update(entries=len(sparql_cache_state['entries']), bytes=sparql_cache_state['bytes'],
+                      generation=sparql_cache_state['generation'])
+    lookups = status['hits'] + status['misses']
+    status['hit_rate'] = round(status['hits'] / lookups, 3) if lookups else None
+    return status
+
+def sparql_select(query_text, timeout=None):
+    """Run a SELECT or ASK query and return the parsed SPARQL JSON results."""
+    return json.loads(cached_sparql_query(query_text, 'application/sparql-results+json, application/ld+json;q=0.9',
+                                          timeout))
+
+def sparql_ask(query_text, timeout=None):
+    """Run an ASK query and return its boolean result."""
+    return bool(sparql_select(query_text, timeout).get('boolean', False))
+
+def sparql_construct(query_text, rdf_format='turtle', timeout=None):
+    """Run a CONSTRUCT or DESCRIBE query and return the serialised graph as text."""
+    return cached_sparql_query(query_text, SPARQL_GRAPH_TYPES.get(rdf_format, 'text/turtle'), timeout)
+
+def sparql_update(update_text, timeout=None):
+    """Run a SPARQL update."""
+    try:
+        sparql_request('update', update_text, '*/*', timeout).close()
+    finally:
+        bump_dataset_generation()
+
+SPARQL_BINDINGS_START = re.compile(r'"bindings"\s*:\s*\[')
+SPARQL_BINDINGS_SEPARATOR = re.compile(r'[\s,]*')
+
+def sparql_select_bindings(query_text, timeout=None):
+    """
+    Run a SELECT query and yield its result bindings one at a time while the response is
+    still being received, so large results never have to be held in memory at once.
+    """
+    response = sparql_request('query', query_text, 'application/sparql-results+json', timeout, stream=True)
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    position = None  # Offset in buffer once the bindings array has started
+    with response:
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            buffer += text_decoder.decode(chunk)
+            if position is None:
+                match = SPARQL_BINDINGS_START.search(buffer)
+                if not match:
+                    continue
+                position = match.end()
+            while True:
+                position = SPARQL_BINDINGS_SEPARATOR.match(buffer, position).end()
+                if buffer.startswith(']', position):
+                    return
+                try:
+                    binding, position = decoder.raw_decode(buffer, position)
+                except ValueError:
+                    break  # The next binding has not been received completely yet
+                yield binding
+            buffer, position = buffer[position:], 0
+
+def gzip_chunks(chunks):
+    """Gzip-compress a stream of byte chunks on the fly."""
+    compressor = zlib.compressobj(wbits=31)  # wbits=31 writes a gzip header and trailer
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def ntriples_body(graphs, as_quads, lines_per_chunk=1000):
+    """
+    Yield an upload body for {named graph: N-Triples statements} in chunks of bytes, as
+    N-Quads (each statement placed in its graph) or as plain N-Triples.
+    """
+    for named_graph, statements in graphs.items():
+        for start in range(0, len(statements), lines_per_chunk):
+            batch = statements[start:start + lines_per_chunk]
+            if as_quads:
+                # "<s> <p> <o> ." becomes "<s> <p> <o> <g> ."
+                batch = [f"{statement.rstrip()[:-1].rstrip()} <{named_graph}> ." for statement in batch]
+            yield ('\n'.join(batch) + '\n').encode('utf-8')
+
+def post_to_graph_store(graphs, replace=()):
+    """
+    Upload {named graph: N-Triples statements} with the SPARQL Graph Store Protocol, in
+    one request per batch.
+
+    POST adds to existing graphs, like INSERT DATA. A single graph named in replace is PUT.
+    A batch of several graphs that replaces any of them is written as one SPARQL update
+    (post_sparql_insert), which Fuseki applies atomically, so the drops and the inserts
+    cannot be interleaved with another writer's batch.
+    """
+    replaced = [named_graph for named_graph in graphs if named_graph in replace]
+    if len(graphs) == 1:
+        upload_to_graph_store('PUT' if replaced else 'POST', graphs)
+    elif replaced:
+        post_sparql_insert(graphs, replace)
+    else:
+        upload_to_graph_store('POST', graphs)
+
+def upload_to_graph_store(method, graphs):
+    """
+    Send {named graph: N-Triples statements} to Fuseki in one Graph Store Protocol request.
+    A single graph is sent as N-Triples to the dataset's /data?graph= endpoint, several
+    graphs as one N-Quads document to the dataset itself. The body is streamed (chunked)
+    rather than built as one string, and gzip-compressed when FUSEKI_GZIP_UPLOADS is on.
+    """
+    dataset_url = f"{app.config['FUSEKI_ENDPOINT']}/{app.config['FUSEKI_DATASET']}"
+    if len(graphs) == 1:
+        url, params, content_type = f"{dataset_url}/data", {'graph': next(iter(graphs))}, 'application/n-triples'
+    else:
+        url, params, content_type = dataset_url, None, 'application/n-quads'
+
+    body = ntriples_body(graphs, as_quads=params is None)
+    headers = {'Content-Type': f"{content_type}; charset=utf-8"}
+    if app.config.get('FUSEKI_GZIP_UPLOADS', False):
+        body = gzip_chunks(body)
+        headers['Content-Encoding'] = 'gzip'
+
+    try:
+        response = http_request(method, url, params=params, data=body, headers=headers,
+                                timeout=app.config.get('FUSEKI_UPLOAD_TIMEOUT', 120))
+    finally:
+        bump_dataset_generation()
+    response.raise_for_status()
+
+def post_sparql_insert(graphs, replace=()):
+    """
+    Write {named graph: N-Triples statements} as one SPARQL update: INSERT DATA, preceded
+    by DROP SILENT GRAPH for the graphs named in replace.
+    """
+    drops = ''.join(f"DROP SILENT GRAPH <{named_graph}> ;\n" for named_graph in graphs if named_graph in replace)
+    graph_blocks = '\n'.join(
+        f"GRAPH <{named_graph}> {{\n{chr(10).join(statements)}\n}}" for named_graph, statements in graphs.items())
+    sparql_update(f"{drops}INSERT DATA {{\n{graph_blocks}\n}}")
+
+def write_statements_to_fuseki(graphs, max_retries=3, replace=()):
+    """
+    Write {named graph: N-Triples statements} to Fuseki with the configured
+    STORAGE_BACKEND ('gsp' for Graph Store Protocol uploads, 'sparql' for INSERT DATA),
+    retrying like store_in_fuseki. Graphs named in replace are replaced rather than
+    added to. Returns True if the write succeeded.
+    """
+    graphs = {named_graph: statements for named_graph, statements in graphs.items() if statements}
+    if not graphs:
+        return True
+    write = post_sparql_insert if app.config.get('STORAGE_BACKEND', 'gsp') == 'sparql' else post_to_graph_store
+
+    retry_count = 0
+    while retry_count < max_retries:
+        try:
+            write(graphs, replace)
+            try:
+                record_stored_statements(graphs, replace)
+            except Exception as e:
+                logger.warning(f"Could not update graph statistics: {str(e)}")
+            return True
+        except Exception as e:
+            retry_count += 1
+            logger.warning(f"Error writing to Fuseki (attempt {retry_count}/{max_retries}): {str(e)}")
+            if retry_count < max_retries:
+                time.sleep(1)
+    logger.error(f"Failed to write {sum(len(s) for s in graphs.values())} triples to Fuseki after {max_retries} attempts")
+    return False
+
+# Write-behind buffer for Fuseki: store_in_fuseki collects N-Triples per named graph and
+# they are written together in a single update once WRITE_BUFFER_MAX_TRIPLES triples are
+# waiting or the oldest has waited WRITE_BUFFER_MAX_AGE seconds (and at the end of a crawl)
+write_buffer_state = {
+    'graphs': {},  # Named graph -> list of N-Triples statements
+    'replace': set(),  # Buffered graphs whose previous contents are replaced on write
+    'triple_count': 0,
+    'oldest': None,  # time.monotonic() when the oldest buffered triples were added
+    'lock': threading.Lock(),
+    'stats': {'buffered_triples': 0, 'flushes': 0, 'failed_flushes': 0}
+}
+
+def buffer_graph_write(graph_data, named_graph, replace=False):
+    """Add a graph to the write buffer, flushing the buffer if a threshold is reached."""
+    ntriples_data = graph_data.serialize(format='nt')
+    if isinstance(ntriples_data, bytes):
+        ntriples_data = ntriples_data.decode('utf-8')
+    statements = [line for line in ntriples_data.split('\n') if line.strip()]
+
+    with write_buffer_state['lock']:
+        write_buffer_state['graphs'].setdefault(named_graph, []).extend(statements)
+        if replace:
+            write_buffer_state['replace'].add(named_graph)
+        write_buffer_state['triple_count'] += len(statements)
+        write_buffer_state['stats']['buffered_triples'] += len(statements)
+        if write_buffer_state['oldest'] is None:
+            write_buffer_state['oldest'] = time.monotonic()
+        flush_due = write_buffer_state['triple_count'] >= app.config.get('WRITE_BUFFER_MAX_TRIPLES', 50000) or \
+            time.monotonic() - write_buffer_state['oldest'] >= app.config.get('WRITE_BUFFER_MAX_AGE', 5)
+
+    if flush_due:
+        flush_write_buffer(wait=False)
+
+def flush_write_buffer(max_retries=3, wait=True):
+    """
+    Write everything in the write buffer to Fuseki in one request (a single Graph Store
+    upload or INSERT DATA update, depending on STORAGE_BACKEND).
+    The buffer is swapped out under the lock, so crawler threads can keep adding to it
+    while the update is sent. With STORAGE_WRITER_ENABLED the batch is handed to the
+    storage writer; wait=True then blocks until all queued writes are done.
+    Returns False if the update failed.
+    """
+    with write_buffer_state['lock']:
+        graphs = write_buffer_state['graphs']
+        replace = write_buffer_state['replace']
+        triple_count = write_buffer_state['triple_count']
+        write_buffer_state['graphs'] = {}
+        write_buffer_state['replace'] = set()
+        write_buffer_state['triple_count'] = 0
+        write_buffer_state['oldest'] = None
+
+    if app.config.get('STORAGE_WRITER_ENABLED', True):
+        if graphs:
+            enqueue_storage_write(graphs, triple_count, max_retries, replace)
+            with write_buffer_state['lock']:
+                write_buffer_state['stats']['flushes'] += 1
+        return wait_for_storage_writes() if wait else True
+    if not graphs:
+        return True
+
+    if write_logged_statements(graphs, max_retries, replace):
+        with write_buffer_state['lock']:
+            write_buffer_state['stats']['flushes'] += 1
+        logger.info(f"Flushed {triple_count} triples in {len(graphs)} graphs to Fuseki")
+        return True
+    with write_buffer_state['lock']:
+        write_buffer_state['stats']['failed_flushes'] += 1
+    logger.error(f"Failed to flush {triple_count} buffered triples to Fuseki")
+    return False
+
+# Write-ahead log for Fuseki writes: every batch is saved as an N-Quads segment in WAL_DIR
+# before it is sent, and the segment is deleted once Fuseki has accepted the write.
+# Segments left behind by failed writes (or a crash) are replayed in bulk before a crawl
+# starts writing and when a write succeeds again after a failure. Segment names are
+# increasing sequence numbers, and a graph replaced by a later successful write is left
+# out of the replay, so a stale segment cannot overwrite a newer copy of the graph
+wal_state = {
+    'in_flight': set(),  # Segments whose write is still queued or being sent
+    'sequence': 0,  # Sequence number of the last segment, seeded from the clock so it keeps increasing across restarts
+    'replaced_at': {},  # Named graph -> sequence of the last successful write that replaced it
+    'replay_pending': False,  # Set when a write failed, so the next successful write replays the log
+    'active_writes': 0,  # Logged writes being sent to Fuseki; a replay waits for them and holds new ones back
+    'replaying': False,
+    'lock': threading.Lock(),
+    'replay_lock': threading.Lock(),
+    'write_gate': threading.Condition(),
+    'stats': {'segments_logged': 0, 'segments_acknowledged': 0, 'segments_replayed': 0, 'replay_failures': 0}
+}
+
+def log_storage_batch(graphs, replace=()):
+    """
+    Append a batch of {named graph: statements} to the write-ahead log. Graphs to be
+    replaced are listed in '# replace <graph>' comment lines at the start of the segment.
+    Returns the segment path, or None if the log is disabled or could not be written.
+    """
+    if not app.config.get('WAL_ENABLED', True):
+        return None
+    wal_dir = app.config['WAL_DIR']
+    with wal_state['lock']:
+        wal_state['sequence'] = max(wal_state['sequence'] + 1, time.time_ns())
+        segment = os.path.join(wal_dir, f"{wal_state['sequence']:020d}.nq")
+        wal_state['in_flight'].add(segment)
+    try:
+        os.makedirs(wal_dir, exist_ok=True)
+        tmp_path = f"{segment}.tmp"
+        with open(tmp_path, 'wb') as f:
+            for named_graph in graphs:
+                if named_graph in replace:
+                    f.write(f"# replace <{named_graph}>\n".encode('utf-8'))
+            for chunk in ntriples_body(graphs, as_quads=True):
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, segment)  # A segment only appears once it is complete
+    except OSError as e:
+        logger.warning(f"Could not write to the write-ahead log: {str(e)}")
+        with wal_state['lock']:
+            wal_state['in_flight'].discard(segment)
+        return None
+    wal_state['stats']['segments_logged'] += 1
+    return segment
+
+def wal_segment_sequence(segment):
+    """The sequence number of a segment, taken from its file name."""
+    return int(os.path.basename(segment).split('.')[0].split('-')[0])
+
+def record_replaced_graphs(sequence, replace):
+    """Remember that the graphs in replace were rewritten by the write with this sequence (the caller holds the lock)."""
+    replaced_at = wal_state['replaced_at']
+    for named_graph in replace:
+        replaced_at[named_graph] = max(replaced_at.get(named_graph, 0), sequence)
+
+def complete_storage_batch(segment, written, replace=()):
+    """Delete the segment of an acknowledged write, or keep it for replay if the write failed."""
+    with wal_state['lock']:
+        if not written:
+            wal_state['replay_pending'] = True
+        if segment is None:
+            return
+        wal_state['in_flight'].discard(segment)
+        if written:
+            record_replaced_graphs(wal_segment_sequence(segment), replace)
+    if written:
+        try:
+            os.remove(segment)
+            wal_state['stats']['segments_acknowledged'] += 1
+        except OSError as e:
+            logger.warning(f"Could not remove write-ahead log segment {segment}: {str(e)}")
+
+def begin_logged_write():
+    """Wait while the write-ahead log is being replayed, then count a write as active."""
+    with wal_state['write_gate']:
+        while wal_state['replaying']:
+            wal_state['write_gate'].wait()
+        wal_state['active_writes'] += 1
+
+def end_logged_write():
+    with wal_state['write_gate']:
+        wal_state['active_writes'] -= 1
+        wal_state['write_gate'].notify_all()
+
+def write_logged_statements(graphs, max_retries=3, replace=()):
+    """Write {named graph: statements} to Fuseki through the write-ahead log."""
+    segment = log_storage_batch(graphs, replace)
+    begin_logged_write()
+    try:
+        written = write_statements_to_fuseki(graphs, max_retries, replace)
+        complete_storage_batch(segment, written, replace)
+    finally:
+        end_logged_write()
+    return written
+
+def read_wal_segment(segment):
+    """Read a segment back into {named graph: N-Triples statements} and the graphs to replace."""
+    graphs = {}
+    replace = set()
+    with open(segment, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('# replace <'):
+                replace.add(line[len('# replace <'):-1])
+                continue
+            match = NQUADS_STATEMENT.match(line)
+            if match:
+                subject, predicate, obj, graph = match.groups()
+                graphs.setdefault(graph[1:-1], []).append(f"{subject} {predicate} {obj} .")
+    return graphs, replace
+
+def get_wal_backlog():
+    """Segments waiting to be replayed, oldest first."""
+    wal_dir = app.config['WAL_DIR']
+    try:
+        names = os.listdir(wal_dir)
+    except FileNotFoundError:
+        return []
+    with wal_state['lock']:
+        in_flight = set(wal_state['in_flight'])
+    segments = (os.path.join(wal_dir, name) for name in names if name.endswith('.nq'))
+    return sorted(segment for segment in segments if segment not in in_flight)
+
+def replay_write_ahead_log(max_retries=3):
+    """
+    Write the segments left in the write-ahead log to Fuseki, combining them into batches
+    of up to WRITE_BUFFER_MAX_TRIPLES triples. Stops at the first failed batch, as Fuseki
+    is then most likely still unavailable. Returns the number of segments replayed.
+
+    Graphs that a later successful write replaced are skipped, and other logged writes
+    wait until the replay is done, so older data never lands on top of newer data.
+    """
+    if not app.config.get('WAL_ENABLED', True):
+        return 0
+    if not wal_state['replay_lock'].acquire(blocking=False):
+        return 0  # Another thread is already replaying the log
+    replayed = 0
+    with wal_state['write_gate']:
+        wal_state['replaying'] = True
+        while wal_state['active_writes']:
+            wal_state['write_gate'].wait()
+    try:
+        with wal_state['lock']:
+            wal_state['replay_pending'] = False
+        segments = get_wal_backlog()
+        max_triples = app.config.get('WRITE_BUFFER_MAX_TRIPLES', 50000)
+        batch, batch_replace, batch_segments, batch_count, batch_sequence = {}, set(), [], 0, 0
+        for index, segment in enumerate(segments):
+            try:
+                graphs, replace = read_wal_segment(segment)
+                sequence = wal_segment_sequence(segment)
+                with wal_state['lock']:
+                    replaced_at = dict(wal_state['replaced_at'])
+                for named_graph, statements in graphs.items():
+                    if replaced_at.get(named_graph, 0) > sequence:
+                        continue  # Rewritten by a later write, this copy is stale
+                    # A graph replaced by a later segment drops what earlier segments added
+                    if named_graph in replace:
+                        batch[named_graph] = []
+                    batch.setdefault(named_graph, []).extend(statements)
+                    batch_count += len(statements)
+                batch_replace |= {named_graph for named_graph in replace if replaced_at.get(named_graph, 0) <= sequence}
+                batch_segments.append(segment)
+                batch_sequence = max(batch_sequence, sequence)
+            except (OSError, UnicodeDecodeError, ValueError) as e:
+                logger.warning(f"Could not read write-ahead log segment {segment}: {str(e)}")
+
+            if batch_segments and (batch_count >= max_triples or index == len(segments) - 1):
+                if batch and not write_statements_to_fuseki(batch, max_retries, batch_replace):
+                    wal_state['stats']['replay_failures'] += 1
+                    with wal_state['lock']:
+                        wal_state['replay_pending'] = True
+                    logger.warning(f"Replaying the write-ahead log failed, {len(segments) - replayed} segments remain")
+                    break
+                for done in batch_segments:
+                    try:
+                        os.remove(done)
+                    except OSError:
+                        pass
+                with wal_state['lock']:
+                    record_replaced_graphs(batch_sequence, batch_replace)
+                replayed += len(batch_segments)
+                batch, batch_replace, batch_segments, batch_count, batch_sequence = {}, set(), [], 0, 0
+    finally:
+        with wal_state['write_gate']:
+            wal_state['replaying'] = False
+            wal_state['write_gate'].notify_all()
+        wal_state['replay_lock'].release()
+
+    if replayed:
+        wal_state['stats']['segments_replayed'] += replayed
+        logger.info(f"Replayed {replayed} write-ahead log segments to Fuseki")
+    return replayed
+
+# Storage writer: batches of {named graph: statements} are handed to STORAGE_WRITER_THREADS
+# writer threads through a queue holding at most STORAGE_QUEUE_SIZE batches, so crawler
+# threads only wait for Fuseki when the queue is full
+storage_writer_state = {
+    'queue': None,
+    'threads': [],
+    'pending_triples': 0,  # Triples queued or being written
+    'lock': threading.Lock(),
+    'stats': {'batches_written': 0, 'triples_written': 0, 'failed_batches': 0, 'failed_triples': 0,
+              'producer_waits': 0, 'last_flush_ms': None, 'flush_latency_ms': None, 'max_flush_ms': 0}
+}
+
+def get_storage_queue():
+    """Return the storage writer queue, starting the writer threads on first use."""
+    with storage_writer_state['lock']:
+        if storage_writer_state['queue'] is None:
+            storage_queue = queue.Queue(maxsize=app.config.get('STORAGE_QUEUE_SIZE', 8))
+            storage_writer_state['queue'] = storage_queue
+            storage_writer_state['threads'] = [
+                threading.Thread(target=storage_writer_loop, args=(storage_queue,),
+                                 name=f"storage-writer-{i}", daemon=True)
+                for i in range(max(1, app.config.get('STORAGE_WRITER_THREADS', 2)))
+            ]
+            for thread in storage_writer_state['threads']:
+                thread.start()
+        return storage_writer_state['queue']
+
+def storage_writer_loop(storage_queue):
+    """Write queued batches to Fuseki, recording flush latency and failures."""
+    while True:
+        graphs, triple_count, max_retries, replace, segment = storage_queue.get()
+        begin_logged_write()
+        started = time.monotonic()
+        try:
+            written = write_statements_to_fuseki(graphs, max_retries, replace)
+        except Exception as e:
+            logger.error(f"Storage writer error: {str(e)}")
+            written = False
+        elapsed_ms = (time.monotonic() - started) * 1000
+        replay_due = written and wal_state['replay_pending']
+        complete_storage_batch(segment, written, replace)
+        end_logged_write()
+
+        with storage_writer_state['lock']:
+            stats = storage_writer_state['stats']
+            storage_writer_state['pending_triples'] -= triple_count
+            if written:
+                stats['batches_written'] += 1
+                stats['triples_written'] += triple_count
+            else:
+                stats['failed_batches'] += 1
+                stats['failed_triples'] += triple_count
+            stats['last_flush_ms'] = round(elapsed_ms)
+            stats['max_flush_ms'] = max(stats['max_flush_ms'], round(elapsed_ms))
+            previous = stats['flush_latency_ms']
+            stats['flush_latency_ms'] = round(elapsed_ms if previous is None else 0.8 * previous + 0.2 * elapsed_ms)
+
+        # Fuseki is accepting writes again, so send what failed while it was unavailable
+        if replay_due:
+            try:
+                replay_write_ahead_log()
+            except Exception as e:
+                logger.error(f"Error replaying the write-ahead log: {str(e)}")
+        storage_queue.task_done()
+
+def enqueue_storage_write(graphs, triple_count, max_retries=3, replace=()):
+    """
+    Queue a batch for the storage writer, blocking while the queue is full.
+    The batch is added to the write-ahead log first.
+    """
+    storage_queue = get_storage_queue()
+    item = (graphs, triple_count, max_retries, replace, log_storage_batch(graphs, replace))
+    with storage_writer_state['lock']:
+        storage_writer_state['pending_triples'] += triple_count
+    try:
+        storage_queue.put_nowait(item)
+    except queue.Full:
+        with storage_writer_state['lock']:
+            storage_writer_state['stats']['producer_waits'] += 1
+        storage_queue.put(item)
+
+def wait_for_storage_writes():
+    """
+    Block until every queued batch has been written.
+    Returns False if a batch failed while waiting.
+    """
+    with storage_writer_state['lock']:
+        storage_queue = storage_writer_state['queue']
+        failed_before = storage_writer_state['stats']['failed_batches']
+    if storage_queue is not None:
+        storage_queue.join()
+    return storage_writer_state['stats']['failed_batches'] == failed_before
+
+def storage_writes_in_flight():
+    """Check whether statements are buffered or queued for Fuseki but not written yet."""
+    with storage_writer_state['lock']:
+        pending = storage_writer_state['pending_triples']
+    return pending > 0 or write_buffer_state['triple_count'] > 0
+
+def get_storage_writer_status():
+    """Snapshot of the write buffer and storage writer for the status API."""
+    with storage_writer_state['lock']:
+        storage_queue = storage_writer_state['queue']
+        status = dict(storage_writer_state['stats'])
+        status['queue_depth'] = storage_queue.qsize() if storage_queue is not None else 0
+        status['queue_capacity'] = app.config.get('STORAGE_QUEUE_SIZE', 8)
+        status['pending_triples'] = storage_writer_state['pending_triples']
+    status['buffered_triples'] = write_buffer_state['triple_count']
+    status['wal_backlog_segments'] = len(get_wal_backlog())
+    status['wal'] = dict(wal_state['stats'])
+    return status
+
+# Statistics about the stored knowledge graph, updated whenever a write to Fuseki succeeds
+# so the results and statistics pages never scan the store. Counts are kept per named
+# graph, so replacing a graph subtracts its old counts, and are persisted in
+# STATS_STORE_FILE. Appends are deduplicated against hashes of the statements already
+# written to each graph; graphs whose hashes are not in memory (e.g. after a restart) may
+# be over-counted until reconcile_stats_store re-syncs the counters from Fuseki, which
+# happens automatically when there is no STATS_STORE_FILE yet. Subjects are only counted
+# per graph, so a resource described in several graphs is counted once in each
+RDF_TYPE_PREDICATE = f"<{RDF.type}>"
+STATS_SAMPLE_SIZE = 20  # Typed resources kept as a sample for the results page
+
+stats_store_state = {
+    'graphs': {},  # Named graph -> {'triples', 'subjects', 'predicates': {iri: count}, 'classes': {iri: count}}
+    'triples': 0,
+    'resources': 0,  # Sum of the distinct subjects of each graph (not deduplicated across graphs)
+    'predicates': Counter(),
+    'classes': Counter(),
+    'sample_resources': {},  # Typed resource -> class
+    'seen': {},  # Named graph -> (statement hashes, subject hashes) used to deduplicate appends
+    'seen_size': 0,  # Statement hashes held in 'seen'
+    'loaded': False,
+    'reconciling': False,
+    'writes_recorded': 0,  # Writes counted so far, so a reconcile can tell if writes landed during its scan
+    'reconciled': None,  # When the counters were last re-synced from Fuseki
+    'lock': threading.Lock()
+}
+
+def apply_graph_stats(graph_stats, sign):
+    """Add (sign=1) or remove (sign=-1) one graph's counts from the totals (the caller holds the lock)."""
+    stats_store_state['triples'] += sign * graph_stats['triples']
+    stats_store_state['resources'] += sign * graph_stats['subjects']
+    for name in ('predicates', 'classes'):
+        totals = stats_store_state[name]
+        for iri, count in graph_stats[name].items():
+            totals[iri] += sign * count
+            if totals[iri] <= 0:
+                del totals[iri]
+
+def load_stats_store():
+    """Load the persisted statistics on first use (the caller holds the lock)."""
+    if stats_store_state['loaded']:
+        return
+    stats_store_state['loaded'] = True
+    try:
+        with open(app.config['STATS_STORE_FILE'], 'r') as f:
+            saved = json.load(f)
+    except FileNotFoundError:
+        # No counters were kept yet (e.g. a store filled before they existed), so build them from Fuseki
+        start_stats_reconcile()
+        return
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not load graph statistics: {str(e)}")
+        return
+    stats_store_state['sample_resources'] = saved.get('sample_resources', {})
+    stats_store_state['reconciled'] = saved.get('reconciled')
+    for named_graph, graph_stats in saved.get('graphs', {}).items():
+        stats_store_state['graphs'][named_graph] = graph_stats
+        apply_graph_stats(graph_stats, 1)
+
+def start_stats_reconcile():
+    """
+    Start reconcile_stats_store in a background thread unless one is already running
+    (the caller holds the lock). Returns True if a reconcile was started.
+    """
+    if stats_store_state['reconciling']:
+        return False
+    stats_store_state['reconciling'] = True
+    threading.Thread(target=reconcile_stats_store, daemon=True).start()
+    return True
+
+def save_stats_store():
+    """Persist the per-graph statistics so they survive restarts."""
+    path = app.config['STATS_STORE_FILE']
+    with stats_store_state['lock']:
+        if not stats_store_state['loaded']:
+            return
+        saved = {key: stats_store_state[key] for key in ('graphs', 'sample_resources', 'reconciled')}
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(saved, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not save graph statistics: {str(e)}")
+
+def count_statements(statements, seen=None):
+    """
+    Count triples, distinct subjects, predicates and classes in N-Triples statements.
+    Duplicate statements are counted once. seen is a pair of sets of statement and subject
+    hashes already in the graph; only statements and subjects not in them are counted,
+    and the sets are updated.
+    """
+    seen_statements, seen_subjects = seen if seen is not None else (set(), set())
+    predicates = Counter()
+    classes = Counter()
+    subjects = 0
+    typed = {}
+    for statement in statements:
+        match = NQUADS_STATEMENT.match(statement.strip())
+        if not match:
+            continue
+        subject, predicate, obj, _ = match.groups()
+        statement_hash = hash((subject, predicate, obj))
+        if statement_hash in seen_statements:
+            continue
+        seen_statements.add(statement_hash)
+        if hash(subject) not in seen_subjects:
+            seen_subjects.add(hash(subject))
+            subjects += 1
+        predicates[predicate[1:-1]] += 1
+        if predicate == RDF_TYPE_PREDICATE and obj.startswith('<'):
+            classes[obj[1:-1]] += 1
+            typed.setdefault(subject[1:-1], obj[1:-1])
+    graph_stats = {'triples': sum(predicates.values()), 'subjects': subjects,
+                   'predicates': dict(predicates), 'classes': dict(classes)}
+    return graph_stats, typed
+
+def record_stored_statements(graphs, replace=()):
+    """
+    Update the statistics for {named graph: statements} that Fuseki has accepted.
+    Statements already written to a graph are not counted again while the graph's hashes
+    are held in memory (up to STATS_DEDUP_MAX_STATEMENTS in total).
+    """
+    with stats_store_state['lock']:
+        load_stats_store()
+        stats_store_state['writes_recorded'] += 1
+        for named_graph, statements in graphs.items():
+            previous = stats_store_state['graphs'].get(named_graph)
+            seen = stats_store_state['seen'].pop(named_graph, None)
+            if seen is not None:
+                stats_store_state['seen_size'] -= len(seen[0])
+            if previous is None or named_graph in replace:
+                seen = (set(), set())
+            graph_stats, typed = count_statements(statements, seen)
+            if seen is not None and \
+                    stats_store_state['seen_size'] + len(seen[0]) <= app.config.get('STATS_DEDUP_MAX_STATEMENTS', 1000000):
+                stats_store_state['seen'][named_graph] = seen
+                stats_store_state['seen_size'] += len(seen[0])
+
+            if previous is not None:
+                apply_graph_stats(previous, -1)
+                if named_graph not in replace:
+                    # Appended to an existing graph: merge with its counts
+                    graph_stats['triples'] += previous['triples']
+                    graph_stats['subjects'] += previous['subjects']
+                    for name in ('predicates', 'classes'):
+                        merged = Counter(previous[name])
+                        merged.update(graph_stats[name])
+                        graph_stats[name] = dict(merged)
+            stats_store_state['graphs'][named_graph] = graph_stats
+            apply_graph_stats(graph_stats, 1)
+
+            sample = stats_store_state['sample_resources']
+            for resource, rdf_class in typed.items():
+                if len(sample) >= STATS_SAMPLE_SIZE:
+                    break
+                if resource.startswith('http') and not resource.startswith('http://example.org/'):
+                    sample.setdefault(resource, rdf_class)
+
+def get_stats_summary(limit=20):
+    """Totals and the most used predicates and classes, from the counters alone."""
+    with stats_store_state['lock']:
+        load_stats_store()
+        return {
+            'total_triples': stats_store_state['triples'],
+            'total_graphs': len(stats_store_state['graphs']),
+            'total_graph_subjects': stats_store_state['resources'],  # Distinct subjects summed over graphs
+            'predicates': [{'predicate': iri, 'count': count}
+                           for iri, count in stats_store_state['predicates'].most_common(limit)],
+            'classes': [{'class': iri, 'count': count}
+                        for iri, count in stats_store_state['classes'].most_common(limit)],
+            'sample_resources': [{'uri': uri, 'type': rdf_class}
+                                 for uri, rdf_class in stats_store_state['sample_resources'].items()],
+            'reconciled': stats_store_state['reconciled']
+        }
+
+def reconcile_stats_store():
+    """
+    Rebuild the statistics from Fuseki with grouped queries over every named graph.
+    This scans the whole store, so it is only run on request (POST /api/stats/reconcile)
+    or when no persisted counters exist.
+    The scan cannot tell which concurrent writes it saw, so if any write is recorded while
+    it runs the result is discarded and False is returned.
+    """
+    timeout = app.config.get('STATS_RECONCILE_TIMEOUT', 600)
+    graphs = {}
+    with stats_store_state['lock']:
+        writes_before = stats_store_state['writes_recorded']
+
+    def graph_entry(binding):
+        return graphs.setdefault(binding['g']['value'],
+                                 {'triples': 0, 'subjects': 0, 'predicates': {}, 'classes': {}})
+
+    try:
+        for binding in sparql_select_bindings("""
+            SELECT ?g (COUNT(*) AS ?triples) (COUNT(DISTINCT ?s) AS ?subjects)
+            WHERE { GRAPH ?g { ?s ?p ?o } }
+            GROUP BY ?g
+            """, timeout):
+            entry = graph_entry(binding)
+            entry['triples'] = int(binding['triples']['value'])
+            entry['subjects'] = int(binding['subjects']['value'])
+        for binding in sparql_select_bindings("""
+            SELECT ?g ?p (COUNT(*) AS ?count)
+            WHERE { GRAPH ?g { ?s ?p ?o } }
+            GROUP BY ?g ?p
+            """, timeout):
+            graph_entry(binding)['predicates'][binding['p']['value']] = int(binding['count']['value'])
+        for binding in sparql_select_bindings("""
+            SELECT ?g ?c (COUNT(*) AS ?count)
+            WHERE { GRAPH ?g { ?s a ?c } FILTER(isIRI(?c)) }
+            GROUP BY ?g ?c
+            """, timeout):
+            graph_entry(binding)['classes'][binding['c']['value']] = int(binding['count']['value'])
+        sample = {}
+        for binding in sparql_select_bindings(f"""
+            SELECT DISTINCT ?resource ?type
+            WHERE {{
+                GRAPH ?g {{ ?resource a ?type }}
+                FILTER(STRSTARTS(STR(?resource), "http") && !STRSTARTS(STR(?resource), "http://example.org/"))
+            }}
+            LIMIT {STATS_SAMPLE_SIZE}
+            """, timeout):
+            sample.setdefault(binding['resource']['value'], binding['type']['value'])
+    except Exception as e:
+        logger.error(f"Error reconciling graph statistics: {str(e)}")
+        return False
+    finally:
+        with stats_store_state['lock']:
+            stats_store_state['reconciling'] = False
+
+    with stats_store_state['lock']:
+        if stats_store_state['writes_recorded'] != writes_before:
+            logger.warning("Graph statistics were not reconciled: writes reached Fuseki during the scan")
+            return False
+        stats_store_state.update({'graphs': {}, 'triples': 0, 'resources': 0, 'predicates': Counter(),
+                                  'classes': Counter(), 'sample_resources': sample, 'seen': {},
+                                  'seen_size': 0, 'loaded': True,
+                                  'reconciled': datetime.datetime.now().isoformat()})
+        for named_graph, graph_stats in graphs.items():
+            stats_store_state['graphs'][named_graph] = graph_stats
+            apply_graph_stats(graph_stats, 1)
+    save_stats_store()
+    logger.info(f"Reconciled graph statistics: {stats_store_state['triples']} triples in {len(graphs)} graphs")
+    return True
+
+def canonical_resource_url(url):
+    """
+    Canonical form of a resource URL used to name its graph: lower-case scheme and host,
+    no default port and a '/' path for bare hosts. Fragments are kept, as embedded data
+    (e.g. #jsonld) is stored apart from the page's own RDF.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme, netloc.rsplit(':', 1)[-1]) in (('http', '80'), ('https', '443')):
+        netloc = netloc.rsplit(':', 1)[0]
+    return urlunsplit((scheme, netloc, parts.path or '/', parts.query, parts.fragment))
+
+def resource_graph_name(url):
+    """
+    Named graph for the RDF retrieved from a resource. The name only depends on the
+    canonical resource URL (and the crawl ID with GRAPH_NAME_PER_CRAWL), so storing a
+    resource again replaces its graph instead of adding duplicates.
+    """
+    canonical = canonical_resource_url(url)
+    if app.config.get('GRAPH_NAME_PER_CRAWL', False):
+        return f"http://crawl.data/{crawl_state['crawl_id']}/resource/{quote(canonical, safe='')}"
+    return canonical
+
+def store_in_fuseki(graph_data, named_graph=None, max_retries=3, replace=False):
     """
     Store the RDF graph in Fuseki with retry mechanism.
+    With WRITE_BUFFER_ENABLED the graph is added to the write-behind buffer and written
+    with other buffered graphs by flush_write_buffer. With replace=True the named graph's
+    previous contents are replaced (PUT semantics) rather than added to.
     """
     # Skip empty graphs
     if len(graph_data) == 0:
@@ -738,27 +3061,31 @@ def store_in_fuseki(graph_data, named_graph=None, max_retries=3):
         timestamp = datetime.datetime.now().strftime('%Y%m%d%H%M%S')
         # Generate a more meaningful named graph identifier based on the crawl ID
         named_graph = f"http://crawl.data/{crawl_state['crawl_id']}/graph/{timestamp}"
+
+    if app.config.get('WRITE_BUFFER_ENABLED', True):
+        buffer_graph_write(graph_data, named_graph, replace)
+        return True
+
+    if replace or app.config.get('STORAGE_BACKEND', 'gsp') == 'gsp':
+        ntriples_data = graph_data.serialize(format='nt')
+        if isinstance(ntriples_data, bytes):
+            ntriples_data = ntriples_data.decode('utf-8')
+        statements = [line for line in ntriples_data.split('\n') if line.strip()]
+        if write_logged_statements({named_graph: statements}, max_retries, {named_graph} if replace else ()):
+            logger.info(f"Stored {len(graph_data)} triples in Fuseki named graph: {named_graph}")
+            return True
+        return False
     
     retry_count = 0 # Implement retry logic
     while retry_count < max_retries:
         try:
-            # Set up SPARQL endpoint for updates
-            sparql = SPARQLWrapper(f"{app.config['FUSEKI_ENDPOINT']}/{app.config['FUSEKI_DATASET']}/update")
-            sparql.setMethod('POST')
-            sparql.setRequestMethod('POST')  # Explicitly set request method
-            sparql.setReturnFormat(JSON)    # Set a return format
-            
             # First check if the graph already exists
-            check_sparql = SPARQLWrapper(f"{app.config['FUSEKI_ENDPOINT']}/{app.config['FUSEKI_DATASET']}/query")
-            check_sparql.setReturnFormat(JSON)
-            check_sparql.setQuery(f"""
+            graph_exists = sparql_ask(f"""
             ASK WHERE {{ 
                 GRAPH <{named_graph}> {{ ?s ?p ?o }} 
             }}
             """)
-            
-            result = check_sparql.query().convert()
-            if result.get('boolean', False):
+            if graph_exists:
                 # The graph exists - use merge approach
                 logger.info(f"Graph {named_graph} already exists, merging new data")
                 
@@ -791,9 +3118,8 @@ def store_in_fuseki(graph_data, named_graph=None, max_retries=3):
                         }}
                         """
                         
-                        sparql.setQuery(update_query)
                         try:
-                            sparql.query()
+                            sparql_update(update_query)
                             logger.info(f"Stored chunk {i+1}/{len(chunks)} in graph {named_graph}")
                         except Exception as chunk_e:
                             logger.error(f"Error storing chunk {i+1}: {str(chunk_e)}")
@@ -806,8 +3132,7 @@ def store_in_fuseki(graph_data, named_graph=None, max_retries=3):
                     }}
                     """
                     
-                    sparql.setQuery(update_query)
-                    sparql.query()
+                    sparql_update(update_query)
             else:
                 # The graph doesn't exist, create it with the data
                 try:
@@ -837,8 +3162,7 @@ def store_in_fuseki(graph_data, named_graph=None, max_retries=3):
                     }}
                     """
                 
-                sparql.setQuery(update_query)  # Execute the update query
-                sparql.query()
+                sparql_update(update_query)  # Execute the update query
             # Success! Log and return
             logger.info(f"Stored {len(graph_data)} triples in Fuseki named graph: {named_graph}")
             return True
@@ -855,6 +3179,146 @@ def store_in_fuseki(graph_data, named_graph=None, max_retries=3):
     return False
 
 
+# Media types a streamed .nt/.nq resource may be served with; other responses (e.g. an
+# HTML error page) are handled by the regular fetch and parse path
+LINE_BASED_RDF_TYPES = ('application/n-triples', 'application/n-quads', 'text/plain', 'application/octet-stream', '')
+
+def is_line_based_rdf_url(url):
+    """Check whether a URL names an N-Triples or N-Quads document that can be streamed."""
+    return app.config.get('STREAM_INGEST_ENABLED', True) and urlparse(url).path.lower().endswith(('.nt', '.nq'))
+
+def skolem_prefix(url):
+    """
+    Return the IRI prefix used to skolemise the blank nodes of a streamed document. The
+    prefix is stable per document URL, so a blank node label keeps naming the same node
+    across chunks (and across re-crawls) while labels from different documents never meet.
+    """
+    parsed = urlparse(url)
+    document_id = hashlib.sha1(urldefrag(url)[0].encode('utf-8')).hexdigest()[:16]
+    return f"{parsed.scheme}://{parsed.netloc}/.well-known/genid/{document_id}/"
+
+def skolemize_term(term, prefix):
+    """Replace a blank node term like _:b0 with an IRI under the document's skolem prefix."""
+    if term.startswith('_:'):
+        return f"<{prefix}{quote(term[2:], safe='')}>"
+    return term
+
+def store_ntriples_in_fuseki(ntriples_lines, named_graph, max_retries=3, replace=False):
+    """
+    Store a chunk of N-Triples statements in a named graph with the configured storage
+    backend, through the storage writer if it is enabled. Blank node labels are only
+    shared within one chunk. A chunk that replaces the graph is written directly, so a
+    writer thread cannot add the following chunks before the old contents are dropped.
+    """
+    if app.config.get('STORAGE_WRITER_ENABLED', True) and not replace:
+        enqueue_storage_write({named_graph: list(ntriples_lines)}, len(ntriples_lines), max_retries)
+        return True
+    return write_logged_statements({named_graph: ntriples_lines}, max_retries, {named_graph} if replace else ())
+
+def stream_ingest_rdf(url, source="direct_rdf"):
+    """
+    Stream an N-Triples or N-Quads document into Fuseki without building an rdflib graph.
+
+    Lines are validated one at a time (invalid ones are skipped) and sent to the resource's
+    named graph in chunks of STREAM_INGEST_CHUNK_TRIPLES, while the triple count and
+    relevance features are counted on the fly, so memory use does not grow with the size
+    of the document. Graph labels of N-Quads are dropped, as with the regular parse path.
+    Blank nodes are skolemised with a per-document prefix, since chunks are written in
+    separate updates, and the stream stops once the crawl's MAX_TRIPLES budget is used up.
+    Provenance is recorded with the given source type.
+
+    Returns a fetch result with the response headers (no body) and the relevance features
+    once the document was streamed, or None if the response is not line-based RDF, in
+    which case the caller falls back to fetch_resource.
+    """
+    try:
+        response = http_get(url, stream=True, headers={
+            'Accept': 'application/n-triples, application/n-quads;q=0.9, */*;q=0.1'})
+    except RequestException as e:
+        logger.warning(f"Could not stream {url}: {str(e)}")
+        return None
+
+    with response:
+        content_type = response.headers.get('Content-Type', '').lower()
+        if response.status_code >= 400 or content_type.split(';')[0].strip() not in LINE_BASED_RDF_TYPES:
+            return None
+
+        chunk_size = app.config.get('STREAM_INGEST_CHUNK_TRIPLES', 5000)
+        budget = app.config.get('MAX_TRIPLES', 10000) - crawl_state['provenance'].get('triples_collected', 0)
+        graph_name = resource_graph_name(url)
+        prefix = skolem_prefix(url)
+        features = new_relevance_features()
+        found_vocabs = set()
+        chunk = []
+        invalid_lines = 0
+        is_quads = False
+        stored = True
+        stored_count = 0
+        try:
+            for raw_line in response.iter_lines(chunk_size=64 * 1024):
+                try:
+                    line = raw_line.decode('utf-8').strip()
+                except UnicodeDecodeError:
+                    invalid_lines += 1
+                    continue
+                if not line or line.startswith('#'):
+                    continue
+
+                match = NQUADS_STATEMENT.match(line)
+                if not match:
+                    # A document that does not start with a statement is not N-Triples after all
+                    if features['triple_count'] == 0 and invalid_lines == 0:
+                        logger.info(f"{url} is not line-based RDF, parsing it normally")
+                        return None
+                    invalid_lines += 1
+                    continue
+
+                if features['triple_count'] >= budget:
+                    logger.info(f"Stopped streaming {url}: MAX_TRIPLES budget reached")
+                    break
+
+                subject, predicate, obj, graph = match.groups()
+                is_quads = is_quads or graph is not None
+                subject, obj = skolemize_term(subject, prefix), skolemize_term(obj, prefix)
+                chunk.append(f"{subject} {predicate} {obj} .")
+                add_relevance_features(features, found_vocabs, predicate[1:-1], obj[1:-1] if obj.startswith('<') else obj)
+
+                if len(chunk) >= chunk_size:
+                    stored = store_ntriples_in_fuseki(chunk, graph_name, replace=stored_count == 0)
+                    if not stored:
+                        break
+                    stored_count += len(chunk)
+                    chunk = []
+            if chunk and stored:
+                stored = store_ntriples_in_fuseki(chunk, graph_name, replace=stored_count == 0)
+                if stored:
+                    stored_count += len(chunk)
+        except RequestException as e:
+            logger.error(f"Error streaming {url}: {str(e)}")
+            stored = False
+
+    format_used = 'nquads' if is_quads else 'nt'
+    if invalid_lines:
+        logger.warning(f"Skipped {invalid_lines} invalid lines while streaming {url}")
+    logger.info(f"Streamed {stored_count} of {features['triple_count']} triples from {url} into Fuseki ({format_used})")
+
+    fetched = {
+        'url': url,
+        'final_url': response.url or url,
+        'status': response.status_code,
+        'headers': response.headers,
+        'content': b'',
+        'content_type': content_type,
+        'encoding': response.encoding,
+        'error': None if stored else 'Storing streamed triples in Fuseki failed',
+        'from_cache': False,
+        'rdf_features': features
+    }
+    crawl_state['resource_scores'][url] = calculate_relevance(url, None, fetched)
+    if stored_count > 0:
+        record_provenance(url, source, stored_count, format_used, content_type)
+    return fetched
+
 def record_format_statistics(url, content_type, format_used, rel_type=None):
     """
     Record statistics about RDF formats and content types found.
@@ -977,26 +3441,41 @@ def crawl_resource(url, depth=0):
         logger.debug(f"Skipping already visited URL: {url}")
         return []
     
+    # Defer resources on hosts whose circuit breaker is open; they are not marked as
+    # visited, so they can be queued again if rediscovered after the host recovers
+    if host_circuit_open(urlparse(url).netloc):
+        logger.info(f"Skipping {url}: circuit breaker open for its host")
+        record_circuit_skip(url)
+        return []
+
     logger.info(f"Crawling resource at depth {depth}: {url}")
     crawl_state['visited_urls'].add(url)
     crawl_state['current_depth'] = depth
     
-    # Try to directly parse the URL as RDF
-    direct_graph, direct_error, format_used, content_type = fetch_and_parse_rdf(url)
+    # N-Triples and N-Quads dumps are streamed straight into the triple store; anything
+    # else is fetched once and the response is shared by parsing, scoring and link discovery
+    streamed = stream_ingest_rdf(url) if is_line_based_rdf_url(url) else None
+    fetched = streamed or fetch_resource(url)
+
+    # Try to directly parse the URL as RDF (a streamed dump is already stored)
+    if streamed:
+        direct_graph, direct_error, format_used, content_type = Graph(), None, None, None
+    else:
+        direct_graph, direct_error, format_used, content_type = fetch_and_parse_rdf(url, fetched, as_ntriples=True)
     if len(direct_graph) > 0:
         # RDF data found directly at this URL
         triple_count = len(direct_graph)
         logger.info(f"Found {triple_count} triples directly at {url} using format {format_used}")
         
         # Calculate relevance
-        relevance = calculate_relevance(url, direct_graph)
+        relevance = calculate_relevance(url, direct_graph, fetched)
         crawl_state['resource_scores'][url] = relevance
         
         # Store in Fuseki if it meets the relevance threshold
         if relevance >= app.config['RELEVANCE_THRESHOLD']:
             try:
-                graph_name = url  # Use the resource URL directly as graph name
-                success = store_in_fuseki(direct_graph, graph_name)
+                graph_name = resource_graph_name(url)
+                success = store_in_fuseki(direct_graph, graph_name, replace=True)
                 if success:
                     record_provenance(url, "direct_rdf", triple_count, format_used, content_type)
                     logger.info(f"Stored direct RDF from {url} into {graph_name} in Fuseki")
@@ -1006,12 +3485,12 @@ def crawl_resource(url, depth=0):
                 logger.error(f"Exception storing direct RDF from {url} in Fuseki: {str(e)}")
     
     # Find links to related resources using standard signposting mechanisms
-    links = get_signposting_links(url)
+    links = get_signposting_links(url, fetched)
     
     # If no signposting found, try fallback methods
     if not links:
         logger.info(f"No signposting found at {url}, trying fallback discovery")
-        links = fallback_discovery(url)
+        links = fallback_discovery(url, fetched)
     
     logger.info(f"Found links at {url}: {links}")
     
@@ -1063,14 +3542,28 @@ def crawl_resource(url, depth=0):
         
         # Try to fetch and parse RDF from linked resource
         try:
-            rdf_graph, error_msg, format_used, content_type = fetch_and_parse_rdf(target_url)
+            # Links into the current page (e.g. #jsonld, #rdfa) reuse the page already fetched
+            if urldefrag(target_url)[0] == urldefrag(url)[0]:
+                target_fetched = fetched
+            else:
+                # Linked N-Triples and N-Quads dumps are streamed like direct ones; the dump
+                # is marked as visited so it is not downloaded a second time at the next depth
+                if is_line_based_rdf_url(target_url):
+                    streamed_target = stream_ingest_rdf(target_url, f"signposting:{rel}")
+                    if streamed_target:
+                        crawl_state['visited_urls'].add(target_url)
+                        continue
+                target_fetched = fetch_resource(target_url)
+
+            rdf_graph, error_msg, format_used, content_type = fetch_and_parse_rdf(target_url, target_fetched,
+                                                                                  as_ntriples=True)
             triple_count = len(rdf_graph)
             
             if triple_count > 0: # RDF found at linked resource
                 logger.info(f"Found {triple_count} triples at linked resource {target_url} using format {format_used}")
                 
                 # Calculate relevance with priority boost for important links
-                relevance = calculate_relevance(target_url, rdf_graph)
+                relevance = calculate_relevance(target_url, rdf_graph, target_fetched)
                 if priority_rel:
                     relevance += 0.1  # Boost for priority relation
                 relevance += repository_boost
@@ -1081,7 +3574,7 @@ def crawl_resource(url, depth=0):
                 # If relevant enough, store in Fuseki
                 if relevance >= app.config['RELEVANCE_THRESHOLD']:
                     try:
-                        success = store_in_fuseki(rdf_graph)
+                        success = store_in_fuseki(rdf_graph, resource_graph_name(target_url), replace=True)
                         if success:
                             record_provenance(target_url, f"signposting:{rel}", triple_count, format_used, content_type)
                             discovered_urls.append(target_url)
@@ -1107,9 +3600,11 @@ def crawl_resource(url, depth=0):
     # Return list of newly discovered URLs for the crawler to process next
     return discovered_urls
 
-def should_continue_crawl():
+def should_continue_crawl(check_progress=True):
     """
     Determine if the crawl should continue based on various heuristics.
+    The no-progress heuristic is only evaluated (and its counters updated) when
+    check_progress is True.
     """
     # Check if we've reached max depth configured in the application
     if crawl_state['current_depth'] >= app.config['MAX_CRAWL_DEPTH']:
@@ -1132,6 +3627,9 @@ def should_continue_crawl():
         logger.info(f"Stopping crawl: visited maximum number of resources ({len(crawl_state['visited_urls'])})")
         return False
     
+    if not check_progress:
+        return True
+
     # Check if we're making progress - stops if no new triples are being found
     if crawl_state.get('last_triples_count') == crawl_state['provenance'].get('triples_collected', 0) and \
        crawl_state.get('no_progress_count', 0) > 3:
@@ -1273,6 +3771,17 @@ def export_provenance():
             prov_g.add((resource_uri, DC.type, Literal(resource['source_type'])))
             # Record the depth at which this resource was found
             prov_g.add((resource_uri, schema.position, Literal(resource['crawl_depth'], datatype=XSD.integer)))
+
+    # Record hosts that were skipped because their circuit breaker opened
+    for host, circuit in crawl_state['provenance'].get('circuit_breakers', {}).items():
+        host_uri = URIRef(f"http://crawl.data/{crawl_state['crawl_id']}/host/{quote(host)}")
+        prov_g.add((host_uri, RDF.type, prov.Entity))
+        prov_g.add((host_uri, schema.name, Literal(host)))
+        prov_g.add((host_uri, DC.type, Literal('circuit-breaker')))
+        prov_g.add((host_uri, schema.description, Literal(
+            f"Circuit breaker opened {circuit['times_opened']} times; "
+            f"{circuit['requests_blocked']} requests blocked, {circuit['resources_skipped']} resources skipped")))
+        prov_g.add((host_uri, prov.wasGeneratedBy, crawl_uri))
     
     return prov_g
 
@@ -1281,7 +3790,7 @@ def index():
     # Check if Fuseki triplestore is running and accessible
     fuseki_status = "Unknown"
     try:
-        response = requests.get(f"{app.config['FUSEKI_ENDPOINT']}/$/ping", timeout=3)
+        response = http_get(f"{app.config['FUSEKI_ENDPOINT']}/$/ping", timeout=3)
         if response.status_code == 200:
             fuseki_status = "Connected"
         else:
@@ -1357,6 +3866,7 @@ def start_crawl():
     
     # Initialise a new crawl state
     crawl_id = reset_crawl_state()
+    reset_circuit_breakers()
 
     # Make the crawl ID more user-friendly by including the domain of the first seed URL
     if seed_urls:
@@ -1396,77 +3906,315 @@ def start_crawl():
     
     return redirect(url_for('results', crawl_id=crawl_id))
 
+# Best-first crawl frontier shared by the crawl engines. Entries are kept in a heap
+# ordered by relevance score and depth, and workers pull from it continuously
+frontier_state = {
+    'heap': [],  # Entries of (-priority, depth, sequence, url)
+    'sequence': 0,  # Tie-breaker keeping insertion order for equal priorities
+    'queued': set(),  # URLs currently waiting in the heap or already admitted
+    'admitted_per_depth': {},  # Resources taken from the frontier at each depth
+    'domains_per_depth': {},  # (depth, domain) -> URLs queued, used for the diversity penalty
+    'in_flight': 0,  # Resources currently being crawled
+    'completed': 0,  # Resources finished since the crawl started
+    'max_depth_reached': 0,
+    'stopped': False,
+    'condition': threading.Condition()
+}
+
+def reset_frontier():
+    """Reset the frontier for a new crawl."""
+    frontier_state.update({
+        'heap': [],
+        'sequence': 0,
+        'queued': set(),
+        'admitted_per_depth': {},
+        'domains_per_depth': {},
+        'in_flight': 0,
+        'completed': 0,
+        'max_depth_reached': 0,
+        'stopped': False
+    })
+
+def frontier_push(url, depth, score):
+    """
+    Offer a URL to the frontier at the given depth.
+    Returns True if the URL was admitted to the queue.
+
+    Depth limits are admission rules: URLs beyond MAX_CRAWL_DEPTH, already visited or
+    already queued are rejected. Domain diversity is applied as a priority penalty
+    (FRONTIER_DOMAIN_PENALTY per URL already queued from the same domain at that depth),
+    so other domains are preferred without holding the crawl back.
+    """
+    with frontier_state['condition']:
+        if depth >= app.config['MAX_CRAWL_DEPTH']:
+            return False
+        if url in crawl_state['visited_urls'] or url in frontier_state['queued']:
+            return False
+
+        domain_key = (depth, urlparse(url).netloc)
+        domain_count = frontier_state['domains_per_depth'].get(domain_key, 0)
+        frontier_state['domains_per_depth'][domain_key] = domain_count + 1
+        priority = score - app.config.get('FRONTIER_DOMAIN_PENALTY', 0.1) * domain_count
+
+        frontier_state['sequence'] += 1
+        heapq.heappush(frontier_state['heap'], (-priority, depth, frontier_state['sequence'], url))
+        frontier_state['queued'].add(url)
+        frontier_state['condition'].notify_all()
+        return True
+
+def frontier_next(host_has_capacity=None):
+    """
+    Take the best URL that can be crawled now from the frontier.
+    Returns a tuple of (url, depth, new depth reached) or None if nothing is available.
+
+    Per-depth budgets (MAX_RESOURCES_PER_LEVEL, seeds excluded) are checked here, and the
+    global stopping criteria from should_continue_crawl are applied before each URL.
+    With host_has_capacity, entries whose host it rejects stay in the frontier and the
+    next best URL on another host is taken instead (looking at no more than
+    FRONTIER_HOST_SKIP_LIMIT busy entries).
+    """
+    with frontier_state['condition']:
+        if frontier_state['stopped']:
+            return None
+        if frontier_state['heap'] and not should_continue_crawl(check_progress=False):
+            frontier_state['stopped'] = True
+            frontier_state['condition'].notify_all()
+            return None
+
+        passed_over = []
+        try:
+            return frontier_take(host_has_capacity, passed_over)
+        finally:
+            for entry in passed_over:
+                heapq.heappush(frontier_state['heap'], entry)
+
+def frontier_take(host_has_capacity, passed_over):
+    """Pop the best admissible entry for frontier_next (the caller holds the condition)."""
+    skip_limit = app.config.get('FRONTIER_HOST_SKIP_LIMIT', 1000)
+    while frontier_state['heap']:
+        entry = heapq.heappop(frontier_state['heap'])
+        _, depth, _, url = entry
+        if url in crawl_state['visited_urls']:
+            continue
+        if host_has_capacity is not None and not host_has_capacity(urlparse(url).netloc):
+            passed_over.append(entry)
+            if len(passed_over) >= skip_limit:
+                return None
+            continue
+        admitted = frontier_state['admitted_per_depth'].get(depth, 0)
+        if depth > 0 and admitted >= app.config['MAX_RESOURCES_PER_LEVEL']:
+            logger.debug(f"Depth {depth} budget exhausted, dropping {url}")
+            continue
+        frontier_state['admitted_per_depth'][depth] = admitted + 1
+        frontier_state['in_flight'] += 1
+
+        # Track progress and visited domains for the status API and statistics
+        new_depth = depth > frontier_state['max_depth_reached']
+        if new_depth:
+            frontier_state['max_depth_reached'] = depth
+            crawl_state['current_level_urls'] = []
+        if depth == frontier_state['max_depth_reached']:
+            crawl_state.setdefault('current_level_urls', []).append(url)
+        crawl_state['provenance']['domains_visited'].add(urlparse(url).netloc)
+        return url, depth, new_depth
+    return None
+
+def frontier_defer(url, depth):
+    """
+    Give back a URL taken from the frontier that was not crawled because its host's
+    circuit breaker is open. It leaves the queued set and its depth budget is refunded,
+    so the URL is admitted again when it is rediscovered after the host recovers.
+    """
+    with frontier_state['condition']:
+        frontier_state['queued'].discard(url)
+        admitted = frontier_state['admitted_per_depth'].get(depth, 0)
+        if admitted > 0:
+            frontier_state['admitted_per_depth'][depth] = admitted - 1
+
+def frontier_done():
+    """Check whether the crawl has stopped or has nothing queued and nothing in flight."""
+    with frontier_state['condition']:
+        return frontier_state['stopped'] or (not frontier_state['heap'] and frontier_state['in_flight'] == 0)
+
+def frontier_finish(depth, scored_urls):
+    """
+    Record a finished resource and offer the URLs it linked to at the next depth.
+    The progress check from should_continue_crawl runs once every MAX_RESOURCES_PER_LEVEL
+    resources, which matches how often it ran per level in level-by-level crawling.
+    """
+    with frontier_state['condition']:
+        for url, score in scored_urls:
+            frontier_push(url, depth + 1, score)
+        frontier_state['in_flight'] -= 1
+        frontier_state['completed'] += 1
+        if frontier_state['completed'] % max(1, app.config['MAX_RESOURCES_PER_LEVEL']) == 0:
+            if not should_continue_crawl():
+                frontier_state['stopped'] = True
+        frontier_state['condition'].notify_all()
+
+def crawl_frontier_item(url, depth, new_depth=False):
+    """
+    Crawl a resource taken from the frontier.
+    Returns a list of (url, relevance score) for the newly discovered resources.
+    """
+    # Periodically save provenance information as the crawl goes deeper
+    if new_depth and depth % 2 == 1:
+        try:
+            temp_prov_graph = export_provenance()
+            store_in_fuseki(temp_prov_graph, f"http://example.org/provenance/{crawl_state['crawl_id']}/interim", replace=True)
+            logger.info(f"Saved interim provenance on reaching depth {depth}")
+        except Exception as prov_e:
+            logger.error(f"Error saving interim provenance: {str(prov_e)}")
+
+    if host_circuit_open(urlparse(url).netloc):
+        logger.info(f"Deferring {url}: circuit breaker open for its host")
+        record_circuit_skip(url)
+        frontier_defer(url, depth)
+        return []
+
+    discovered = crawl_resource(url, depth)
+
+    # Score discovered URLs here, outside the frontier lock, skipping those that
+    # could not be admitted anyway
+    scored = []
+    if depth + 1 < app.config['MAX_CRAWL_DEPTH']:
+        for link in dict.fromkeys(discovered):
+            if link in crawl_state['visited_urls']:
+                continue
+            if link not in crawl_state['resource_scores']:
+                crawl_state['resource_scores'][link] = calculate_relevance(link)
+            scored.append((link, crawl_state['resource_scores'][link]))
+    return scored
+
+def frontier_worker():
+    """Thread worker that pulls resources from the frontier until the crawl is done."""
+    condition = frontier_state['condition']
+    while True:
+        with condition:
+            entry = frontier_next()
+            while entry is None and not frontier_done():
+                condition.wait(timeout=1)
+                entry = frontier_next()
+        if entry is None:
+            return
+
+        url, depth, new_depth = entry
+        scored = []
+        try:
+            scored = crawl_frontier_item(url, depth, new_depth)
+        except Exception as e:
+            logger.error(f"Error crawling resource {url}: {str(e)}")
+            logger.error(traceback.format_exc())
+        finally:
+            frontier_finish(depth, scored)
+
+def crawl_frontier_threads():
+    """
+    Crawl the frontier with worker threads (MAX_WORKERS when USE_PARALLEL is enabled,
+    otherwise a single worker).
+    """
+    workers = app.config.get('MAX_WORKERS', 5) if app.config.get('USE_PARALLEL', False) else 1
+    if workers <= 1:
+        frontier_worker()
+        return
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(frontier_worker) for _ in range(workers)]
+        for future in concurrent.futures.as_completed(futures):
+            future.result()
+
+async def crawl_frontier_async():
+    """
+    Crawl the frontier with an asyncio scheduler over a thread pool.
+
+    This is not non-blocking I/O: crawl_resource still fetches, parses and stores with
+    blocking calls, and runs on a pool of ASYNC_MAX_CONCURRENCY threads. Up to that many
+    worker coroutines on the event loop take URLs from the frontier and hand them to the
+    pool, so crawl_state is updated exactly as with the thread-based engine.
+
+    Resources in flight per host are capped by ASYNC_PER_HOST_LIMIT and, with
+    AIMD_ENABLED, by the host's adaptive concurrency limit. URLs on hosts at their limit
+    are left in the frontier and the next best URL on another host is taken, so a busy
+    repository does not hold up the rest of the crawl.
+    """
+    loop = asyncio.get_running_loop()
+    changed = asyncio.Event()
+    host_active = {}
+
+    def host_has_capacity(host):
+        limit = app.config.get('ASYNC_PER_HOST_LIMIT', 8)
+        if app.config.get('AIMD_ENABLED', True):
+            limit = min(limit, host_in_flight_limit(host))
+        return host_active.get(host, 0) < limit
+
+    async def worker(executor):
+        while True:
+            # Taking the entry and counting it against its host happen without an await
+            # in between, so no other coroutine can take the host's last free slot
+            entry = frontier_next(host_has_capacity)
+            if entry is None:
+                if frontier_done():
+                    changed.set()
+                    return
+                # Wait until another worker finishes, freeing a host slot or queueing new URLs
+                changed.clear()
+                await changed.wait()
+                continue
+
+            url, depth, new_depth = entry
+            host = urlparse(url).netloc
+            host_active[host] = host_active.get(host, 0) + 1
+            scored = []
+            try:
+                scored = await loop.run_in_executor(executor, crawl_frontier_item, url, depth, new_depth)
+            except Exception as e:
+                logger.error(f"Error crawling resource {url}: {str(e)}")
+                logger.error(traceback.format_exc())
+            finally:
+                host_active[host] -= 1
+                frontier_finish(depth, scored)
+                changed.set()
+
+    concurrency = app.config.get('ASYNC_MAX_CONCURRENCY', 100)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        await asyncio.gather(*(worker(executor) for _ in range(concurrency)))
+
 def perform_crawl(seed_urls):
     try:
-        # Start with the seed URLs as the first level to process
-        urls_to_process = seed_urls
-        
-        # Main crawling loop
-        while urls_to_process and should_continue_crawl():
-            current_depth = crawl_state['current_depth']
-            logger.info(f"Processing {len(urls_to_process)} URLs at depth {current_depth}")
-            
-            # Track URLs at current level for progress reporting
-            crawl_state['current_level_urls'] = urls_to_process.copy()
+        # Seed the frontier; seeds are always crawled first
+        reset_frontier()
+        for url in seed_urls:
+            frontier_push(url, 0, 1.0)
 
-            # Collect newly discovered URLs at this level
-            newly_discovered = []
-            
-            # Use thread pool for parallel processing if configured
-            if app.config.get('USE_PARALLEL', False) and len(urls_to_process) > 1:
-                # Use a thread pool to process multiple URLs concurrently
-                with ThreadPoolExecutor(max_workers=app.config.get('MAX_WORKERS', 5)) as executor:
-                    # Submit each URL to the thread pool
-                    future_to_url = {executor.submit(crawl_resource, url, current_depth): url for url in urls_to_process}
-                    
-                    # Process results as they complete
-                    for future in concurrent.futures.as_completed(future_to_url):
-                        url = future_to_url[future]
-                        try:
-                            discovered = future.result()
-                            newly_discovered.extend(discovered)
-                        except Exception as e:
-                            logger.error(f"Error crawling resource {url}: {str(e)}")
-                            logger.error(traceback.format_exc())
-            else:
-                # Sequential processing - one URL at a time
-                for url in urls_to_process:
-                    try:
-                        discovered = crawl_resource(url, current_depth)
-                        newly_discovered.extend(discovered)
-                    except Exception as e:
-                        logger.error(f"Error crawling resource {url}: {str(e)}")
-                        logger.error(traceback.format_exc())
-            
-            # Select resources for next level
-            urls_to_process = select_next_resources(newly_discovered)
-            logger.info(f"Selected {len(urls_to_process)} URLs for next level (depth {current_depth + 1})")
-            
-            # Update domain statistics
-            for url in urls_to_process:
-                domain = urlparse(url).netloc
-                crawl_state['provenance']['domains_visited'].add(domain)
-            
-            # Move to the next depth level
-            crawl_state['current_depth'] += 1
-            
-            # Periodically save provenance information
-            if current_depth % 2 == 0:
-                try:
-                    # Create a temporary "in progress" provenance
-                    temp_prov_graph = export_provenance()
-                    store_in_fuseki(temp_prov_graph, f"http://example.org/provenance/{crawl_state['crawl_id']}/interim")
-                    logger.info(f"Saved interim provenance at depth {current_depth}")
-                except Exception as prov_e:
-                    logger.error(f"Error saving interim provenance: {str(prov_e)}")
+        # Load the common JSON-LD contexts in the background so embedded JSON-LD can be expanded offline
+        threading.Thread(target=warm_jsonld_contexts, daemon=True).start()
+
+        # Send writes that an earlier crawl could not deliver to Fuseki before this crawl
+        # writes anything, so they cannot overwrite newer data
+        replay_write_ahead_log()
+
+        # Workers pull from the frontier continuously until it is exhausted or a stopping
+        # criterion is met, so a slow host no longer stalls a whole depth level
+        if app.config.get('CRAWL_ENGINE') == 'asyncio':
+            asyncio.run(crawl_frontier_async())
+        else:
+            crawl_frontier_threads()
+        crawl_state['current_depth'] = frontier_state['max_depth_reached'] + 1
         
         # Finalise crawl
-        crawl_state['crawl_active'] = False
         crawl_state['provenance']['finished'] = datetime.datetime.now().isoformat()
         
         # Export and store final provenance
         prov_graph = export_provenance()
-        store_in_fuseki(prov_graph, f"http://example.org/provenance/{crawl_state['crawl_id']}")
+        store_in_fuseki(prov_graph, f"http://example.org/provenance/{crawl_state['crawl_id']}", replace=True)
+
+        # Write everything still buffered before the crawl is reported as complete
+        flush_write_buffer()
+        crawl_state['crawl_active'] = False
+
+        # Keep what was learned about each host for the next crawl
+        save_host_profiles()
+        save_jsonld_contexts()
+        save_stats_store()
         
         # Create a standalone provenance file
         try:
@@ -1481,7 +4229,8 @@ def perform_crawl(seed_urls):
     except Exception as e:
         logger.error(f"Error during crawl: {str(e)}")
         logger.error(traceback.format_exc())
-        # Ensure the crawl is marked as inactive and record the error
+        # Keep what was collected, ensure the crawl is marked as inactive and record the error
+        flush_write_buffer()
         crawl_state['crawl_active'] = False
         crawl_state['provenance']['finished'] = datetime.datetime.now().isoformat()
         crawl_state['provenance']['error'] = str(e)
@@ -1493,69 +4242,13 @@ def results(crawl_id):
     if crawl_state.get('crawl_id') != crawl_id:
         return "Crawl not found", 404
     
-    # Query Fuseki for statistics about the crawl results
+    # Statistics about the stored knowledge graph come from the counters kept at write time
     try:
-        sparql = SPARQLWrapper(f"{app.config['FUSEKI_ENDPOINT']}/{app.config['FUSEKI_DATASET']}/query")
-        sparql.setReturnFormat(JSON)
-        
-        # Query for total triples
-        sparql.setQuery("""
-        SELECT (COUNT(*) AS ?count) 
-        WHERE { 
-            ?s ?p ?o 
-        }
-        """)
-        
-        results = sparql.query().convert()
-        total_triples = results['results']['bindings'][0]['count']['value']
-        
-        # Query for total graphs
-        sparql.setQuery("""
-        SELECT (COUNT(DISTINCT ?g) AS ?count) 
-        WHERE { 
-            GRAPH ?g { ?s ?p ?o } 
-        }
-        """)
-        
-        results = sparql.query().convert()
-        total_graphs = results['results']['bindings'][0]['count']['value']
-        
-        # Query for a sample of resources
-        sparql.setQuery("""
-        SELECT DISTINCT ?resource ?type
-        WHERE { 
-            ?resource a ?type .
-            FILTER(STRSTARTS(STR(?resource), "http://") && !STRSTARTS(STR(?resource), "http://example.org/"))
-        }
-        LIMIT 20
-        """)
-        
-        results = sparql.query().convert()
-        sample_resources = []
-        for item in results['results']['bindings']:
-            sample_resources.append({
-                'uri': item['resource']['value'],
-                'type': item['type']['value']
-            })
-        
-        # Query for predicates used
-        sparql.setQuery("""
-        SELECT ?p (COUNT(*) AS ?count) 
-        WHERE { 
-            ?s ?p ?o 
-        }
-        GROUP BY ?p
-        ORDER BY DESC(?count)
-        LIMIT 20
-        """)
-        
-        results = sparql.query().convert()
-        predicate_stats = []
-        for item in results['results']['bindings']:
-            predicate_stats.append({
-                'predicate': item['p']['value'],
-                'count': int(item['count']['value'])
-            })
+        summary = get_stats_summary()
+        total_triples = summary['total_triples']
+        total_graphs = summary['total_graphs']
+        sample_resources = summary['sample_resources']
+        predicate_stats = summary['predicates']
         
         # Get domain information from crawl state
         domain_counts = {}
@@ -1575,7 +4268,7 @@ def results(crawl_id):
             duration_str = "In progress"
         
     except Exception as e:
-        logger.error(f"Error querying Fuseki: {str(e)}")
+        logger.error(f"Error reading graph statistics: {str(e)}")
         total_triples = "Error"
         total_graphs = "Error"
         sample_resources = []
@@ -1603,11 +4296,7 @@ def query():
         query_text = request.form.get('query', '')
         # Execute the SPARQL query against Fuseki
         try:
-            sparql = SPARQLWrapper(f"{app.config['FUSEKI_ENDPOINT']}/{app.config['FUSEKI_DATASET']}/query")
-            sparql.setReturnFormat(JSON)
-            sparql.setQuery(query_text)
-            
-            results = sparql.query().convert()
+            results = sparql_select(query_text)
         except Exception as e:
             logger.error(f"Query error: {str(e)}")
             results = {'error': str(e)}
@@ -1615,11 +4304,7 @@ def query():
     # Get a list of available named graphs for the dropdown selector
     graphs = []
     try:
-        sparql = SPARQLWrapper(f"{app.config['FUSEKI_ENDPOINT']}/{app.config['FUSEKI_DATASET']}/query")
-        sparql.setReturnFormat(JSON)
-        sparql.setQuery("SELECT DISTINCT ?g WHERE { GRAPH ?g { ?s ?p ?o } }")
-        
-        graph_results = sparql.query().convert()
+        graph_results = sparql_select("SELECT DISTINCT ?g WHERE { GRAPH ?g { ?s ?p ?o } }")
         graphs = [item['g']['value'] for item in graph_results['results']['bindings']]
     except:
         pass
@@ -1648,12 +4333,9 @@ def explore_resource(resource_uri):
             logger.error(f"Error parsing malformed resource URI: {str(e)}")
     
     try:
-        sparql = SPARQLWrapper(f"{app.config['FUSEKI_ENDPOINT']}/{app.config['FUSEKI_DATASET']}/query")
-        sparql.setReturnFormat(JSON)
-        
         # Query for all properties and values of this resource
         # outbound links
-        sparql.setQuery(f"""
+        outbound = sparql_select(f"""
         SELECT ?p ?o
         WHERE {{ 
             <{resource_uri}> ?p ?o 
@@ -1661,11 +4343,9 @@ def explore_resource(resource_uri):
         LIMIT 100
         """)
         
-        outbound = sparql.query().convert()
-        
         # Query for resources that reference this resource 
         # inbound links
-        sparql.setQuery(f"""
+        inbound = sparql_select(f"""
         SELECT ?s ?p
         WHERE {{ 
             ?s ?p <{resource_uri}> 
@@ -1673,8 +4353,6 @@ def explore_resource(resource_uri):
         LIMIT 100
         """)
         
-        inbound = sparql.query().convert()
-        
         # Get relevance score if available
         relevance_score = crawl_state['resource_scores'].get(resource_uri, "Unknown")
         
@@ -1735,7 +4413,6 @@ def continue_crawl_from_resource(resource_uri):
             next_discovered.extend(discovered)
         
         # Update crawl state
-        crawl_state['crawl_active'] = False
         crawl_state['current_depth'] += 1
         
         # Update provenance record 
@@ -1743,9 +4420,15 @@ def continue_crawl_from_resource(resource_uri):
         
         # Export updated provenance to Fuseki 
         prov_graph = export_provenance()
-        store_in_fuseki(prov_graph, f"http://example.org/provenance/{crawl_state['crawl_id']}")
+        store_in_fuseki(prov_graph, f"http://example.org/provenance/{crawl_state['crawl_id']}", replace=True)
+        flush_write_buffer()
+        crawl_state['crawl_active'] = False
+        save_host_profiles()
+        save_jsonld_contexts()
+        save_stats_store()
     except Exception as e:
         logger.error(f"Error continuing crawl: {str(e)}")
+        flush_write_buffer()
         crawl_state['crawl_active'] = False
 
 @app.route('/api/crawl-status')
@@ -1814,9 +4497,25 @@ def api_crawl_status():
         'resources_visited': resources_visited,
         'triples_collected': triples_collected,
         'logs': recent_logs,
-        'crawl_id': crawl_state.get('crawl_id', '')
+        'crawl_id': crawl_state.get('crawl_id', ''),
+        'hosts': get_host_concurrency_status(),
+        'storage': get_storage_writer_status(),
+        'sparql_cache': get_sparql_cache_status()
     })
 
+@app.route('/api/stats/reconcile', methods=['POST'])
+def api_stats_reconcile():
+    """
+    Start re-syncing the graph statistics from Fuseki in the background.
+    Refused while writes are waiting to reach Fuseki, as they would race with the scan.
+    """
+    if storage_writes_in_flight():
+        return jsonify({'started': False, 'error': 'Writes to Fuseki are in progress; reconcile once they have finished',
+                        'statistics': get_stats_summary()}), 409
+    with stats_store_state['lock']:
+        started = start_stats_reconcile()
+    return jsonify({'started': started, 'statistics': get_stats_summary()}), 202
+
 @app.route('/export-provenance')
 def export_provenance_route():
     prov_graph = export_provenance()
@@ -1838,20 +4537,15 @@ def export_graph():
     if not graph_uri:
         return "No graph URI specified", 400
     
-    try:  # Set up SPARQL endpoint for querying the graph
-        sparql = SPARQLWrapper(f"{app.config['FUSEKI_ENDPOINT']}/{app.config['FUSEKI_DATASET']}/query")
-        sparql.setReturnFormat('turtle')
-        
+    try:
         # Query to get all triples from the entire named graph
-        sparql.setQuery(f"""
+        turtle_data = sparql_construct(f"""
         CONSTRUCT {{ ?s ?p ?o }}
         WHERE {{ 
             GRAPH <{graph_uri}> {{ ?s ?p ?o }} 
         }}
         """)
         
-        turtle_data = sparql.query().convert()
-        
         response = app.response_class(
             response=turtle_data,
             status=200,
@@ -1872,11 +4566,7 @@ def visualise():
     if not graph_uri:
         # Get all graphs to display in dropdown
         try:
-            sparql = SPARQLWrapper(f"{app.config['FUSEKI_ENDPOINT']}/{app.config['FUSEKI_DATASET']}/query")
-            sparql.setReturnFormat(JSON)
-            sparql.setQuery("SELECT DISTINCT ?g WHERE { GRAPH ?g { ?s ?p ?o } }")
-            
-            graph_results = sparql.query().convert()
+            graph_results = sparql_select("SELECT DISTINCT ?g WHERE { GRAPH ?g { ?s ?p ?o } }")
             graphs = [item['g']['value'] for item in graph_results['results']['bindings']]
             
             return render_template('visualise.html', graphs=graphs)
@@ -1886,11 +4576,8 @@ def visualise():
     
     # If a graph was specified, query data for visualisation
     try:
-        sparql = SPARQLWrapper(f"{app.config['FUSEKI_ENDPOINT']}/{app.config['FUSEKI_DATASET']}/query")
-        sparql.setReturnFormat(JSON)
-        
         # Get a subset of triples from the graph
-        sparql.setQuery(f"""
+        results = sparql_select(f"""
         SELECT ?s ?p ?o 
         WHERE {{ 
             GRAPH <{graph_uri}> {{ ?s ?p ?o }} 
@@ -1898,8 +4585,6 @@ def visualise():
         LIMIT 100
         """)
         
-        results = sparql.query().convert()
-        
         # Process the data into a format suitable for visualisation
         nodes = set()
         links = []
@@ -1934,7 +4619,7 @@ def visualise():
 def check_fuseki():
     try:
         # Send a ping request to Fuseki's admin interface
-        response = requests.get(f"{app.config['FUSEKI_ENDPOINT']}/$/ping", timeout=5)
+        response = http_get(f"{app.config['FUSEKI_ENDPOINT']}/$/ping", timeout=5)
         if response.status_code == 200:
             return jsonify({'status': 'success', 'message': 'Fuseki server is running'})
         else: 
@@ -1959,8 +4644,13 @@ def configure():
         app.config['RELEVANCE_THRESHOLD'] = float(request.form.get('relevance_threshold', app.config['RELEVANCE_THRESHOLD']))
         app.config['CRAWL_TIMEOUT'] = int(request.form.get('timeout', app.config['CRAWL_TIMEOUT']))
         app.config['USE_PARALLEL'] = request.form.get('use_parallel') == 'on'
+        if request.form.get('crawl_engine') in ('threads', 'asyncio'):
+            app.config['CRAWL_ENGINE'] = request.form.get('crawl_engine')
         if request.form.get('max_workers'):
             app.config['MAX_WORKERS'] = int(request.form.get('max_workers'))
+        if request.form.get('http_pool_maxsize'):
+            app.config['HTTP_POOL_MAXSIZE'] = int(request.form.get('http_pool_maxsize'))
+            reset_http_session()  # Rebuild the connection pools with the new size
         
         return redirect(url_for('index')) # Redirect to homepage after saving configuration
         
@@ -1975,11 +4665,8 @@ def api_graph_data():
     
     # Query data for the specific graph
     try:
-        sparql = SPARQLWrapper(f"{app.config['FUSEKI_ENDPOINT']}/{app.config['FUSEKI_DATASET']}/query")
-        sparql.setReturnFormat(JSON)
-        
         # Get a subset of triples from the graph
-        sparql.setQuery(f"""
+        results = sparql_select(f"""
         SELECT ?s ?p ?o 
         WHERE {{ 
             GRAPH <{graph_uri}> {{ ?s ?p ?o }} 
@@ -1987,8 +4674,6 @@ def api_graph_data():
         LIMIT 200
         """)
         
-        results = sparql.query().convert()
-        
         # Format data as a list of triples 
         triples = []
         
@@ -2096,6 +4781,8 @@ def statistics(crawl_id):
                                mime_stats=mime_stats,
                                rel_stats=rel_stats,
                                domain_stats=domain_stats,
+                               circuit_breakers=crawl_state['provenance'].get('circuit_breakers', {}),
+                               graph_stats=get_stats_summary(10),
                                domain_chart_data=json.dumps(domain_chart_data),
                                format_chart_data=json.dumps(format_chart_data),
                                mime_chart_data=json.dumps(mime_chart_data),
@@ -2128,9 +4815,12 @@ def api_seed_check():
     }
     
     try:
+        # Fetch the seed once and reuse the response for both checks
+        fetched = fetch_resource(seed_url)
+
         # Check for RDF directly at the URL
         try:
-            g, error, format_used, content_type = fetch_and_parse_rdf(seed_url)
+            g, error, format_used, content_type = fetch_and_parse_rdf(seed_url, fetched, as_ntriples=True)
             if len(g) > 0:
                 results['details']['rdf_found'] = True
                 results['score'] += 0.5
@@ -2145,7 +4835,7 @@ def api_seed_check():
         
         # Check for signposting links
         try:
-            links = get_signposting_links(seed_url)
+            links = get_signposting_links(seed_url, fetched)
             if links:
                 results['details']['signposting_found'] = True
                 results['score'] += 0.3
@@ -2220,11 +4910,8 @@ def fair_assessment(resource_uri):
         graph = Graph()
         # Try loading from Fuseki first if available
         try:
-            sparql = SPARQLWrapper(f"{app.config['FUSEKI_ENDPOINT']}/{app.config['FUSEKI_DATASET']}/query")
-            sparql.setReturnFormat('turtle')
-            
             # Query for triples about this resource (either as subject or object)
-            sparql.setQuery(f"""
+            turtle_data = sparql_construct(f"""
             CONSTRUCT {{ ?s ?p ?o }}
             WHERE {{ 
                 {{ <{resource_uri}> ?p ?o }} UNION {{ ?s ?p <{resource_uri}> }}
@@ -2232,7 +4919,6 @@ def fair_assessment(resource_uri):
             """)
             
             try:
-                turtle_data = sparql.query().convert() # Try to parse the result as Turtle
                 graph.parse(data=turtle_data, format='turtle')
                 
                 # If we got data, improve the findable score
@@ -2255,7 +4941,7 @@ def fair_assessment(resource_uri):
             headers = {
                 'Accept': 'application/rdf+xml, text/turtle, application/ld+json, text/n3, application/n-triples'
             }
-            response = requests.head(resource_uri, allow_redirects=True, timeout=10, headers=headers)
+            response = http_head(resource_uri, allow_redirects=True, timeout=10, headers=headers)
             
             # Check for signposting links
             if 'Link' in response.headers:
@@ -2299,7 +4985,7 @@ def fair_assessment(resource_uri):
             for accept_type in accept_types:
                 try:
                     h = {'Accept': accept_type}
-                    r = requests.head(resource_uri, headers=h, timeout=5)
+                    r = http_head(resource_uri, headers=h, timeout=5)
                     if r.status_code == 200 and accept_type in r.headers.get('Content-Type', ''):
                         content_neg_support = True
                         assessment['accessible']['score'] += 1
@@ -2452,7 +5138,7 @@ def check_environment():
     
     # Check Fuseki connection
     try:
-        response = requests.get(f"{app.config['FUSEKI_ENDPOINT']}/$/ping", timeout=5)
+        response = http_get(f"{app.config['FUSEKI_ENDPOINT']}/$/ping", timeout=5)
         if response.status_code == 200:
             checks['fuseki']['status'] = 'ok'
             checks['fuseki']['message'] = 'Connected to Fuseki'
@@ -2460,7 +5146,7 @@ def check_environment():
             # Check for dataset
             try:
                 # Query the list of datasets from Fuseki
-                dataset_response = requests.get(f"{app.config['FUSEKI_ENDPOINT']}/$/datasets", timeout=5)
+                dataset_response = http_get(f"{app.config['FUSEKI_ENDPOINT']}/$/datasets", timeout=5)
                 if dataset_response.status_code == 200:
                     datasets = dataset_response.json().get('datasets', [])
                     dataset_found = False
@@ -2490,8 +5176,6 @@ def check_environment():
     required_modules = {
         'rdflib': False,
         'requests': False,
-        'bs4': False,
-        'SPARQLWrapper': False,
         'flask': False
     }
     
@@ -2508,12 +5192,6 @@ def check_environment():
         import requests
         required_modules['requests'] = True
         
-        import bs4
-        required_modules['bs4'] = True
-        
-        import SPARQLWrapper
-        required_modules['SPARQLWrapper'] = True
-        
         import flask
         required_modules['flask'] = True
 
@@ -2533,8 +5211,6 @@ def check_environment():
         # Check module versions
         checks['modules']['details']['rdflib_version'] = rdflib.__version__
         checks['modules']['details']['requests_version'] = requests.__version__
-        checks['modules']['details']['bs4_version'] = bs4.__version__
-        checks['modules']['details']['SPARQLWrapper_version'] = SPARQLWrapper.__version__
         checks['modules']['details']['flask_version'] = flask.__version__
         
         # Determine overall module check status
@@ -2590,7 +5266,7 @@ def check_environment():
     # Test each URL
     for url in test_urls:
         try:
-            response = requests.head(url, timeout=5)
+            response = http_head(url, timeout=5)
             network_results[url] = {
                 'status': response.status_code,
                 'ok': response.status_code == 200
@@ -2663,6 +5339,258 @@ def check_environment():
     # Return the status page
     return render_template('environment_check.html', checks=checks)
 
+def open_export_stream(export_format, content_type, graph_uri=None):
+    """
+    Open Fuseki's own serialisation of the dataset, or of one named graph, as a streamed
+    response. A single graph (as N-Triples when exporting N-Quads) is read with a Graph
+    Store GET and the whole dataset as N-Quads from the dataset endpoint; other formats
+    of the whole dataset come from a CONSTRUCT over all named graphs.
+    """
+    dataset_url = f"{app.config['FUSEKI_ENDPOINT']}/{app.config['FUSEKI_DATASET']}"
+    timeout = (app.config.get('SPARQL_TIMEOUT', 30), app.config.get('EXPORT_READ_TIMEOUT', 300))
+    if graph_uri is None and export_format != 'nquads':
+        return sparql_request('query', "CONSTRUCT { ?s ?p ?o } WHERE { GRAPH ?g { ?s ?p ?o } }",
+                              content_type, timeout, stream=True)
+
+    if graph_uri is None:
+        url, params = dataset_url, None
+    else:
+        url, params = f"{dataset_url}/data", {'graph': graph_uri}
+        if export_format == 'nquads':
+            content_type = 'application/n-triples'
+    response = get_sparql_session().get(url, params=params, headers={'Accept': content_type},
+                                        stream=True, timeout=timeout)
+    if response.status_code >= 400:
+        response.close()
+        raise requests.exceptions.HTTPError(f"Export failed with status {response.status_code}", response=response)
+    return response
+
+def export_chunks(response, graph_uri=None, chunk_size=64 * 1024):
+    """
+    Pass an export response through in chunks. With graph_uri the response is N-Triples
+    and each statement is labelled with the graph, line by line, to make N-Quads.
+    """
+    if graph_uri is None:
+        with response:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    yield chunk
+        return
+
+    batch, batch_size = [], 0
+    for quad in export_statements(response, graph_uri):
+        batch.append(quad + b'\n')
+        batch_size += len(quad) + 1
+        if batch_size >= chunk_size:
+            yield b''.join(batch)
+            batch, batch_size = [], 0
+    if batch:
+        yield b''.join(batch)
+
+# Background export jobs. Each job streams the dataset (or one named graph) from Fuseki
+# and writes it as gzip-compressed shards of at most shard_size statements, closing a
+# shard early once about shard_bytes compressed bytes were written, plus a manifest.json
+# with the job's progress and each shard's statement count and SHA-256 checksum, into its
+# own directory under EXPORT_JOBS_DIR. Files are downloaded through the
+# /api/export-jobs/<job_id>/files/ route. The manifest is rewritten after
+# every shard, so an interrupted job can be resumed from its last complete shard. Each
+# shard also records its last statement; if the re-streamed data no longer matches at a
+# shard boundary the store has changed, and the job starts again from scratch
+EXPORT_JOB_FORMATS = {
+    # Sharded dumps are line-based, so they can be split between any two statements
+    'nquads': {'content_type': 'application/n-quads', 'extension': 'nq'},
+    'nt': {'content_type': 'application/n-triples', 'extension': 'nt'}
+}
+
+export_jobs_state = {
+    'jobs': {},  # Job ID -> manifest
+    'running': set(),  # Jobs with a live worker thread
+    'loaded': False,
+    'lock': threading.Lock()
+}
+
+def export_jobs_root():
+    """EXPORT_JOBS_DIR, resolved against the application directory when it is relative."""
+    return os.path.join(app.root_path, app.config['EXPORT_JOBS_DIR'])
+
+def export_job_dir(job_id):
+    return os.path.join(export_jobs_root(), f"export-{job_id}")
+
+def save_export_manifest(job):
+    """Write a job's manifest atomically (the caller holds the lock)."""
+    job['updated'] = datetime.datetime.now().isoformat()
+    directory = export_job_dir(job['job_id'])
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, 'manifest.json')
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump(job, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+def load_export_jobs():
+    """Load the manifests of earlier jobs on first use (the caller holds the lock)."""
+    if export_jobs_state['loaded']:
+        return
+    export_jobs_state['loaded'] = True
+    jobs_dir = export_jobs_root()
+    try:
+        names = os.listdir(jobs_dir)
+    except FileNotFoundError:
+        return
+    for name in names:
+        if not name.startswith('export-'):
+            continue
+        try:
+            with open(os.path.join(jobs_dir, name, 'manifest.json'), 'r') as f:
+                job = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if job.get('status') in ('queued', 'running'):
+            job['status'] = 'interrupted'  # Its worker did not survive the restart
+        export_jobs_state['jobs'][job['job_id']] = job
+
+def export_statements(response, graph_uri=None):
+    """Yield the statements of a line-based export response, labelled with graph_uri if given."""
+    graph_label = f" <{graph_uri}> .".encode('utf-8') if graph_uri else None
+    with response:
+        for line in response.iter_lines(chunk_size=64 * 1024):
+            line = line.strip()
+            if not line or line.startswith(b'#'):
+                continue
+            yield line[:-1].rstrip() + graph_label if graph_label else line
+
+def finish_export_shard(job, shard):
+    """Close a shard, move it into place and record it in the manifest."""
+    shard['file'].close()
+    os.replace(shard['tmp_path'], shard['path'])
+    digest = hashlib.sha256()
+    with open(shard['path'], 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    with export_jobs_state['lock']:
+        job['shards'].append({
+            'file': os.path.basename(shard['path']),
+            'statements': shard['statements'],
+            'bytes': os.path.getsize(shard['path']),
+            'sha256': digest.hexdigest(),
+            'last_statement': shard['last'].decode('utf-8', errors='replace')
+        })
+        job['statements_written'] += shard['statements']
+        save_export_manifest(job)
+
+def write_export_shards(job):
+    """
+    Stream a job's statements from Fuseki into shards after those already in its manifest.
+    The shard size in bytes is checked against the compressed output flushed to the file
+    so far, so a shard can overshoot shard_bytes by what the compressor still buffers.
+    Returns False without writing anything if the statements at the end of the existing
+    shards differ from the ones recorded in the manifest. A shard that is not complete
+    when an error occurs is removed.
+    """
+    export_format = EXPORT_JOB_FORMATS[job['format']]
+    directory = export_job_dir(job['job_id'])
+    shard_bytes = job.get('shard_bytes') or app.config.get('EXPORT_SHARD_BYTES', 256 * 1024 * 1024)
+    boundaries = {}
+    skip = 0
+    for written in job['shards']:
+        skip += written['statements']
+        boundaries[skip - 1] = written.get('last_statement')
+
+    response = open_export_stream(job['format'], export_format['content_type'], job['graph'])
+    statements = export_statements(response, job['graph'] if job['format'] == 'nquads' else None)
+    streamed = 0
+    shard = None
+    try:
+        for index, statement in enumerate(statements):
+            streamed = index + 1
+            if index < skip:
+                # Already written to a complete shard before the job was interrupted
+                if boundaries.get(index) not in (None, statement.decode('utf-8', errors='replace')):
+                    return False
+                continue
+            if shard is None:
+                path = os.path.join(directory, f"part-{len(job['shards']):05d}.{export_format['extension']}.gz")
+                shard = {'path': path, 'tmp_path': f"{path}.tmp", 'statements': 0}
+                shard['file'] = gzip.open(shard['tmp_path'], 'wb')
+            shard['file'].write(statement + b'\n')
+            shard['statements'] += 1
+            shard['last'] = statement
+            if shard['statements'] >= job['shard_size'] or shard['file'].fileobj.tell() >= shard_bytes:
+                finish_export_shard(job, shard)
+                shard = None
+        if streamed < skip:
+            return False
+        if shard is not None:
+            finish_export_shard(job, shard)
+            shard = None
+    finally:
+        statements.close()
+        if shard is not None:
+            shard['file'].close()
+            try:
+                os.remove(shard['tmp_path'])
+            except OSError:
+                pass
+    return True
+
+def reset_export_job(job):
+    """Delete a job's shards so it can start again from the beginning."""
+    with export_jobs_state['lock']:
+        for written in job['shards']:
+            try:
+                os.remove(os.path.join(export_job_dir(job['job_id']), written['file']))
+            except OSError:
+                pass
+        job['shards'] = []
+        job['statements_written'] = 0
+        save_export_manifest(job)
+
+def run_export_job(job_id):
+    """Worker for an export job; resumes after the shards already listed in its manifest."""
+    with export_jobs_state['lock']:
+        job = export_jobs_state['jobs'][job_id]
+        job['status'] = 'running'
+        job['error'] = None
+        save_export_manifest(job)
+
+    try:
+        if not write_export_shards(job):
+            logger.warning(f"Export job {job_id}: the data changed since its shards were written, starting again")
+            reset_export_job(job)
+            write_export_shards(job)
+        status, error = 'completed', None
+        logger.info(f"Export job {job_id} wrote {job['statements_written']} statements in {len(job['shards'])} shards")
+    except Exception as e:
+        logger.error(f"Export job {job_id} failed: {str(e)}")
+        status, error = 'failed', str(e)
+
+    with export_jobs_state['lock']:
+        job['status'] = status
+        job['error'] = error
+        if status == 'completed':
+            job['completed'] = datetime.datetime.now().isoformat()
+        save_export_manifest(job)
+        export_jobs_state['running'].discard(job_id)
+
+def start_export_job(job_id):
+    """Start a worker thread for a job unless one is already running (the caller holds the lock)."""
+    if job_id in export_jobs_state['running']:
+        return False
+    export_jobs_state['running'].add(job_id)
+    threading.Thread(target=run_export_job, args=(job_id,), name=f"export-{job_id}", daemon=True).start()
+    return True
+
+def describe_export_job(job):
+    """A job's manifest plus progress and download locations for the API."""
+    described = dict(job)
+    if job.get('expected_statements'):
+        described['progress'] = min(100, int(job['statements_written'] * 100 / job['expected_statements']))
+    else:
+        described['progress'] = 100 if job['status'] == 'completed' else None
+    described['files'] = [url_for('download_export_file', job_id=job['job_id'], filename=shard['file'])
+                          for shard in job['shards']]
+    described['manifest'] = url_for('download_export_file', job_id=job['job_id'], filename='manifest.json')
+    return described
+
 @app.route('/export-knowledge-graph')
 def export_knowledge_graph():
     format_param = request.args.get('format', 'turtle')
@@ -2697,117 +5625,120 @@ def export_knowledge_graph():
     
     # Get the named graph parameter if provided
     graph_uri = request.args.get('graph', None)
+    compress = request.args.get('compress') == 'gzip'
     
     try:
-        sparql = SPARQLWrapper(f"{app.config['FUSEKI_ENDPOINT']}/{app.config['FUSEKI_DATASET']}/query")
-        
-        # Special handling for N-Quads format which preserves graph context
-        if export_format == 'nquads':
-            sparql.setReturnFormat('json')
-            
-            # Query triples from specific graph
-            if graph_uri:
-                sparql.setQuery(f"""
-                SELECT ?s ?p ?o
-                WHERE {{ 
-                    GRAPH <{graph_uri}> {{ ?s ?p ?o }} 
-                }}
-                """)
-            else:
-                # Query all triples with their graph context
-                sparql.setQuery("""
-                SELECT ?g ?s ?p ?o
-                WHERE { 
-                    GRAPH ?g { ?s ?p ?o } 
-                }
-                """)
-            
-            results = sparql.query().convert()
-            
-            # Manually construct N-Quads format from results 
-            quads = []
-            for binding in results['results']['bindings']:
-                s = binding['s']['value']
-                p = binding['p']['value']
-                o = binding['o']['value']
-                
-                # Format subject based on type (URI or blank node)
-                if binding['s']['type'] == 'uri':
-                    s_formatted = f"<{s}>"
-                else:
-                    # Blank nodes have _: prefix
-                    s_formatted = f"_:{s}"
-                
-                # Format predicate (always a URI)
-                p_formatted = f"<{p}>"
-                
-                # Format object based on type (URI, blank node, or literal)
-                if binding['o']['type'] == 'uri':
-                    o_formatted = f"<{o}>"
-                elif binding['o']['type'] == 'bnode':
-                    o_formatted = f"_:{o}"
-                else:
-                    # literal - handle datatype and language tags
-                    if 'datatype' in binding['o']:
-                        datatype = binding['o']['datatype']
-                        o_formatted = f'"{o}"^^<{datatype}>' # Typed literal
-                    elif 'xml:lang' in binding['o']:
-                        lang = binding['o']['xml:lang']
-                        o_formatted = f'"{o}"@{lang}'  # Language-tagged literal
-                    else:
-                        o_formatted = f'"{o}"'  # Plain literal
-                
-                # Format graph name
-                if graph_uri:
-                    g_formatted = f"<{graph_uri}>"
-                else:
-                    g = binding['g']['value']
-                    g_formatted = f"<{g}>"
-                
-                # Construct the complete quad in N-Quads format
-                quad = f"{s_formatted} {p_formatted} {o_formatted} {g_formatted} ."
-                quads.append(quad)
-            
-            # Join all quads with newlines
-            data = '\n'.join(quads)
-            
-        else:
-            # For other formats, we can use CONSTRUCT query to get the triples
-            sparql.setReturnFormat(export_format)
-            
-            if graph_uri:
-                sparql.setQuery(f"""
-                CONSTRUCT {{ ?s ?p ?o }}
-                WHERE {{ 
-                    GRAPH <{graph_uri}> {{ ?s ?p ?o }} 
-                }}
-                """)
-            else:
-                sparql.setQuery("""
-                CONSTRUCT { ?s ?p ?o }
-                WHERE { 
-                    GRAPH ?g { ?s ?p ?o } 
-                }
-                """)
-            
-            data = sparql.query().convert()
-        
-        # Create the HTTP response with appropriate filename
-        filename = f"knowledge_graph_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.{format_param}"
-        response = app.response_class(
-            response=data,
-            status=200,
-            mimetype=mime_type
-        )
-        response.headers["Content-Disposition"] = f"attachment; filename={filename}"
-        
-        return response
-        
+        # Open the upstream stream before responding, so a Fuseki error is still reported as such
+        upstream = open_export_stream(export_format, mime_type, graph_uri)
     except Exception as e:
         logger.error(f"Error exporting knowledge graph: {str(e)}")
         logger.error(traceback.format_exc())
         return f"Error exporting knowledge graph: {str(e)}", 500
     
+    # Stream Fuseki's serialisation straight through as a chunked response, so the export
+    # never has to fit in memory and the first bytes are sent as soon as Fuseki produces them
+    body = export_chunks(upstream, graph_uri if export_format == 'nquads' else None)
+    filename = f"knowledge_graph_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.{format_param}"
+    if compress:
+        body = gzip_chunks(body)
+        filename = f"{filename}.gz"
+        mime_type = 'application/gzip'
+    response = app.response_class(body, status=200, mimetype=mime_type)
+    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+    return response
+    
+@app.route('/api/export-jobs', methods=['GET', 'POST'])
+def api_export_jobs():
+    """List export jobs, or submit a new one (format, graph, shard_size and shard_bytes)."""
+    if request.method == 'GET':
+        with export_jobs_state['lock']:
+            load_export_jobs()
+            jobs = [describe_export_job(job) for job in export_jobs_state['jobs'].values()]
+        return jsonify({'jobs': sorted(jobs, key=lambda job: job['created'], reverse=True)})
+
+    params = request.get_json(silent=True) or request.form
+    export_format = {'nq': 'nquads', 'ntriples': 'nt'}.get(params.get('format', 'nquads'), params.get('format', 'nquads'))
+    if export_format not in EXPORT_JOB_FORMATS:
+        return jsonify({'error': f"Unsupported export format: {export_format} (use nquads or nt)"}), 400
+    try:
+        shard_size = int(params.get('shard_size') or app.config.get('EXPORT_SHARD_STATEMENTS', 1000000))
+        shard_bytes = int(params.get('shard_bytes') or app.config.get('EXPORT_SHARD_BYTES', 256 * 1024 * 1024))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'shard_size must be a number of statements and shard_bytes a number of bytes'}), 400
+    if shard_size <= 0 or shard_bytes <= 0:
+        return jsonify({'error': 'shard_size and shard_bytes must be positive'}), 400
+    graph_uri = params.get('graph') or None
+
+    # The statistics store gives the expected size, so progress can be reported as a percentage
+    with stats_store_state['lock']:
+        load_stats_store()
+        if graph_uri:
+            expected = stats_store_state['graphs'].get(graph_uri, {}).get('triples')
+        else:
+            expected = stats_store_state['triples']
+
+    job = {
+        'job_id': uuid.uuid4().hex[:12],
+        'format': export_format,
+        'graph': graph_uri,
+        'shard_size': shard_size,
+        'shard_bytes': shard_bytes,
+        'compression': 'gzip',
+        'status': 'queued',
+        'created': datetime.datetime.now().isoformat(),
+        'completed': None,
+        'error': None,
+        'expected_statements': expected or None,
+        'statements_written': 0,
+        'shards': []
+    }
+    with export_jobs_state['lock']:
+        load_export_jobs()
+        export_jobs_state['jobs'][job['job_id']] = job
+        save_export_manifest(job)
+        start_export_job(job['job_id'])
+        described = describe_export_job(job)
+    described['status_url'] = url_for('api_export_job', job_id=job['job_id'])
+    return jsonify(described), 202
+
+@app.route('/api/export-jobs/<job_id>')
+def api_export_job(job_id):
+    """Progress of an export job."""
+    with export_jobs_state['lock']:
+        load_export_jobs()
+        job = export_jobs_state['jobs'].get(job_id)
+        if job is None:
+            return jsonify({'error': 'Export job not found'}), 404
+        return jsonify(describe_export_job(job))
+
+@app.route('/api/export-jobs/<job_id>/files/<filename>')
+def download_export_file(job_id, filename):
+    """Download a complete shard or the manifest of an export job."""
+    with export_jobs_state['lock']:
+        load_export_jobs()
+        job = export_jobs_state['jobs'].get(job_id)
+        if job is None:
+            return jsonify({'error': 'Export job not found'}), 404
+        if filename != 'manifest.json' and filename not in [shard['file'] for shard in job['shards']]:
+            return jsonify({'error': 'Export file not found'}), 404
+    return send_from_directory(export_job_dir(job_id), filename, as_attachment=True)
+
+@app.route('/api/export-jobs/<job_id>/resume', methods=['POST'])
+def api_resume_export_job(job_id):
+    """Resume a failed or interrupted export job from its last complete shard."""
+    with export_jobs_state['lock']:
+        load_export_jobs()
+        job = export_jobs_state['jobs'].get(job_id)
+        if job is None:
+            return jsonify({'error': 'Export job not found'}), 404
+        if job['status'] == 'completed':
+            return jsonify({'error': 'Export job already completed'}), 409
+        if job_id in export_jobs_state['running']:
+            return jsonify({'error': 'Export job is already running'}), 409
+        job['status'] = 'queued'
+        start_export_job(job_id)
+        return jsonify(describe_export_job(job)), 202
+    
 if __name__ == '__main__':
     # Print startup information
     print(f"FAIR Signposting Crawler starting up...")
@@ -2816,7 +5747,7 @@ if __name__ == '__main__':
     
     # Check if Fuseki is running and accessible
     try:
-        response = requests.get(f"{app.config['FUSEKI_ENDPOINT']}/$/ping", timeout=5)
+        response = http_get(f"{app.config['FUSEKI_ENDPOINT']}/$/ping", timeout=5)
         if response.status_code == 200:
             print("✓ Connected to Fuseki")
         else:
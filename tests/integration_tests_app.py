@@ -3,6 +3,11 @@ import os
 import sys
 import tempfile
 import json
+import gzip
+import hashlib
+import shutil
+import time
+import zlib
 from unittest.mock import patch, MagicMock
 
 #project directory to path to import app modules
@@ -27,7 +32,8 @@ class IntegrationTests(unittest.TestCase):
             'RELEVANCE_THRESHOLD': 0.3,
             'CRAWL_TIMEOUT': 5,
             'MAX_RESOURCES': 10,
-            'MAX_TRIPLES': 100
+            'MAX_TRIPLES': 100,
+            'HTTP_CACHE_ENABLED': False
         })
         
         # Create a test client
@@ -77,6 +83,8 @@ class IntegrationTests(unittest.TestCase):
             response = self.client.get(path)
             if response.status_code == 200:
                 self.assertIn(b'System Configuration', response.data)
+                self.assertIn(b'name="http_pool_maxsize"', response.data)
+                self.assertIn(b'name="crawl_engine"', response.data)
                 return
         
         response = self.client.get('/configure')
@@ -106,7 +114,8 @@ class IntegrationTests(unittest.TestCase):
                 'max_depth': '4',
                 'max_resources': '10',
                 'relevance_threshold': '0.4',
-                'timeout': '60'
+                'timeout': '60',
+                'crawl_engine': 'asyncio'
             }, follow_redirects=True)
             
             # Should redirect to index page
@@ -120,11 +129,12 @@ class IntegrationTests(unittest.TestCase):
             self.assertEqual(crawler_app.app.config['MAX_RESOURCES_PER_LEVEL'], 10)
             self.assertEqual(crawler_app.app.config['RELEVANCE_THRESHOLD'], 0.4)
             self.assertEqual(crawler_app.app.config['CRAWL_TIMEOUT'], 60)
+            self.assertEqual(crawler_app.app.config['CRAWL_ENGINE'], 'asyncio')
         finally:
             # Restore original config
             crawler_app.app.config.update(original_config)
     
-    @patch('requests.get')
+    @patch('app.http_get')
     def test_fuseki_connection_check(self, mock_get):
         """Test the Fuseki connection check endpoint."""
         # Mock the response for Fuseki ping
@@ -214,28 +224,24 @@ class IntegrationTests(unittest.TestCase):
         self.assertTrue(crawler_app.crawl_state['crawl_active'])
 
 
-    @patch('app.SPARQLWrapper')
-    def test_query_endpoint_get(self, mock_sparql_wrapper):
+    @patch('app.sparql_select')
+    def test_query_endpoint_get(self, mock_sparql_select):
         """Test that the query endpoint handles GET requests."""
         # test that the endpoint loads correctly
         response = self.client.get('/query')
         self.assertEqual(response.status_code, 200)
     
-    @patch('app.SPARQLWrapper')
-    def test_visualise_endpoint(self, mock_sparql_wrapper):
+    @patch('app.sparql_select')
+    def test_visualise_endpoint(self, mock_sparql_select):
         """Test that the visualisation endpoint loads correctly."""
         # Setup mock for the query to list graphs
-        mock_instance = MagicMock()
-        mock_result = MagicMock()
-        mock_result.convert.return_value = {
+        mock_sparql_select.return_value = {
             'results': {
                 'bindings': [
                     {'g': {'value': 'http://example.org/graph1'}}
                 ]
             }
         }
-        mock_instance.query.return_value = mock_result
-        mock_sparql_wrapper.return_value = mock_instance
         
         # Test endpoint
         response = self.client.get('/visualise')
@@ -243,5 +249,133 @@ class IntegrationTests(unittest.TestCase):
         self.assertIn(b'Knowledge Graph Visualisation', response.data)
 
 
+    @patch('app.get_sparql_session')
+    def test_export_knowledge_graph_streams(self, mock_get_session):
+        """Test that exports stream Fuseki's serialisation through in chunks."""
+        upstream = MagicMock(status_code=200)
+        upstream.__enter__.return_value = upstream
+        upstream.iter_lines.return_value = [
+            b'<http://example.org/a> <http://schema.org/name> "a" .',
+            b'<http://example.org/b> <http://schema.org/name> "b" .'
+        ]
+        mock_get_session.return_value.get.return_value = upstream
+
+        # A single graph is fetched as N-Triples and labelled with the graph on the way through
+        response = self.client.get('/export-knowledge-graph?format=nquads&graph=http://example.org/g')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(response.data.decode('utf-8').splitlines(), [
+            '<http://example.org/a> <http://schema.org/name> "a" <http://example.org/g> .',
+            '<http://example.org/b> <http://schema.org/name> "b" <http://example.org/g> .'
+        ])
+        _, kwargs = mock_get_session.return_value.get.call_args
+        self.assertEqual(kwargs['params'], {'graph': 'http://example.org/g'})
+        self.assertEqual(kwargs['headers']['Accept'], 'application/n-triples')
+        self.assertTrue(kwargs['stream'])
+
+        # Whole-dataset N-Quads are passed through as they are, optionally gzipped
+        upstream.iter_content.return_value = [b'<http://example.org/a> ', b'<http://schema.org/name> "a" <http://example.org/g> .\n']
+        response = self.client.get('/export-knowledge-graph?format=nquads&compress=gzip')
+        self.assertEqual(response.mimetype, 'application/gzip')
+        self.assertIn('.nquads.gz', response.headers['Content-Disposition'])
+        self.assertEqual(zlib.decompress(response.data, wbits=31),
+                         b'<http://example.org/a> <http://schema.org/name> "a" <http://example.org/g> .\n')
+
+
+    def test_export_job_shards_and_resumes(self):
+        """Test that export jobs write checksummed shards and resume after a failure."""
+        jobs_dir = tempfile.mkdtemp()
+        statements = [f'<http://example.org/{i}> <http://schema.org/name> "{i}" <http://example.org/g> .'.encode('utf-8')
+                      for i in range(5)]
+
+        def interrupted_stream():
+            yield from statements[:3]
+            raise ConnectionError('Fuseki went away')
+
+        def upstream(lines):
+            response = MagicMock()
+            response.__enter__.return_value = response
+            response.iter_lines.return_value = lines
+            return response
+
+        def wait_for(job_id):
+            for _ in range(100):
+                job = self.client.get(f'/api/export-jobs/{job_id}').get_json()
+                if job['status'] in ('completed', 'failed'):
+                    return job
+                time.sleep(0.05)
+            self.fail('Export job did not finish')
+
+        with patch.dict(crawler_app.app.config, {'EXPORT_JOBS_DIR': jobs_dir}), \
+                patch.dict(crawler_app.export_jobs_state, {'jobs': {}, 'running': set(), 'loaded': False}), \
+                patch('app.open_export_stream', side_effect=[upstream(interrupted_stream()), upstream(iter(statements))]):
+            response = self.client.post('/api/export-jobs', json={'format': 'nquads', 'shard_size': 2})
+            self.assertEqual(response.status_code, 202)
+            job_id = response.get_json()['job_id']
+
+            # The failed job keeps its complete shard and is resumed after it
+            job = wait_for(job_id)
+            self.assertEqual(job['status'], 'failed')
+            self.assertEqual(len(job['shards']), 1)
+            self.assertEqual(sorted(os.listdir(os.path.join(jobs_dir, f'export-{job_id}'))),
+                             ['manifest.json', 'part-00000.nq.gz'])
+            self.assertEqual(self.client.post(f'/api/export-jobs/{job_id}/resume').status_code, 202)
+            job = wait_for(job_id)
+
+        self.assertEqual(job['status'], 'completed')
+        self.assertEqual([shard['statements'] for shard in job['shards']], [2, 2, 1])
+        self.assertEqual(job['statements_written'], 5)
+
+        job_dir = os.path.join(jobs_dir, f'export-{job_id}')
+        with open(os.path.join(job_dir, 'manifest.json')) as f:
+            self.assertEqual(json.load(f)['shards'], job['shards'])
+        written = []
+        for shard in job['shards']:
+            path = os.path.join(job_dir, shard['file'])
+            with open(path, 'rb') as f:
+                self.assertEqual(hashlib.sha256(f.read()).hexdigest(), shard['sha256'])
+            with gzip.open(path, 'rb') as f:
+                written.extend(f.read().splitlines())
+        self.assertEqual(written, statements)
+
+        # Shards and the manifest are downloaded through the API, wherever EXPORT_JOBS_DIR is
+        with patch.dict(crawler_app.app.config, {'EXPORT_JOBS_DIR': jobs_dir}):
+            response = self.client.get(job['files'][0])
+            self.assertEqual(response.status_code, 200)
+            with open(os.path.join(job_dir, job['shards'][0]['file']), 'rb') as f:
+                self.assertEqual(response.data, f.read())
+            response.close()
+            self.assertEqual(self.client.get(job['manifest']).status_code, 200)
+            self.assertEqual(self.client.get(f'/api/export-jobs/{job_id}/files/part-00009.nq.gz').status_code, 404)
+
+        # A byte limit closes shards before they reach shard_size statements
+        with patch.dict(crawler_app.app.config, {'EXPORT_JOBS_DIR': jobs_dir}), \
+                patch.dict(crawler_app.export_jobs_state, {'jobs': {}, 'running': set(), 'loaded': False}), \
+                patch('app.open_export_stream', return_value=upstream(iter(statements))):
+            response = self.client.post('/api/export-jobs', json={'format': 'nquads', 'shard_size': 100, 'shard_bytes': 1})
+            job = wait_for(response.get_json()['job_id'])
+        self.assertEqual([shard['statements'] for shard in job['shards']], [1, 1, 1, 1, 1])
+
+        # If the store changed before the resume, the job starts again from scratch
+        changed = [statement.replace(b'"', b'"new ', 1) for statement in statements]
+        with patch.dict(crawler_app.app.config, {'EXPORT_JOBS_DIR': jobs_dir}), \
+                patch.dict(crawler_app.export_jobs_state, {'jobs': {}, 'running': set(), 'loaded': False}), \
+                patch('app.open_export_stream', side_effect=[upstream(interrupted_stream()),
+                                                             upstream(iter(changed)), upstream(iter(changed))]):
+            job_id = self.client.post('/api/export-jobs', json={'format': 'nquads', 'shard_size': 2}).get_json()['job_id']
+            self.assertEqual(wait_for(job_id)['status'], 'failed')
+            self.client.post(f'/api/export-jobs/{job_id}/resume')
+            job = wait_for(job_id)
+
+        self.assertEqual(job['status'], 'completed')
+        self.assertEqual(job['statements_written'], 5)
+        written = []
+        for shard in job['shards']:
+            with gzip.open(os.path.join(jobs_dir, f'export-{job_id}', shard['file']), 'rb') as f:
+                written.extend(f.read().splitlines())
+        self.assertEqual(written, changed)
+        shutil.rmtree(jobs_dir, ignore_errors=True)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -4,10 +4,14 @@ import sys
 import os
 import json
 import requests
-from bs4 import BeautifulSoup
 from rdflib import Graph, URIRef, Literal, Namespace
 from urllib.parse import urlparse
 import datetime
+import tempfile
+import shutil
+import threading
+import time
+import zlib
 
 #project directory to path to import app modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -15,20 +19,27 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 #import app modules
 from app import get_signposting_links, fallback_discovery
 from app import calculate_relevance, record_provenance, record_format_statistics
-from app import select_next_resources
+from app import select_next_resources, fetch_and_parse_rdf
+import app as crawler_app
+
+# Keep unit tests away from the on-disk HTTP cache unless a test enables it
+crawler_app.app.config['HTTP_CACHE_ENABLED'] = False
 
 
 class TestSignpostingFunctions(unittest.TestCase):
     """Tests for functions related to signposting discovery and link extraction."""
 
-    @patch('requests.head')
-    def test_get_signposting_links_from_headers(self, mock_head):
+    @patch('app.http_get')
+    def test_get_signposting_links_from_headers(self, mock_get):
         # Mock response with Link header
         mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.url = 'http://example.org/resource'
+        mock_response.content = b''
         mock_response.headers = {
             'Link': '<http://example.org/data>; rel="describedby", <http://example.org/license>; rel="license"'
         }
-        mock_head.return_value = mock_response
+        mock_get.return_value = mock_response
 
         # Setup test crawl state dictionary
         test_crawl_state = {
@@ -46,16 +57,14 @@ class TestSignpostingFunctions(unittest.TestCase):
             self.assertEqual(links['describedby'], 'http://example.org/data')
             self.assertEqual(links['license'], 'http://example.org/license')
 
-    @patch('requests.head')
-    @patch('requests.get')
-    def test_get_signposting_links_from_html(self, mock_get, mock_head):
-        # Mock head response with no Link header
-        mock_head_response = MagicMock()
-        mock_head_response.headers = {}
-        mock_head.return_value = mock_head_response
-        
-        # Mock get response with HTML containing link elements
+    @patch('app.http_get')
+    def test_get_signposting_links_from_html(self, mock_get):
+        # Mock get response with no Link header and HTML containing link elements
         mock_get_response = MagicMock()
+        mock_get_response.status_code = 200
+        mock_get_response.url = 'http://example.org/resource'
+        mock_get_response.headers = {'Content-Type': 'text/html'}
+        mock_get_response.encoding = 'utf-8'
         html_content = """
         <html>
         <head>
@@ -67,8 +76,7 @@ class TestSignpostingFunctions(unittest.TestCase):
         </body>
         </html>
         """
-        mock_get_response.text = html_content
-        mock_get_response.raise_for_status = Mock()
+        mock_get_response.content = html_content.encode('utf-8')
         mock_get.return_value = mock_get_response
         
         # Setup test crawl state dictionary
@@ -88,7 +96,7 @@ class TestSignpostingFunctions(unittest.TestCase):
             self.assertEqual(links['license'], 'http://example.org/license')
             self.assertEqual(links['author'], 'http://example.org/author')
 
-    @patch('requests.head')
+    @patch('app.http_head')
     def test_fallback_discovery(self, mock_head):
         # Mock head response for RDF resource detection
         def mock_head_side_effect(url, **kwargs):
@@ -122,6 +130,828 @@ class TestSignpostingFunctions(unittest.TestCase):
                     self.assertEqual(links['alternate'], 'http://example.org/resource.rdf')
                     self.assertEqual(test_crawl_state['signposting_stats']['fallback_used'], 1)
 
+    def test_fallback_discovery_stops_at_deadline(self):
+        # Every probe hangs, so probing must give up at the deadline
+        def slow_head(url, **kwargs):
+            crawler_app.time.sleep(0.5)
+            raise requests.exceptions.Timeout('timed out')
+
+        fetched = {'url': 'http://example.org/resource', 'final_url': 'http://example.org/resource',
+                   'status': 200, 'headers': {}, 'content': b'<html><body></body></html>',
+                   'content_type': 'text/html', 'encoding': 'utf-8', 'error': None}
+        test_crawl_state = {'signposting_stats': {'found': 0, 'fallback_used': 0}}
+        app_config = {'FALLBACK_PROBE_WORKERS': 4, 'FALLBACK_PROBE_BUDGET': 20, 'FALLBACK_DISCOVERY_DEADLINE': 0.2}
+
+        with patch('app.http_head', side_effect=slow_head) as mock_head, \
+             patch('app.crawl_state', test_crawl_state), patch.dict(crawler_app.app.config, app_config):
+            started = crawler_app.time.monotonic()
+            links = fallback_discovery('http://example.org/resource', fetched)
+            elapsed = crawler_app.time.monotonic() - started
+
+        # Only the first batch of probes was sent and the deadline was respected
+        self.assertEqual(links, {})
+        self.assertLess(elapsed, 0.45)
+        self.assertLessEqual(mock_head.call_count, 4)
+
+    @patch('app.record_fallback_pattern')
+    @patch('app.record_host_head_support')
+    @patch('app.host_rejects_head', return_value=False)
+    def test_probe_prefers_earlier_candidates(self, mock_rejects_head, mock_head_support, mock_pattern):
+        # Both candidates serve RDF, but the preferred one answers more slowly
+        def head(url, **kwargs):
+            if url.endswith('.ttl'):
+                crawler_app.time.sleep(0.2)
+            return MagicMock(status_code=200, headers={'Content-Type': 'text/turtle'})
+
+        candidates = [('http://example.org/resource.ttl', 'ext:.ttl'),
+                      ('http://example.org/resource/rdf', 'path:/rdf')]
+        with patch('app.http_head', side_effect=head), \
+                patch.dict(crawler_app.app.config, {'FALLBACK_PROBE_WORKERS': 4, 'FALLBACK_DISCOVERY_DEADLINE': 5}):
+            found = crawler_app.probe_rdf_variations(candidates, ['text/turtle'])
+        self.assertEqual(found, 'http://example.org/resource.ttl')
+
+
+class TestHostProfiles(unittest.TestCase):
+    """Tests for the learned per-host capability profiles."""
+
+    def setUp(self):
+        self.profiles = patch.dict(crawler_app.host_profiles_state, {'profiles': {}, 'loaded': True})
+        self.profiles.start()
+        self.config = patch.dict(crawler_app.app.config, {'HOST_PROFILE_MIN_SAMPLES': 2})
+        self.config.start()
+
+    def tearDown(self):
+        self.config.stop()
+        self.profiles.stop()
+
+    def test_failing_patterns_are_skipped_and_successes_first(self):
+        host = 'repo.example.org'
+        for _ in range(2):
+            crawler_app.record_fallback_pattern(host, 'path:/void', False)
+        crawler_app.record_fallback_pattern(host, 'param:?format=rdf', True)
+
+        candidates = [
+            ('http://repo.example.org/x/void', 'path:/void'),
+            ('http://repo.example.org/x.ttl', 'ext:.ttl'),
+            ('http://repo.example.org/x?format=rdf', 'param:?format=rdf')
+        ]
+        ordered = crawler_app.order_fallback_candidates(host, candidates)
+
+        self.assertEqual([pattern for _, pattern in ordered], ['param:?format=rdf', 'ext:.ttl'])
+
+    def test_profiles_persist_between_runs(self):
+        crawler_app.record_host_head_support('nohead.example.org', False)
+        crawler_app.record_host_head_support('nohead.example.org', False)
+        self.assertTrue(crawler_app.host_rejects_head('nohead.example.org'))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'host_profiles.json')
+            with patch.dict(crawler_app.app.config, {'HOST_PROFILE_FILE': path}):
+                crawler_app.save_host_profiles()
+                crawler_app.host_profiles_state['loaded'] = False
+                crawler_app.host_profiles_state['profiles'] = {}
+                self.assertTrue(crawler_app.host_rejects_head('nohead.example.org'))
+
+
+class TestPoliteness(unittest.TestCase):
+    """Tests for the per-host politeness scheduler."""
+
+    def setUp(self):
+        self.state = patch.dict(crawler_app.politeness_state, {'hosts': {}})
+        self.state.start()
+
+    def tearDown(self):
+        self.state.stop()
+
+    @patch('app.get_http_session')
+    def test_robots_crawl_delay_limits_request_rate(self, mock_get_session):
+        robots = MagicMock(status_code=200, text="User-agent: *\nCrawl-delay: 1\n")
+        mock_get_session.return_value.get.return_value = robots
+        mock_get_session.return_value.request.return_value = MagicMock(status_code=200)
+
+        started = time.monotonic()
+        for _ in range(2):
+            crawler_app.http_get('http://slow.example.org/page')
+        elapsed = time.monotonic() - started
+
+        # The first request goes out immediately, the second waits for the delay
+        self.assertGreaterEqual(elapsed, 0.9)
+        self.assertEqual(crawler_app.politeness_state['hosts']['slow.example.org']['crawl_delay'], 1.0)
+        mock_get_session.return_value.get.assert_called_once()
+
+    def test_in_flight_limit_per_host(self):
+        with patch.dict(crawler_app.app.config, {'HOST_MAX_IN_FLIGHT': 1, 'HOST_BURST': 10,
+                                                 'HOST_REQUESTS_PER_SECOND': 100.0,
+                                                 'RESPECT_ROBOTS_CRAWL_DELAY': False}):
+            crawler_app.acquire_host_slot('http://busy.example.org/a')
+            acquired = threading.Event()
+            waiter = threading.Thread(target=lambda: (crawler_app.acquire_host_slot('http://busy.example.org/b'),
+                                                      acquired.set()))
+            waiter.start()
+            self.assertFalse(acquired.wait(0.2))
+
+            # Other hosts are not held up
+            crawler_app.acquire_host_slot('http://other.example.org/a')
+
+            crawler_app.release_host_slot('http://busy.example.org/a')
+            self.assertTrue(acquired.wait(2))
+            waiter.join()
+
+    def test_acquire_gives_up_at_deadline(self):
+        with patch.dict(crawler_app.app.config, {'HOST_MAX_IN_FLIGHT': 1, 'AIMD_ENABLED': False, 'HOST_BURST': 10,
+                                                 'HOST_REQUESTS_PER_SECOND': 100.0,
+                                                 'RESPECT_ROBOTS_CRAWL_DELAY': False}):
+            crawler_app.acquire_host_slot('http://busy.example.org/a')
+            started = time.monotonic()
+            with self.assertRaises(crawler_app.HostSlotTimeout):
+                crawler_app.acquire_host_slot('http://busy.example.org/b', deadline=started + 0.2)
+            self.assertLess(time.monotonic() - started, 0.5)
+            self.assertEqual(crawler_app.politeness_state['hosts']['busy.example.org']['in_flight'], 1)
+
+    def test_aimd_grows_on_success_and_backs_off_on_429(self):
+        url = 'http://adaptive.example.org/page'
+        with patch.dict(crawler_app.app.config, {'HOST_MAX_IN_FLIGHT': 2, 'AIMD_MAX_CONCURRENCY': 4}):
+            for _ in range(10):
+                crawler_app.record_host_outcome(url, 200, 0.1)
+            self.assertEqual(crawler_app.host_in_flight_limit('adaptive.example.org'), 4)
+
+            crawler_app.record_host_outcome(url, 429, 0.1, retry_after='30')
+            state = crawler_app.politeness_state['hosts']['adaptive.example.org']
+            self.assertEqual(crawler_app.host_in_flight_limit('adaptive.example.org'), 2)
+            self.assertGreater(state['blocked_until'], time.monotonic() + 25)
+
+            # A second overload within the cooldown does not halve the limit again
+            crawler_app.record_host_outcome(url, error=requests.exceptions.Timeout())
+            self.assertEqual(crawler_app.host_in_flight_limit('adaptive.example.org'), 2)
+
+        status = crawler_app.get_host_concurrency_status()['adaptive.example.org']
+        self.assertEqual(status['overloads'], 2)
+        self.assertGreater(status['retry_after_remaining'], 0)
+
+    @patch('app.record_host_outcome')
+    @patch('app.get_http_session')
+    def test_aimd_latency_is_time_to_headers(self, mock_get_session, mock_outcome):
+        # The body took long to download, but the headers came back in 0.2s
+        response = MagicMock(status_code=200, headers={}, elapsed=datetime.timedelta(seconds=0.2))
+        mock_get_session.return_value.request.side_effect = lambda *args, **kwargs: (time.sleep(0.3), response)[1]
+        with patch.dict(crawler_app.app.config, {'POLITENESS_ENABLED': False}):
+            crawler_app.http_get('http://large.example.org/dump.ttl')
+        self.assertEqual(mock_outcome.call_args[0][2], 0.2)
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Tests for the per-host circuit breaker."""
+
+    def setUp(self):
+        self.circuits = patch.dict(crawler_app.circuit_breaker_state, {'hosts': {}})
+        self.circuits.start()
+        self.config = patch.dict(crawler_app.app.config, {'CIRCUIT_BREAKER_THRESHOLD': 2,
+                                                          'CIRCUIT_BREAKER_RESET_TIMEOUT': 60,
+                                                          'POLITENESS_ENABLED': False,
+                                                          'AIMD_ENABLED': False})
+        self.config.start()
+
+    def tearDown(self):
+        self.config.stop()
+        self.circuits.stop()
+
+    @patch('app.get_http_session')
+    def test_circuit_opens_and_half_opens(self, mock_get_session):
+        mock_session = mock_get_session.return_value
+        mock_session.request.side_effect = requests.exceptions.Timeout()
+        with patch('app.crawl_state', {'provenance': {}, 'visited_urls': set()}) as state:
+            for _ in range(2):
+                with self.assertRaises(requests.exceptions.Timeout):
+                    crawler_app.http_get('http://dead.example.org/a')
+
+            # The circuit is open: requests fail without reaching the network
+            with self.assertRaises(crawler_app.HostCircuitOpenError):
+                crawler_app.http_get('http://dead.example.org/b')
+            self.assertEqual(mock_session.request.call_count, 2)
+            self.assertTrue(crawler_app.host_circuit_open('dead.example.org'))
+            self.assertEqual(crawler_app.crawl_resource('http://dead.example.org/c'), [])
+            self.assertEqual(state['provenance']['circuit_breakers']['dead.example.org']['resources_skipped'], 1)
+
+            # After the reset timeout one trial request is let through and closes the circuit
+            crawler_app.circuit_breaker_state['hosts']['dead.example.org']['opened_at'] -= 61
+            mock_session.request.side_effect = None
+            mock_session.request.return_value = MagicMock(status_code=200)
+            crawler_app.http_get('http://dead.example.org/d')
+            self.assertFalse(crawler_app.host_circuit_open('dead.example.org'))
+            self.assertEqual(state['provenance']['circuit_breakers']['dead.example.org']['state'], 'closed')
+
+    @patch('app.get_http_session')
+    def test_failed_trial_reopens_circuit(self, mock_get_session):
+        mock_session = mock_get_session.return_value
+        mock_session.request.return_value = MagicMock(status_code=503)
+        with patch('app.crawl_state', {'provenance': {}, 'visited_urls': set()}):
+            for _ in range(2):
+                crawler_app.http_get('http://flaky.example.org/a')
+            self.assertTrue(crawler_app.host_circuit_open('flaky.example.org'))
+
+            # The half-open trial gets a 5xx answer, so the circuit opens again
+            circuit = crawler_app.circuit_breaker_state['hosts']['flaky.example.org']
+            circuit['opened_at'] -= 61
+            crawler_app.http_get('http://flaky.example.org/b')
+            self.assertEqual(circuit['state'], 'open')
+            self.assertEqual(circuit['times_opened'], 2)
+            with self.assertRaises(crawler_app.HostCircuitOpenError):
+                crawler_app.http_get('http://flaky.example.org/c')
+
+    @patch('app.get_http_session')
+    def test_head_refusals_and_probes_do_not_open_circuit(self, mock_get_session):
+        mock_session = mock_get_session.return_value
+        with patch('app.crawl_state', {'provenance': {}, 'visited_urls': set()}):
+            # A server without HEAD support is not failing
+            mock_session.request.return_value = MagicMock(status_code=501)
+            for _ in range(3):
+                crawler_app.http_head('http://nohead.example.org/a')
+            self.assertFalse(crawler_app.host_circuit_open('nohead.example.org'))
+
+            # Speculative probes for guessed URLs do not count either
+            mock_session.request.return_value = MagicMock(status_code=503)
+            for _ in range(3):
+                crawler_app.http_get('http://probed.example.org/data.rdf', circuit=False)
+            self.assertFalse(crawler_app.host_circuit_open('probed.example.org'))
+
+            # A GET answered 501 still does
+            mock_session.request.return_value = MagicMock(status_code=501)
+            for _ in range(2):
+                crawler_app.http_get('http://nohead.example.org/b')
+            self.assertTrue(crawler_app.host_circuit_open('nohead.example.org'))
+            with self.assertRaises(crawler_app.HostCircuitOpenError):
+                crawler_app.http_get('http://nohead.example.org/c', circuit=False)
+
+class TestJSONLDContextCache(unittest.TestCase):
+    """Tests for the shared cache of remote JSON-LD contexts."""
+
+    def setUp(self):
+        self.state = patch.dict(crawler_app.jsonld_context_state, {'contexts': crawler_app.OrderedDict(), 'loaded': True})
+        self.state.start()
+
+    def tearDown(self):
+        self.state.stop()
+
+    @patch('app.http_get')
+    def test_remote_context_fetched_once(self, mock_get):
+        response = MagicMock(url='http://example.org/context.jsonld',
+                             headers={'Content-Type': 'application/ld+json'})
+        response.json.return_value = {'@context': {'name': 'http://schema.org/name'}}
+        mock_get.return_value = response
+
+        for i in range(3):
+            g = Graph()
+            g.parse(data=json.dumps({'@context': 'http://example.org/context.jsonld',
+                                     '@id': f'http://example.org/r{i}', 'name': 'Test'}), format='json-ld')
+            self.assertEqual(len(g), 1)
+
+        mock_get.assert_called_once()
+        self.assertGreaterEqual(crawler_app.jsonld_context_state['stats']['hits'], 2)
+
+    @patch('app.http_get', side_effect=requests.exceptions.ConnectionError('offline'))
+    def test_expired_context_served_stale_and_schema_org_aliases(self, mock_get):
+        crawler_app.jsonld_context_state['contexts']['https://schema.org/'] = {
+            'document': {'@context': {'name': 'http://schema.org/name'}}, 'fetched_at': 0}
+
+        # http://schema.org and https://schema.org/ share an entry, used even though it expired
+        document = crawler_app.get_jsonld_context('http://schema.org')
+        self.assertEqual(document['@context']['name'], 'http://schema.org/name')
+        mock_get.assert_called_once()
+
+        # Changes a caller makes to its copy do not reach the cached document
+        document['@context']['name'] = 'http://example.org/changed'
+        crawler_app.jsonld_context_state['contexts']['https://schema.org/']['fetched_at'] = time.time()
+        self.assertEqual(crawler_app.get_jsonld_context('https://schema.org/')['@context']['name'],
+                         'http://schema.org/name')
+
+    def test_loader_matches_rdflib_return_shape(self):
+        document = {'@context': {'name': 'http://schema.org/name'}}
+        with patch('app.get_jsonld_context', return_value=document):
+            with patch('app.RDFLIB_SOURCE_TO_JSON_RETURNS_BASE', True):
+                self.assertEqual(crawler_app.cached_source_to_json('http://example.org/c'), (document, None))
+            with patch('app.RDFLIB_SOURCE_TO_JSON_RETURNS_BASE', False):
+                self.assertEqual(crawler_app.cached_source_to_json('http://example.org/c'), document)
+
+class TestWriteBuffer(unittest.TestCase):
+    """Tests for the write-behind buffer in front of Fuseki."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.wal = patch.dict(crawler_app.wal_state, {'in_flight': set(), 'replaced_at': {}, 'replay_pending': False})
+        self.wal.start()
+        self.state = patch.dict(crawler_app.write_buffer_state, {'graphs': {}, 'replace': set(), 'triple_count': 0, 'oldest': None})
+        self.state.start()
+        self.writer = patch.dict(crawler_app.storage_writer_state, {
+            'queue': None, 'threads': [], 'pending_triples': 0,
+            'stats': dict(crawler_app.storage_writer_state['stats'], batches_written=0, triples_written=0,
+                          failed_batches=0, failed_triples=0, producer_waits=0, flush_latency_ms=None)})
+        self.writer.start()
+        self.config = patch.dict(crawler_app.app.config, {'WRITE_BUFFER_ENABLED': True,
+                                                          'WRITE_BUFFER_MAX_TRIPLES': 3,
+                                                          'WRITE_BUFFER_MAX_AGE': 60,
+                                                          'STORAGE_BACKEND': 'sparql',
+                                                          'WAL_DIR': os.path.join(self.temp_dir, 'wal')})
+        self.config.start()
+
+    def tearDown(self):
+        crawler_app.wait_for_storage_writes()
+        self.config.stop()
+        self.writer.stop()
+        self.state.stop()
+        self.wal.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def make_graph(self, *names):
+        g = Graph()
+        for name in names:
+            g.add((URIRef(f"http://example.org/{name}"), URIRef("http://schema.org/name"), Literal(name)))
+        return g
+
+    @patch('app.sparql_update')
+    def test_writes_are_combined_into_one_update(self, mock_update):
+        self.assertTrue(crawler_app.store_in_fuseki(self.make_graph('a'), 'http://example.org/graph/1'))
+        self.assertTrue(crawler_app.store_in_fuseki(self.make_graph('b'), 'http://example.org/graph/2'))
+        mock_update.assert_not_called()
+
+        # The size threshold flushes both graphs in a single update
+        crawler_app.store_in_fuseki(self.make_graph('c'), 'http://example.org/graph/1')
+        self.assertTrue(crawler_app.wait_for_storage_writes())
+        mock_update.assert_called_once()
+        update = mock_update.call_args.args[0]
+        self.assertEqual(update.count('INSERT DATA'), 1)
+        self.assertIn('GRAPH <http://example.org/graph/1>', update)
+        self.assertIn('GRAPH <http://example.org/graph/2>', update)
+        self.assertIn('<http://example.org/c>', update)
+        self.assertEqual(crawler_app.write_buffer_state['triple_count'], 0)
+
+        # Nothing left to write at the end of the crawl
+        self.assertTrue(crawler_app.flush_write_buffer())
+        mock_update.assert_called_once()
+
+    @patch('app.http_request')
+    def test_graph_store_upload(self, mock_request):
+        mock_request.return_value = MagicMock(status_code=204)
+        with patch.dict(crawler_app.app.config, {'STORAGE_BACKEND': 'gsp', 'FUSEKI_GZIP_UPLOADS': True}):
+            crawler_app.store_in_fuseki(self.make_graph('a'), 'http://example.org/graph/1')
+            crawler_app.store_in_fuseki(self.make_graph('b', 'c'), 'http://example.org/graph/2')
+            crawler_app.wait_for_storage_writes()
+
+            # Several graphs go up as one streamed, gzipped N-Quads POST to the dataset
+            mock_request.assert_called_once()
+            method, url = mock_request.call_args.args
+            kwargs = mock_request.call_args.kwargs
+            self.assertEqual(method, 'POST')
+            self.assertTrue(url.endswith(f"/{crawler_app.app.config['FUSEKI_DATASET']}"))
+            self.assertTrue(kwargs['headers']['Content-Type'].startswith('application/n-quads'))
+            self.assertEqual(kwargs['headers']['Content-Encoding'], 'gzip')
+            body = zlib.decompress(b''.join(kwargs['data']), wbits=31).decode('utf-8')
+            self.assertIn('<http://example.org/a> <http://schema.org/name> "a" <http://example.org/graph/1> .', body)
+            self.assertIn('<http://example.org/c> <http://schema.org/name> "c" <http://example.org/graph/2> .', body)
+
+            # A single graph is POSTed as N-Triples to /data?graph=
+            crawler_app.store_ntriples_in_fuseki(['<http://example.org/d> <http://schema.org/name> "d" .'],
+                                                 'http://example.org/graph/3')
+            crawler_app.wait_for_storage_writes()
+            kwargs = mock_request.call_args.kwargs
+            self.assertTrue(mock_request.call_args.args[1].endswith('/data'))
+            self.assertEqual(kwargs['params'], {'graph': 'http://example.org/graph/3'})
+            self.assertTrue(kwargs['headers']['Content-Type'].startswith('application/n-triples'))
+
+    @patch('app.sparql_update')
+    def test_resource_graphs_are_replaced(self, mock_update):
+        # Equivalent URLs of a resource map to one graph name
+        graph_name = crawler_app.resource_graph_name('HTTPS://Example.org:443/record/1')
+        self.assertEqual(graph_name, 'https://example.org/record/1')
+        self.assertEqual(crawler_app.resource_graph_name('https://example.org/record/1#jsonld'),
+                         'https://example.org/record/1#jsonld')
+
+        # Storing the resource twice replaces its graph in a single update, with no ASK
+        crawler_app.store_in_fuseki(self.make_graph('a'), graph_name, replace=True)
+        crawler_app.store_in_fuseki(self.make_graph('b'), 'http://example.org/provenance')
+        crawler_app.store_in_fuseki(self.make_graph('c'), graph_name, replace=True)
+        self.assertTrue(crawler_app.wait_for_storage_writes())
+        update = mock_update.call_args.args[0]
+        self.assertEqual(update.count('DROP SILENT GRAPH'), 1)
+        self.assertIn(f'DROP SILENT GRAPH <{graph_name}>', update)
+        self.assertNotIn('ASK', update)
+
+        # With the Graph Store Protocol a single replaced graph is PUT
+        with patch.dict(crawler_app.app.config, {'STORAGE_BACKEND': 'gsp'}), \
+                patch('app.http_request', return_value=MagicMock(status_code=204)) as mock_request:
+            self.assertTrue(crawler_app.write_logged_statements(
+                {graph_name: ['<http://example.org/d> <http://schema.org/name> "d" .']}, replace={graph_name}))
+        self.assertEqual(mock_request.call_args.args[0], 'PUT')
+        self.assertEqual(mock_request.call_args.kwargs['params'], {'graph': graph_name})
+
+        # A flush of several replaced resource graphs is still a single atomic request
+        mock_update.reset_mock()
+        with patch.dict(crawler_app.app.config, {'STORAGE_BACKEND': 'gsp', 'WRITE_BUFFER_MAX_TRIPLES': 100}), \
+                patch('app.http_request', return_value=MagicMock(status_code=204)) as mock_request:
+            for name in ('e', 'f', 'g'):
+                crawler_app.store_in_fuseki(self.make_graph(name), f'https://example.org/record/{name}', replace=True)
+            crawler_app.store_in_fuseki(self.make_graph('h'), 'http://example.org/provenance')
+            self.assertTrue(crawler_app.flush_write_buffer())
+        self.assertEqual(mock_update.call_count + mock_request.call_count, 1)
+        update = mock_update.call_args.args[0]
+        self.assertEqual(update.count('DROP SILENT GRAPH'), 3)
+        self.assertNotIn('DROP SILENT GRAPH <http://example.org/provenance>', update)
+
+    def test_storage_writer_backpressure(self):
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow_write(graphs, max_retries=3, replace=()):
+            started.set()
+            release.wait(5)
+            return 'http://example.org/graph/bad' not in graphs
+
+        with patch.dict(crawler_app.app.config, {'STORAGE_WRITER_THREADS': 1, 'STORAGE_QUEUE_SIZE': 1}), \
+                patch('app.write_statements_to_fuseki', side_effect=slow_write):
+            crawler_app.enqueue_storage_write({'http://example.org/graph/1': ['<a> <b> <c> .']}, 1)
+            self.assertTrue(started.wait(5))
+            crawler_app.enqueue_storage_write({'http://example.org/graph/bad': ['<a> <b> <d> .']}, 1)
+
+            # The queue is full, so a third producer blocks until the writer catches up
+            producer = threading.Thread(target=crawler_app.enqueue_storage_write,
+                                        args=({'http://example.org/graph/3': ['<a> <b> <e> .']}, 1))
+            producer.start()
+            producer.join(0.2)
+            self.assertTrue(producer.is_alive())
+            status = crawler_app.get_storage_writer_status()
+            self.assertEqual(status['queue_depth'], 1)
+            self.assertEqual(status['pending_triples'], 3)
+
+            release.set()
+            producer.join(5)
+            crawler_app.wait_for_storage_writes()
+            status = crawler_app.get_storage_writer_status()
+            self.assertEqual(status['batches_written'], 2)
+            self.assertEqual(status['failed_batches'], 1)
+            self.assertEqual(status['producer_waits'], 1)
+            self.assertEqual(status['pending_triples'], 0)
+            self.assertIsNotNone(status['flush_latency_ms'])
+
+    def test_failed_writes_are_replayed_from_the_log(self):
+        written = []
+        fuseki_up = {'value': False}
+
+        def write(graphs, max_retries=3, replace=()):
+            if fuseki_up['value']:
+                written.append(graphs)
+            return fuseki_up['value']
+
+        with patch('app.write_statements_to_fuseki', side_effect=write):
+            crawler_app.store_in_fuseki(self.make_graph('a', 'b', 'c'), 'http://example.org/graph/1')
+            self.assertFalse(crawler_app.wait_for_storage_writes())
+            self.assertEqual(len(crawler_app.get_wal_backlog()), 1)
+
+            # The next successful write replays the logged batch
+            fuseki_up['value'] = True
+            crawler_app.store_in_fuseki(self.make_graph('d', 'e', 'f'), 'http://example.org/graph/2')
+            self.assertTrue(crawler_app.wait_for_storage_writes())
+
+        self.assertEqual(crawler_app.get_wal_backlog(), [])
+        self.assertEqual(os.listdir(os.path.join(self.temp_dir, 'wal')), [])
+        self.assertEqual(len(written), 2)
+        replayed = written[1]['http://example.org/graph/1']
+        self.assertEqual(len(replayed), 3)
+        self.assertIn('<http://example.org/a> <http://schema.org/name> "a" .', replayed)
+
+    def test_replay_skips_graphs_rewritten_later(self):
+        written = []
+        fuseki_up = {'value': False}
+
+        def write(graphs, max_retries=3, replace=()):
+            if fuseki_up['value']:
+                written.append(graphs)
+            return fuseki_up['value']
+
+        graph = 'http://example.org/provenance/crawl/interim'
+        with patch('app.write_statements_to_fuseki', side_effect=write):
+            crawler_app.store_in_fuseki(self.make_graph('a', 'b', 'c'), graph, replace=True)
+            self.assertFalse(crawler_app.wait_for_storage_writes())
+
+            # A newer version of the graph is written, then the log is replayed
+            fuseki_up['value'] = True
+            crawler_app.store_in_fuseki(self.make_graph('d', 'e', 'f'), graph, replace=True)
+            self.assertTrue(crawler_app.wait_for_storage_writes())
+
+        # The stale segment was dropped instead of overwriting the newer graph
+        self.assertEqual(crawler_app.get_wal_backlog(), [])
+        self.assertEqual(len(written), 1)
+        self.assertIn('<http://example.org/d> <http://schema.org/name> "d" .', written[0][graph])
+
+class TestGraphStatistics(unittest.TestCase):
+    """Tests for the statistics kept as triples are written to Fuseki."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = patch.dict(crawler_app.app.config, {
+            'STATS_STORE_FILE': os.path.join(self.temp_dir, 'graph_stats.json'),
+            'STORAGE_BACKEND': 'sparql'
+        })
+        self.config.start()
+        self.state = patch.dict(crawler_app.stats_store_state, {
+            'graphs': {}, 'triples': 0, 'resources': 0, 'predicates': crawler_app.Counter(),
+            'classes': crawler_app.Counter(), 'sample_resources': {}, 'seen': {}, 'seen_size': 0,
+            'loaded': False, 'reconciling': False, 'writes_recorded': 0, 'reconciled': None
+        })
+        self.state.start()
+        # No counters file exists, so the first load would start a background reconcile
+        self.threads = patch('app.threading.Thread')
+        self.mock_thread = self.threads.start()
+
+    def tearDown(self):
+        self.threads.stop()
+        self.state.stop()
+        self.config.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_missing_counters_file_starts_reconcile(self):
+        crawler_app.get_stats_summary()
+        crawler_app.get_stats_summary()
+        # Only the first load finds no file, and the flag is set before the thread runs
+        self.mock_thread.assert_called_once_with(target=crawler_app.reconcile_stats_store, daemon=True)
+        self.assertTrue(crawler_app.stats_store_state['reconciling'])
+
+        # Once counters were persisted, loading them does not scan the store
+        crawler_app.stats_store_state['reconciling'] = False
+        crawler_app.save_stats_store()
+        crawler_app.stats_store_state['loaded'] = False
+        self.mock_thread.reset_mock()
+        crawler_app.get_stats_summary()
+        self.mock_thread.assert_not_called()
+
+    def statements(self, name, rdf_class='http://schema.org/Dataset'):
+        subject = f"<https://example.com/{name}>"
+        return [f"{subject} <http://www.w3.org/1999/02/22-rdf-syntax-ns#type> <{rdf_class}> .",
+                f'{subject} <http://schema.org/name> "{name}" .']
+
+    @patch('app.sparql_update')
+    def test_counters_follow_writes_and_replacements(self, mock_update):
+        graph = 'https://example.com/a'
+        crawler_app.write_statements_to_fuseki({graph: self.statements('a'),
+                                                'https://example.com/b': self.statements('b')})
+        summary = crawler_app.get_stats_summary()
+        self.assertEqual(summary['total_triples'], 4)
+        self.assertEqual(summary['total_graphs'], 2)
+        self.assertEqual(summary['total_graph_subjects'], 2)
+        self.assertEqual(summary['classes'], [{'class': 'http://schema.org/Dataset', 'count': 2}])
+
+        # Replacing a graph swaps its counts rather than adding to them
+        crawler_app.write_statements_to_fuseki({graph: self.statements('a', 'http://schema.org/Person')},
+                                               replace={graph})
+        summary = crawler_app.get_stats_summary()
+        self.assertEqual(summary['total_triples'], 4)
+        self.assertEqual({item['class']: item['count'] for item in summary['classes']},
+                         {'http://schema.org/Dataset': 1, 'http://schema.org/Person': 1})
+
+        # A failed write leaves the counters alone
+        mock_update.side_effect = Exception('Fuseki unavailable')
+        with patch('app.time.sleep'):
+            crawler_app.write_statements_to_fuseki({'https://example.com/c': self.statements('c')})
+        self.assertEqual(crawler_app.get_stats_summary()['total_graphs'], 2)
+
+        # The counters survive a restart
+        crawler_app.save_stats_store()
+        crawler_app.stats_store_state.update({'graphs': {}, 'triples': 0, 'resources': 0,
+                                              'predicates': crawler_app.Counter(),
+                                              'classes': crawler_app.Counter(), 'seen': {}, 'seen_size': 0,
+                                              'loaded': False})
+        self.assertEqual(crawler_app.get_stats_summary()['total_triples'], 4)
+
+    def test_duplicate_statements_counted_once(self):
+        graph = 'http://crawl.data/test/provenance'
+        crawler_app.record_stored_statements({graph: self.statements('a') * 2})
+        self.assertEqual(crawler_app.get_stats_summary()['total_triples'], 2)
+
+        # Appending statements the graph already holds only counts the new ones
+        crawler_app.record_stored_statements({graph: self.statements('a') + self.statements('b')})
+        summary = crawler_app.get_stats_summary()
+        self.assertEqual(summary['total_triples'], 4)
+        self.assertEqual(summary['total_graph_subjects'], 2)
+
+        # A replaced snapshot is counted once however often it is stored
+        for _ in range(2):
+            crawler_app.record_stored_statements({'http://example.org/provenance/test': self.statements('c')},
+                                                 replace={'http://example.org/provenance/test'})
+        self.assertEqual(crawler_app.get_stats_summary()['total_triples'], 6)
+
+    def test_results_page_does_not_query_fuseki(self):
+        crawler_app.record_stored_statements({'https://example.com/a': self.statements('a')})
+        client = crawler_app.app.test_client()
+        with patch.dict(crawler_app.crawl_state, {'crawl_id': 'stats-test'}), \
+                patch('app.sparql_select') as mock_select, \
+                patch('app.sparql_select_bindings') as mock_bindings:
+            response = client.get('/results/stats-test')
+        self.assertEqual(response.status_code, 200)
+        mock_select.assert_not_called()
+        mock_bindings.assert_not_called()
+        self.assertIn(b'<span class="badge bg-success badge-count">2</span>', response.data)
+
+    @patch('app.sparql_select_bindings')
+    def test_reconcile_rebuilds_counters(self, mock_bindings):
+        crawler_app.record_stored_statements({'https://example.com/stale': self.statements('stale')})
+        graph = {'g': {'type': 'uri', 'value': 'https://example.com/a'}}
+        mock_bindings.side_effect = [
+            iter([dict(graph, triples={'value': '7'}, subjects={'value': '3'})]),
+            iter([dict(graph, p={'value': 'http://schema.org/name'}, count={'value': '7'})]),
+            iter([dict(graph, c={'value': 'http://schema.org/Dataset'}, count={'value': '3'})]),
+            iter([])
+        ]
+        self.assertTrue(crawler_app.reconcile_stats_store())
+        summary = crawler_app.get_stats_summary()
+        self.assertEqual(summary['total_triples'], 7)
+        self.assertEqual(summary['total_graphs'], 1)
+        self.assertEqual(summary['predicates'], [{'predicate': 'http://schema.org/name', 'count': 7}])
+        self.assertIsNotNone(summary['reconciled'])
+
+    @patch('app.sparql_select_bindings')
+    def test_reconcile_discarded_when_writes_land_during_scan(self, mock_bindings):
+        crawler_app.record_stored_statements({'https://example.com/a': self.statements('a')})
+
+        def scan_with_concurrent_write(query, timeout):
+            crawler_app.record_stored_statements({'https://example.com/b': self.statements('b')})
+            return iter([])
+
+        mock_bindings.side_effect = scan_with_concurrent_write
+        crawler_app.stats_store_state['reconciling'] = True
+        self.assertFalse(crawler_app.reconcile_stats_store())
+        self.assertFalse(crawler_app.stats_store_state['reconciling'])
+
+        # The counters still include both writes
+        summary = crawler_app.get_stats_summary()
+        self.assertEqual(summary['total_triples'], 4)
+        self.assertIsNone(summary['reconciled'])
+
+class TestSPARQLResultCache(unittest.TestCase):
+    """Tests for the generation-based SPARQL result cache."""
+
+    def setUp(self):
+        self.state = patch.dict(crawler_app.sparql_cache_state, {
+            'entries': crawler_app.OrderedDict(), 'bytes': 0, 'generation': 0,
+            'stats': {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+        })
+        self.state.start()
+
+    def tearDown(self):
+        self.state.stop()
+
+    def result(self, value):
+        return MagicMock(text=json.dumps({'results': {'bindings': [{'g': {'type': 'uri', 'value': value}}]}}))
+
+    @patch('app.sparql_request')
+    def test_results_cached_until_the_dataset_changes(self, mock_request):
+        mock_request.side_effect = [self.result('http://example.org/1'), MagicMock(),
+                                    self.result('http://example.org/2')]
+        first = crawler_app.sparql_select("SELECT DISTINCT ?g WHERE { GRAPH ?g { ?s ?p ?o } }")
+        # The same query formatted differently is answered from the cache
+        second = crawler_app.sparql_select("SELECT DISTINCT ?g\n  WHERE {\n GRAPH ?g { ?s ?p ?o }\n}")
+        self.assertEqual(first, second)
+        self.assertEqual(mock_request.call_count, 1)
+
+        # A write bumps the generation, so the next read goes back to Fuseki
+        crawler_app.sparql_update("DROP SILENT GRAPH <http://example.org/1>")
+        third = crawler_app.sparql_select("SELECT DISTINCT ?g WHERE { GRAPH ?g { ?s ?p ?o } }")
+        self.assertEqual(third['results']['bindings'][0]['g']['value'], 'http://example.org/2')
+
+        status = crawler_app.get_sparql_cache_status()
+        self.assertEqual((status['hits'], status['misses'], status['invalidations']), (1, 2, 1))
+        self.assertEqual(status['generation'], 1)
+
+        # String literals are part of the key as written
+        self.assertNotEqual(crawler_app.normalise_sparql('SELECT * WHERE { ?s ?p "a  b" }'),
+                            crawler_app.normalise_sparql('SELECT * WHERE { ?s ?p "a b" }'))
+
+    @patch('app.sparql_request')
+    def test_least_recently_used_results_are_evicted(self, mock_request):
+        mock_request.side_effect = lambda operation, text, accept, timeout=None: MagicMock(text='x' * 40)
+        with patch.dict(crawler_app.app.config, {'SPARQL_CACHE_MAX_BYTES': 100}):
+            crawler_app.sparql_construct('CONSTRUCT WHERE { <http://example.org/a> ?p ?o }')
+            crawler_app.sparql_construct('CONSTRUCT WHERE { <http://example.org/b> ?p ?o }')
+            crawler_app.sparql_construct('CONSTRUCT WHERE { <http://example.org/a> ?p ?o }')  # Hit, now most recent
+            crawler_app.sparql_construct('CONSTRUCT WHERE { <http://example.org/c> ?p ?o }')  # Evicts b
+            crawler_app.sparql_construct('CONSTRUCT WHERE { <http://example.org/a> ?p ?o }')
+            crawler_app.sparql_construct('CONSTRUCT WHERE { <http://example.org/b> ?p ?o }')
+
+        status = crawler_app.get_sparql_cache_status()
+        self.assertEqual(status['hits'], 2)
+        self.assertEqual(status['misses'], 4)
+        self.assertEqual(status['evictions'], 2)
+        self.assertLessEqual(status['bytes'], 100)
+
+class TestHTTPSession(unittest.TestCase):
+    """Tests for the shared pooled HTTP session."""
+
+    def tearDown(self):
+        crawler_app.reset_http_session()
+
+    def test_session_is_shared_and_pooled(self):
+        crawler_app.reset_http_session()
+        with patch.dict(crawler_app.app.config, {'HTTP_POOL_MAXSIZE': 7}):
+            session = crawler_app.get_http_session()
+
+            # The same session is reused for every request
+            self.assertIs(session, crawler_app.get_http_session())
+
+            # Adapters are sized from the configuration and a uniform User-Agent is set
+            adapter = session.get_adapter('https://zenodo.org/')
+            self.assertEqual(adapter._pool_maxsize, 7)
+            self.assertEqual(session.headers['User-Agent'], crawler_app.CRAWLER_USER_AGENT)
+
+    def test_http_request_applies_default_timeout(self):
+        mock_session = MagicMock()
+        with patch('app.get_http_session', return_value=mock_session):
+            with patch.dict(crawler_app.app.config, {'HTTP_TIMEOUT': 4}):
+                crawler_app.http_head('http://example.org/resource')
+
+        mock_session.request.assert_called_once_with('HEAD', 'http://example.org/resource',
+                                                     timeout=4, allow_redirects=False)
+
+    def test_sparql_client_streams_bindings(self):
+        body = json.dumps({'head': {'vars': ['s', 'o']}, 'results': {'bindings': [
+            {'s': {'type': 'uri', 'value': f'http://example.org/{i}'},
+             'o': {'type': 'literal', 'value': f'caf\u00e9 {i} ]'}} for i in range(50)]}}).encode('utf-8')
+        response = MagicMock(status_code=200)
+        response.__enter__.return_value = response
+        # Deliver the body in small chunks that split bindings and multi-byte characters
+        response.iter_content.return_value = [body[i:i + 7] for i in range(0, len(body), 7)]
+        mock_session = MagicMock()
+        mock_session.post.return_value = response
+
+        with patch('app.get_sparql_session', return_value=mock_session), \
+                patch.dict(crawler_app.app.config, {'SPARQL_TIMEOUT': 9}):
+            bindings = list(crawler_app.sparql_select_bindings('SELECT ?s ?o WHERE { ?s ?p ?o }'))
+
+        self.assertEqual(len(bindings), 50)
+        self.assertEqual(bindings[3]['o']['value'], 'caf\u00e9 3 ]')
+        args, kwargs = mock_session.post.call_args
+        self.assertTrue(args[0].endswith('/query'))
+        self.assertEqual(kwargs['data'], {'query': 'SELECT ?s ?o WHERE { ?s ?p ?o }'})
+        self.assertEqual(kwargs['timeout'], 9)
+        self.assertTrue(kwargs['stream'])
+
+        # The SPARQL session is pooled and shared like the crawler session
+        crawler_app.reset_sparql_session()
+        self.assertIs(crawler_app.get_sparql_session(), crawler_app.get_sparql_session())
+        self.assertIn('gzip', crawler_app.get_sparql_session().headers['Accept-Encoding'])
+        crawler_app.reset_sparql_session()
+
+
+class TestHTTPCache(unittest.TestCase):
+    """Tests for the persistent HTTP response cache."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.config = patch.dict(crawler_app.app.config, {
+            'HTTP_CACHE_ENABLED': True,
+            'HTTP_CACHE_DIR': self.cache_dir,
+            'HTTP_CACHE_MAX_BYTES': 1024
+        })
+        self.config.start()
+        crawler_app.http_cache_state['loaded'] = False
+
+    def tearDown(self):
+        self.config.stop()
+        crawler_app.http_cache_state['loaded'] = False
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def make_response(self, status, content=b'', headers=None):
+        response = MagicMock()
+        response.status_code = status
+        response.url = 'http://example.org/data.ttl'
+        response.content = content
+        response.encoding = 'utf-8'
+        response.headers = requests.structures.CaseInsensitiveDict(headers or {})
+        return response
+
+    def test_revalidates_with_etag(self):
+        body = b'<http://example.org/s> <http://schema.org/name> "Test" .'
+        first = self.make_response(200, body, {'Content-Type': 'text/turtle', 'ETag': '"v1"'})
+        not_modified = self.make_response(304)
+
+        with patch('app.http_get', side_effect=[first, not_modified]) as mock_get:
+            crawler_app.fetch_resource('http://example.org/data.ttl')
+            fetched = crawler_app.fetch_resource('http://example.org/data.ttl')
+
+        # The second request is conditional and the cached body is reused
+        self.assertEqual(mock_get.call_args[1]['headers'], {'If-None-Match': '"v1"'})
+        self.assertTrue(fetched['from_cache'])
+        self.assertEqual(fetched['content'], body)
+        self.assertEqual(fetched['content_type'], 'text/turtle')
+
+    def test_fresh_entries_skip_the_network_and_lru_evicts(self):
+        fresh = self.make_response(200, b'a' * 600, {'Cache-Control': 'max-age=3600'})
+        with patch('app.http_get', return_value=fresh):
+            crawler_app.fetch_resource('http://example.org/one')
+        with patch('app.http_get', side_effect=AssertionError('unexpected request')):
+            self.assertTrue(crawler_app.fetch_resource('http://example.org/one')['from_cache'])
+
+        # Storing another large entry evicts the least recently used one
+        with patch('app.http_get', return_value=self.make_response(200, b'b' * 600)):
+            crawler_app.fetch_resource('http://example.org/two')
+        self.assertIsNone(crawler_app.http_cache_lookup('http://example.org/one'))
+        self.assertIsNotNone(crawler_app.http_cache_lookup('http://example.org/two'))
+
 
 class TestRDFProcessing(unittest.TestCase):
     """Tests for RDF parsing and processing functions."""
@@ -137,7 +967,7 @@ class TestRDFProcessing(unittest.TestCase):
         # Test with various URLs
         with patch('app.crawl_state', {'visited_urls': set()}):
             # Skip actual HTTP requests
-            with patch('requests.head'):
+            with patch('app.http_head'):
                 # URL with RDF indicators should score higher
                 relevance1 = calculate_relevance('http://example.org/data/metadata.rdf', test_graph)
                 relevance2 = calculate_relevance('http://example.org/page.html', test_graph)
@@ -155,6 +985,190 @@ class TestRDFProcessing(unittest.TestCase):
                     self.assertGreaterEqual(score, 0.0)
                     self.assertLessEqual(score, 1.0)
 
+    def test_fetch_and_parse_rdf_reuses_fetch(self):
+        # A fetch result that was already downloaded should be parsed without new requests
+        fetched = {
+            'url': 'http://example.org/data.ttl',
+            'final_url': 'http://example.org/data.ttl',
+            'status': 200,
+            'headers': {'Content-Type': 'text/turtle'},
+            'content': b'<http://example.org/s> <http://schema.org/name> "Test" .',
+            'content_type': 'text/turtle',
+            'encoding': 'utf-8',
+            'error': None
+        }
+
+        with patch('app.http_request', side_effect=AssertionError('unexpected request')):
+            g, error, format_used, content_type = fetch_and_parse_rdf('http://example.org/data.ttl', fetched)
+
+        self.assertIsNone(error)
+        self.assertEqual(len(g), 1)
+        self.assertEqual(format_used, 'turtle')
+        self.assertEqual(content_type, 'text/turtle')
+
+
+    def test_html_scanned_once_for_links_and_embedded_data(self):
+        html = """<html prefix="schema: http://schema.org/"><head>
+            <link rel="describedby" href="http://example.org/meta.ttl" type="text/turtle"/>
+            <link rel="alternate" href="http://example.org/data.rdf" type="application/rdf+xml">
+            <script type="application/ld+json">{"@id": "http://example.org/s", "http://schema.org/name": "Test"}</script>
+            </head><body><div itemscope itemtype="https://schema.org/Dataset">
+            <a rel="license" href="http://example.org/licence">Licence</a></div></body></html>"""
+        fetched = {
+            'url': 'http://example.org/page', 'final_url': 'http://example.org/page', 'status': 200,
+            'headers': {}, 'content': html.encode('utf-8'), 'content_type': 'text/html',
+            'encoding': 'utf-8', 'error': None
+        }
+
+        with patch('app.HTMLMetadataExtractor', wraps=crawler_app.HTMLMetadataExtractor) as mock_extractor, \
+             patch('app.http_request', side_effect=AssertionError('unexpected request')), \
+             patch('app.crawl_state', {'signposting_stats': {'found': 0}}):
+            links = get_signposting_links('http://example.org/page', fetched)
+            g, error, format_used, _ = fetch_and_parse_rdf('http://example.org/page#jsonld', fetched)
+
+        # Both steps share a single scan of the page
+        mock_extractor.assert_called_once()
+        self.assertEqual(links['describedby'], 'http://example.org/meta.ttl')
+        self.assertEqual(links['alternate'], 'http://example.org/data.rdf')
+        self.assertEqual(links['license'], 'http://example.org/licence')
+        self.assertEqual((len(g), format_used), (1, 'json-ld'))
+        metadata = fetched['html_metadata']
+        self.assertTrue(metadata['has_rdfa'])
+        self.assertEqual(metadata['itemtypes'], ['https://schema.org/Dataset'])
+
+    def test_parse_stage_in_process_pool(self):
+        content = b"""@prefix schema: <http://schema.org/> .
+            <http://example.org/d> a schema:Dataset ; schema:name "Data" ; schema:description "Test" ."""
+        try:
+            with patch.dict(crawler_app.app.config, {'PARSE_POOL_WORKERS': 1, 'PARSE_POOL_THRESHOLD': 0}), \
+                    patch.object(crawler_app.Graph, 'parse') as mock_parse:
+                pooled = crawler_app.run_parse_stage(content, ['xml', 'turtle'], 'http://example.org/d')
+        finally:
+            crawler_app.reset_parse_pool()
+        # The document was only parsed in the pool process, which sent back N-Triples
+        mock_parse.assert_not_called()
+        self.assertIsInstance(pooled['graph'], crawler_app.NTriplesDocument)
+        self.assertEqual(len(pooled['graph']), 3)
+        in_thread = crawler_app.parse_rdf_document(content, ['xml', 'turtle'], 'http://example.org/d')
+
+        # The pool returns the same triples, format and scoring features as parsing in-thread
+        self.assertEqual(set(pooled['graph'].to_graph()), set(in_thread['graph']))
+        statements = [line for line in pooled['graph'].serialize(format='nt').split('\n') if line.strip()]
+        self.assertEqual(len(statements), 3)
+        self.assertEqual((pooled['format'], pooled['attempts']), ('turtle', 2))
+        self.assertEqual(pooled['features'], {'triple_count': 3, 'vocab_count': 1, 'useful_count': 3})
+        self.assertEqual(pooled['features'], in_thread['features'])
+
+    @patch('app.record_provenance')
+    @patch('app.store_ntriples_in_fuseki', return_value=True)
+    @patch('app.http_get')
+    def test_stream_ingest_ntriples_in_chunks(self, mock_get, mock_store, mock_provenance):
+        lines = [b'# dump', b'<http://example.org/d> <http://purl.org/dc/terms/title> "Data" <http://example.org/g> .',
+                 b'not a statement', b'']
+        lines += [f'<http://example.org/s{i}> <http://schema.org/name> "n{i}" .'.encode() for i in range(4)]
+        response = MagicMock(status_code=200, url='http://example.org/dump.nq',
+                             headers={'Content-Type': 'application/n-quads'}, encoding=None)
+        response.__enter__.return_value = response
+        response.iter_lines.return_value = iter(lines)
+        mock_get.return_value = response
+
+        state = {'resource_scores': {}, 'visited_urls': set(), 'provenance': {}}
+        with patch('app.crawl_state', state), patch.dict(crawler_app.app.config, {'STREAM_INGEST_CHUNK_TRIPLES': 2}):
+            self.assertTrue(crawler_app.is_line_based_rdf_url('http://example.org/dump.nq'))
+            fetched = crawler_app.stream_ingest_rdf('http://example.org/dump.nq')
+
+        # Valid statements went to the resource graph in chunks, graph labels dropped
+        self.assertEqual([len(call.args[0]) for call in mock_store.call_args_list], [2, 2, 1])
+        self.assertEqual(mock_store.call_args_list[0].args[0][0],
+                         '<http://example.org/d> <http://purl.org/dc/terms/title> "Data" .')
+        self.assertEqual(mock_store.call_args_list[0].args[1], 'http://example.org/dump.nq')
+        self.assertEqual(fetched['rdf_features'], {'triple_count': 5, 'vocab_count': 3, 'useful_count': 3})
+        mock_provenance.assert_called_once_with('http://example.org/dump.nq', 'direct_rdf', 5, 'nquads', 'application/n-quads')
+
+    @patch('app.record_provenance')
+    @patch('app.store_ntriples_in_fuseki', return_value=True)
+    @patch('app.http_get')
+    def test_stream_ingest_skolemises_and_respects_budget(self, mock_get, mock_store, mock_provenance):
+        lines = [b'_:a <http://schema.org/name> "x" .', b'<http://example.org/d> <http://schema.org/author> _:a .',
+                 b'_:a <http://schema.org/email> "x@example.org" .', b'<http://example.org/e> <http://schema.org/name> "e" .']
+        response = MagicMock(status_code=200, url='http://example.org/dump.nt',
+                             headers={'Content-Type': 'application/n-triples'}, encoding=None)
+        response.__enter__.return_value = response
+        response.iter_lines.return_value = iter(lines)
+        mock_get.return_value = response
+
+        state = {'resource_scores': {}, 'visited_urls': set(), 'provenance': {'triples_collected': 7}}
+        with patch('app.crawl_state', state), \
+                patch.dict(crawler_app.app.config, {'STREAM_INGEST_CHUNK_TRIPLES': 2, 'MAX_TRIPLES': 10}):
+            crawler_app.stream_ingest_rdf('http://example.org/dump.nt', 'signposting:item')
+
+        # Only the remaining budget of 3 triples was streamed
+        statements = [line for call in mock_store.call_args_list for line in call.args[0]]
+        self.assertEqual(len(statements), 3)
+        mock_provenance.assert_called_once_with('http://example.org/dump.nt', 'signposting:item', 3, 'nt', 'application/n-triples')
+        # The blank node spanning both chunks became one stable IRI
+        node = statements[0].split(' ')[0]
+        self.assertTrue(node.startswith('<http://example.org/.well-known/genid/'))
+        self.assertEqual(statements[1].split(' ')[2], node)
+        self.assertEqual(statements[2].split(' ')[0], node)
+        self.assertEqual(crawler_app.skolem_prefix('http://example.org/dump.nt'),
+                         crawler_app.skolem_prefix('http://example.org/dump.nt#x'))
+        self.assertNotEqual(crawler_app.skolem_prefix('http://example.org/dump.nt'),
+                            crawler_app.skolem_prefix('http://example.org/other.nt'))
+
+    @patch('app.fetch_resource')
+    @patch('app.stream_ingest_rdf')
+    @patch('app.get_signposting_links')
+    @patch('app.fetch_and_parse_rdf')
+    def test_linked_dump_is_streamed(self, mock_parse, mock_links, mock_stream, mock_fetch):
+        mock_parse.return_value = (crawler_app.Graph(), 'no RDF', None, None)
+        mock_links.return_value = {'item': 'http://example.org/files/dump.nq'}
+        mock_stream.return_value = {'error': None}
+        state = {'resource_scores': {}, 'visited_urls': set(), 'provenance': {}, 'current_depth': 0}
+        with patch('app.crawl_state', state), patch('app.host_circuit_open', return_value=False):
+            discovered = crawler_app.crawl_resource('http://example.org/record')
+
+        # The dump was streamed instead of being downloaded whole, and is not crawled again
+        mock_stream.assert_called_once_with('http://example.org/files/dump.nq', 'signposting:item')
+        mock_fetch.assert_called_once_with('http://example.org/record')
+        self.assertEqual(discovered, [])
+        self.assertIn('http://example.org/files/dump.nq', state['visited_urls'])
+
+    def test_detect_rdf_formats_from_content(self):
+        # The content decides the format even when the headers are unhelpful
+        self.assertEqual(crawler_app.detect_rdf_formats(
+            b'<?xml version="1.0"?>\n<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"/>',
+            'text/plain', 'http://example.org/data')[0], 'xml')
+        self.assertEqual(crawler_app.detect_rdf_formats(
+            b'<http://example.org/s> <http://example.org/p> "o" <http://example.org/g> .\n',
+            'application/octet-stream', 'http://example.org/dump')[0], 'nquads')
+        self.assertEqual(crawler_app.detect_rdf_formats(
+            b'@prefix ex: <http://example.org/> .\nex:s ex:p ex:o .', None, 'http://example.org/x.rdf')[0], 'turtle')
+        self.assertEqual(crawler_app.detect_rdf_formats('\ufeff{"@context": {}}'.encode('utf-8'))[0], 'json-ld')
+        # Statements starting with an IRI like <urn:...> are not mistaken for markup
+        self.assertEqual(crawler_app.sniff_rdf_formats(b'<urn:x:1> <urn:p> <urn:o> <urn:g> .\n'), ['nquads'])
+        self.assertEqual(crawler_app.sniff_rdf_formats(
+            b'<urn:x:1> a <http://schema.org/Dataset> ;\n    <http://schema.org/name> "x" .')[0], 'turtle')
+        self.assertEqual(crawler_app.sniff_rdf_formats(b'<rdf:RDF>\n<rdf:Description/>\n</rdf:RDF>'), ['xml'])
+        # HTML and unrecognised content without RDF headers are not parsed as RDF
+        self.assertEqual(crawler_app.detect_rdf_formats(b'<!DOCTYPE html><html></html>', 'text/html'), [])
+        self.assertEqual(crawler_app.detect_rdf_formats(b'plain text', 'text/plain'), [])
+
+    def test_fetch_and_parse_rdf_records_detection(self):
+        fetched = {
+            'url': 'http://example.org/data', 'final_url': 'http://example.org/data', 'status': 200,
+            'headers': {}, 'content': b'{"@id": "http://example.org/s", "http://schema.org/name": "Test"}',
+            'content_type': 'text/plain', 'encoding': 'utf-8', 'error': None
+        }
+        state = {'signposting_stats': {}}
+        with patch('app.crawl_state', state):
+            g, error, format_used, content_type = fetch_and_parse_rdf('http://example.org/data', fetched)
+
+        # Only one parse was attempted, with the detected format
+        self.assertEqual(format_used, 'json-ld')
+        self.assertEqual(len(g), 1)
+        detection = state['signposting_stats']['format_detection']
+        self.assertEqual((detection['documents'], detection['first_guess'], detection['parse_attempts']), (1, 1, 1))
 
 class TestCrawlFunctions(unittest.TestCase):
     """Tests for crawling functionality."""
@@ -276,6 +1290,106 @@ class TestCrawlFunctions(unittest.TestCase):
                     self.assertEqual(len(selected), 2)
                     self.assertIn('http://example.org/high', selected)
 
+    def make_frontier_state(self):
+        # Minimal crawler state needed by the frontier and stopping criteria
+        return {
+            'visited_urls': set(),
+            'current_depth': 0,
+            'start_time': datetime.datetime.now(),
+            'resource_scores': {},
+            'current_level_urls': [],
+            'provenance': {
+                'triples_collected': 0,
+                'domains_visited': set()
+            }
+        }
+
+    def test_frontier_orders_by_score_and_applies_budget(self):
+        app_config = {'MAX_CRAWL_DEPTH': 3, 'MAX_RESOURCES_PER_LEVEL': 2, 'FRONTIER_DOMAIN_PENALTY': 0.0,
+                      'CRAWL_TIMEOUT': 300, 'MAX_TRIPLES': 10000, 'MAX_RESOURCES': 500}
+        with patch('app.crawl_state', self.make_frontier_state()), patch('app.app.config', app_config):
+            crawler_app.reset_frontier()
+            self.assertTrue(crawler_app.frontier_push('http://a.example.org/low', 1, 0.5))
+            self.assertTrue(crawler_app.frontier_push('http://b.example.org/high', 1, 0.9))
+            self.assertTrue(crawler_app.frontier_push('http://c.example.org/mid', 1, 0.7))
+
+            # Depth limits and duplicates are rejected on admission
+            self.assertFalse(crawler_app.frontier_push('http://d.example.org/deep', 3, 1.0))
+            self.assertFalse(crawler_app.frontier_push('http://b.example.org/high', 1, 0.9))
+
+            # Best scores come out first and the per-depth budget drops the rest
+            self.assertEqual(crawler_app.frontier_next()[0], 'http://b.example.org/high')
+            self.assertEqual(crawler_app.frontier_next()[0], 'http://c.example.org/mid')
+            self.assertIsNone(crawler_app.frontier_next())
+
+    def test_frontier_passes_over_busy_hosts(self):
+        app_config = {'MAX_CRAWL_DEPTH': 3, 'MAX_RESOURCES_PER_LEVEL': 5, 'FRONTIER_DOMAIN_PENALTY': 0.0,
+                      'CRAWL_TIMEOUT': 300, 'MAX_TRIPLES': 10000, 'MAX_RESOURCES': 500}
+        with patch('app.crawl_state', self.make_frontier_state()), patch('app.app.config', app_config):
+            crawler_app.reset_frontier()
+            crawler_app.frontier_push('http://busy.example.org/1', 1, 0.9)
+            crawler_app.frontier_push('http://busy.example.org/2', 1, 0.8)
+            crawler_app.frontier_push('http://idle.example.org/1', 1, 0.1)
+
+            # The lower-scored URL on a host with capacity is taken, the others stay queued
+            entry = crawler_app.frontier_next(lambda host: host != 'busy.example.org')
+            self.assertEqual(entry[0], 'http://idle.example.org/1')
+            self.assertIsNone(crawler_app.frontier_next(lambda host: host != 'busy.example.org'))
+            self.assertEqual(crawler_app.frontier_state['admitted_per_depth'][1], 1)
+            self.assertEqual(crawler_app.frontier_next()[0], 'http://busy.example.org/1')
+
+    def test_deferred_url_can_be_queued_again(self):
+        app_config = {'MAX_CRAWL_DEPTH': 3, 'MAX_RESOURCES_PER_LEVEL': 1, 'FRONTIER_DOMAIN_PENALTY': 0.0,
+                      'CRAWL_TIMEOUT': 300, 'MAX_TRIPLES': 10000, 'MAX_RESOURCES': 500}
+        with patch('app.crawl_state', self.make_frontier_state()), patch('app.app.config', app_config), \
+                patch('app.host_circuit_open', return_value=True), patch('app.record_circuit_skip'), \
+                patch('app.crawl_resource') as mock_crawl:
+            crawler_app.reset_frontier()
+            crawler_app.frontier_push('http://down.example.org/a', 1, 0.9)
+            url, depth, new_depth = crawler_app.frontier_next()
+
+            # The circuit is open, so the URL is given back instead of being crawled
+            self.assertEqual(crawler_app.crawl_frontier_item(url, depth), [])
+            mock_crawl.assert_not_called()
+            self.assertNotIn(url, crawler_app.frontier_state['queued'])
+            self.assertEqual(crawler_app.frontier_state['admitted_per_depth'][1], 0)
+
+            # Rediscovered later, it is admitted again within the depth budget
+            self.assertTrue(crawler_app.frontier_push(url, 1, 0.9))
+            self.assertEqual(crawler_app.frontier_next()[0], url)
+
+    def test_crawl_frontier_async_limits_per_host(self):
+        # Track how many resources from each host are being crawled at the same time
+        in_flight = {}
+        max_in_flight = {}
+        crawled = []
+        lock = crawler_app.threading.Lock()
+
+        def fake_crawl_resource(url, depth=0):
+            host = urlparse(url).netloc
+            with lock:
+                crawled.append(url)
+                in_flight[host] = in_flight.get(host, 0) + 1
+                max_in_flight[host] = max(max_in_flight.get(host, 0), in_flight[host])
+            crawler_app.time.sleep(0.02)
+            with lock:
+                in_flight[host] -= 1
+            return []
+
+        urls = [f"http://slow.example.org/{i}" for i in range(6)] + ['http://other.example.org/0']
+        app_config = {'MAX_CRAWL_DEPTH': 1, 'MAX_RESOURCES_PER_LEVEL': 5, 'CRAWL_TIMEOUT': 300,
+                      'MAX_TRIPLES': 10000, 'MAX_RESOURCES': 500,
+                      'ASYNC_MAX_CONCURRENCY': 10, 'ASYNC_PER_HOST_LIMIT': 2}
+        with patch('app.crawl_state', self.make_frontier_state()), patch('app.app.config', app_config):
+            with patch('app.crawl_resource', side_effect=fake_crawl_resource):
+                crawler_app.reset_frontier()
+                for url in urls:
+                    crawler_app.frontier_push(url, 0, 1.0)
+                crawler_app.asyncio.run(crawler_app.crawl_frontier_async())
+
+        # Every seed was crawled and no host exceeded its limit
+        self.assertEqual(sorted(crawled), sorted(urls))
+        self.assertLessEqual(max_in_flight['slow.example.org'], 2)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file